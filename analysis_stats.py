@@ -0,0 +1,153 @@
+import re
+import logging
+from collections import defaultdict
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Class categories shown on the Analysis tab, keyed by their `category` value.
+CLASS_CATEGORIES = {
+    'fcd': lambda c: "Distinction" in c,
+    'fc': lambda c: c == 'First Class',
+    'sc': lambda c: c == 'Second Class',
+}
+
+ROW_FIELDS = ('usn', 'name', 'total_marks', 'sgpa', 'class_result')
+
+
+def is_fail(doc):
+    return doc.get('class_result') == 'Fail' or any(sub.get('result') == 'F' for sub in doc.get('subjects', []))
+
+
+def member_row(doc, **extra):
+    row = {k: doc.get(k) for k in ROW_FIELDS}
+    row.update(extra)
+    return row
+
+
+def contributions(doc):
+    """
+    What one student adds to the materialized stats:
+    counters as {stats_id: {field: n}} and list members as {stats_id: {usn: row}}.
+    """
+    counters = defaultdict(dict)
+    members = defaultdict(dict)
+    if not doc or not doc.get('usn'):
+        return counters, members
+    usn = doc['usn']
+    class_result = doc.get('class_result') or ''
+
+    failed = is_fail(doc)
+    counters['overall'] = {'total': 1, 'failed': int(failed)}
+    if failed:
+        failed_subs = [sub['code'] for sub in doc.get('subjects', []) if sub.get('result') == 'F']
+        members['overall_fail'][usn] = member_row(doc, fail_summary=", ".join(failed_subs) if failed_subs else "Fail")
+
+    for category, matches in CLASS_CATEGORIES.items():
+        if matches(class_result):
+            members[category][usn] = member_row(doc)
+
+    seen = set()
+    for sub in doc.get('subjects', []):
+        code = sub.get('code')
+        if not code or code in seen:
+            continue
+        seen.add(code)
+        passed = sub.get('result') == 'P'
+        counters[f'subject:{code}'] = {'total': 1, 'passed': int(passed)}
+        if not passed:
+            members[f'subject:{code}'][usn] = member_row(doc, fail_marks=sub.get('total'))
+    return counters, members
+
+
+def apply_change(stats_col, previous, current):
+    """Fold one upsert (previous -> current document) into the stats collection."""
+    old_counters, old_members = contributions(previous)
+    new_counters, new_members = contributions(current)
+
+    updates = defaultdict(lambda: defaultdict(dict))
+    for stats_id in set(old_counters) | set(new_counters):
+        for field in set(old_counters.get(stats_id, {})) | set(new_counters.get(stats_id, {})):
+            delta = new_counters.get(stats_id, {}).get(field, 0) - old_counters.get(stats_id, {}).get(field, 0)
+            if delta:
+                updates[stats_id]['$inc'][field] = delta
+    for stats_id, rows in old_members.items():
+        for usn in rows:
+            if usn not in new_members.get(stats_id, {}):
+                updates[stats_id]['$unset'][f'members.{usn}'] = ""
+    for stats_id, rows in new_members.items():
+        for usn, row in rows.items():
+            updates[stats_id]['$set'][f'members.{usn}'] = row
+
+    ops = [UpdateOne({'_id': stats_id}, dict(update), upsert=True) for stats_id, update in updates.items()]
+    if ops:
+        stats_col.bulk_write(ops, ordered=False)
+
+
+def rebuild(students_col, stats_col):
+    """Recompute every stats document from scratch in one pass over the students."""
+    docs = defaultdict(lambda: {'members': {}})
+    count = 0
+    for student in students_col.find({}, {'_id': 0, 'usn': 1, 'name': 1, 'total_marks': 1,
+                                          'sgpa': 1, 'class_result': 1, 'subjects.code': 1,
+                                          'subjects.result': 1, 'subjects.total': 1}):
+        counters, members = contributions(student)
+        for stats_id, fields in counters.items():
+            for field, n in fields.items():
+                docs[stats_id][field] = docs[stats_id].get(field, 0) + n
+        for stats_id, rows in members.items():
+            docs[stats_id]['members'].update(rows)
+        count += 1
+
+    # Keep empty categories present so reads never miss.
+    for stats_id in ('overall', 'overall_fail', *CLASS_CATEGORIES):
+        docs.setdefault(stats_id, {'members': {}})
+    ops = [ReplaceOne({'_id': stats_id}, doc, upsert=True) for stats_id, doc in docs.items()]
+    stats_col.delete_many({'_id': {'$nin': list(docs)}})
+    stats_col.bulk_write(ops, ordered=False)
+    logger.info(f"📊 Rebuilt {len(ops)} stats documents from {count} students")
+    return count
+
+
+def ensure_stats(students_col, stats_col):
+    try:
+        if stats_col.find_one({'_id': 'overall'}) is None:
+            rebuild(students_col, stats_col)
+    except PyMongoError as e:
+        logger.error(f"❌ Stats bootstrap failed: {e}")
+
+
+def category_query(category):
+    """Students query selecting the same members read_category lists (used by exports)."""
+    if category == 'overall_fail':
+        return {'$or': [{'class_result': 'Fail'}, {'subjects.result': 'F'}]}
+    if category == 'fcd':
+        return {'class_result': {'$regex': 'Distinction'}}
+    if category == 'fc':
+        return {'class_result': 'First Class'}
+    if category == 'sc':
+        return {'class_result': 'Second Class'}
+    return {'subjects': {'$elemMatch': {'code': {'$regex': '^' + re.escape(category)}, 'result': {'$ne': 'P'}}}}
+
+
+def read_category(stats_col, category):
+    """Return (stats, students) for an Analysis category from the materialized docs."""
+    overall = stats_col.find_one({'_id': 'overall'}) or {}
+    total = overall.get('total', 0)
+    failed = overall.get('failed', 0)
+    stats = {'total': total, 'passed': total - failed, 'failed': failed}
+
+    if category == 'overall_fail' or category in CLASS_CATEGORIES:
+        doc = stats_col.find_one({'_id': category}, {'members': 1}) or {}
+    else:
+        doc = stats_col.find_one({'_id': f'subject:{category}'})
+        if doc is None:
+            # Categories may be a code prefix (e.g. a scheme-less "BCS70").
+            doc = stats_col.find_one({'_id': {'$regex': '^' + re.escape(f'subject:{category}')}}) or {}
+        subj_total = doc.get('total', 0)
+        subj_pass = doc.get('passed', 0)
+        stats = {'total': subj_total, 'passed': subj_pass, 'failed': subj_total - subj_pass}
+
+    students = sorted(doc.get('members', {}).values(), key=lambda row: row.get('usn') or '')
+    return stats, students
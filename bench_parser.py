@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Benchmark and regression harness for result_parser.
+
+Runs every available parser backend over a corpus of VTU pages (the saved
+debug pages in this repo, synthetic result pages and any extra saved pages
+passed with --corpus), then:
+- checks each page against its expected fields and that all backends agree
+- reports pages/sec, parse latency percentiles and allocations per page
+- fails if throughput drops below a saved baseline
+
+Usage:
+    python bench_parser.py                      # run and report
+    python bench_parser.py --save-baseline      # record current throughput
+    python bench_parser.py --corpus saved_pages/ --iterations 500
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from html import escape
+
+from result_parser import BACKENDS, parse_result_page
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(ROOT, 'bench_baseline.json')
+
+SUBJECTS = [
+    ('BCS701', 'INTERNET OF THINGS'),
+    ('BCS702', 'PARALLEL COMPUTING'),
+    ('BCS703', 'CRYPTOGRAPHY & NETWORK SECURITY'),
+    ('BCS714', 'DEEP LEARNING'),
+    ('BEE755B', 'RENEWABLE ENERGY SOURCES'),
+    ('BCS786', 'MAJOR PROJECT PHASE II'),
+]
+EXTRA_SUBJECTS = [('BCS755A', 'CLOUD SECURITY'), ('BNS705', 'NSS ACTIVITY')]
+HEADER = ['Subject Code', 'Subject Name', 'Internal Marks', 'External Marks', 'Total', 'Result', 'Announced / Updated on']
+
+
+# --- CORPUS ---
+def result_page(usn, name, rows, malformed=False):
+    def cell(text):
+        return f'<div class="divTableCell">{escape(str(text))}</div>'
+
+    table_rows = ''.join(
+        '<div class="divTableRow">' + ''.join(cell(c) for c in row) + '</div>\n'
+        for row in [HEADER] + rows
+    )
+    student = (
+        '<table class="table"><tr><td><b>University Seat Number </b></td>'
+        f'<td><b> : {usn}</b></td></tr>'
+        f'<tr><td><b>Student Name</b></td><td><b> :</b> {escape(name)} </td></tr></table>'
+    )
+    if malformed:
+        # Unclosed <b>/<td>, unquoted attributes and a stray close tag.
+        student = (
+            '<table class=table><tr><td><b>University Seat Number</b><td><b> : ' + usn + '</b>'
+            '<tr><td><b>Student Name</b><td><b> :</b> ' + escape(name) + '</table></div>'
+        )
+    return (
+        '<html><head><title>VTU Result</title><style>.divTableCell{display:table-cell}</style>'
+        '<script>var label = "Student Name";</script></head><body>'
+        '<!-- Student Name --><div class="container">' + student +
+        '<div class="divTable"><div class="divTableBody">\n' + table_rows +
+        '</div></div></div></body></html>'
+    )
+
+
+def synthetic_cases(rng, count):
+    cases = []
+    kinds = ['pass', 'fail', 'absent', 'extra', 'malformed']
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        usn = f'1DB22CS{i % 1000:03d}'
+        name = f'STUDENT {i} {rng.choice(["KUMAR", "RAO", "NAIK", "D SOUZA"])}'
+        subjects = SUBJECTS + (EXTRA_SUBJECTS if kind == 'extra' else [])
+        rows = []
+        for code, title in subjects:
+            internal, external = rng.randint(30, 50), rng.randint(20, 50)
+            result = 'P'
+            if kind == 'fail' and code == 'BCS702':
+                external, result = rng.randint(0, 10), 'F'
+            if kind == 'absent' and code == 'BCS703':
+                external, result = 0, 'A'
+            rows.append([code, title, internal, external, internal + external, result, '2026-01-28'])
+        html = result_page(usn, name, rows, malformed=(kind == 'malformed'))
+        expected = {'name': name, 'subjects': len(rows), 'total_marks': sum(r[4] for r in rows)}
+        cases.append((f'synthetic-{kind}-{i}', html, expected))
+    return cases
+
+
+def saved_cases(extra_dir=None):
+    cases = []
+    for filename in ('vtu_debug.html', 'selenium_debug.html'):
+        path = os.path.join(ROOT, filename)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                # Alert page / empty index page: nothing to extract.
+                cases.append((filename, f.read(), {'name': 'Unknown', 'subjects': 0}))
+    if extra_dir:
+        for filename in sorted(os.listdir(extra_dir)):
+            if filename.endswith(('.html', '.htm')):
+                with open(os.path.join(extra_dir, filename), encoding='utf-8', errors='replace') as f:
+                    cases.append((filename, f.read(), None))
+    return cases
+
+
+# --- CHECKS ---
+def check_corpus(cases, backends):
+    failures = []
+    for label, html, expected in cases:
+        outputs = {b: parse_result_page(html, '1DB22CS000', backend=b) for b in backends}
+        reference = outputs[backends[0]]
+        for backend, output in outputs.items():
+            if output != reference:
+                failures.append(f"{label}: {backend} differs from {backends[0]}")
+        if expected:
+            for field, want in expected.items():
+                got = len(reference['subjects']) if field == 'subjects' else reference.get(field)
+                if got != want:
+                    failures.append(f"{label}: {field} = {got!r}, expected {want!r}")
+    return failures
+
+
+# --- MEASUREMENT ---
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def measure(backend, pages, iterations):
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        html = pages[i % len(pages)]
+        t0 = time.perf_counter()
+        parse_result_page(html, '1DB22CS000', backend=backend)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+
+    sample = pages[:min(len(pages), 50)]
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    for html in sample:
+        parse_result_page(html, '1DB22CS000', backend=backend)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    return {
+        'pages_per_sec': round(iterations / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1),
+        'retained_blocks_per_page': round(blocks / len(sample), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--synthetic', type=int, default=200, help='number of generated result pages')
+    parser.add_argument('--corpus', help='directory of extra saved result pages')
+    parser.add_argument('--backend', action='append', choices=sorted(BACKENDS), help='limit to these backends')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed throughput drop vs baseline')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--output', help='also write the JSON report here')
+    args = parser.parse_args()
+
+    backends = args.backend or sorted(BACKENDS, key=lambda b: b != 'lxml')
+    cases = saved_cases(args.corpus) + synthetic_cases(random.Random(args.seed), args.synthetic)
+    print(f"📚 Corpus: {len(cases)} pages | Backends: {', '.join(backends)}")
+
+    failures = check_corpus(cases, backends)
+    for failure in failures:
+        print(f"❌ {failure}")
+
+    pages = [html for _, html, _ in cases]
+    report = {b: measure(b, pages, args.iterations) for b in backends}
+
+    print(f"\n{'backend':<8} {'pages/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'peak KB':>9} {'blocks/pg':>10}")
+    for backend, r in report.items():
+        print(f"{backend:<8} {r['pages_per_sec']:>10} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} "
+              f"{r['peak_kb']:>9} {r['retained_blocks_per_page']:>10}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'failures': failures, 'backends': report}, f, indent=2)
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({b: {'pages_per_sec': r['pages_per_sec']} for b, r in report.items()}, f, indent=2)
+        print(f"\n💾 Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for backend, r in report.items():
+            floor = baseline.get(backend, {}).get('pages_per_sec', 0) * (1 - args.tolerance)
+            if r['pages_per_sec'] < floor:
+                regressions.append(f"{backend}: {r['pages_per_sec']} pages/s is below {floor:.1f} (baseline -{args.tolerance:.0%})")
+        for regression in regressions:
+            print(f"📉 {regression}")
+
+    if failures or regressions:
+        sys.exit(1)
+    print("\n✅ Parser corpus and throughput checks passed")
+
+
+if __name__ == '__main__':
+    main()
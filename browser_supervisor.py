@@ -0,0 +1,157 @@
+import os
+import time
+import signal
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserSupervisor:
+    """
+    Tracks the chromedriver/Chrome processes this worker launched.
+
+    chromedriver is started in its own session (see `create_driver`), so it and
+    every Chrome it forks share one process group. Reaping signals only that
+    group and polls for exit instead of sleeping a fixed amount, so browsers
+    belonging to other workers on the host are never touched.
+    """
+
+    def __init__(self, reap_timeout=5.0, latency_window=50):
+        self.reap_timeout = reap_timeout
+        self._procs = {}
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._stats = {
+            'spawned': 0, 'spawn_failures': 0, 'restarts': 0,
+            'reaped': 0, 'forced_kills': 0,
+        }
+
+    # --- SPAWN ---
+    def spawn(self, factory):
+        started = time.perf_counter()
+        try:
+            driver = factory()
+        except Exception:
+            with self._lock:
+                self._stats['spawn_failures'] += 1
+            raise
+        latency = time.perf_counter() - started
+
+        process = getattr(getattr(driver, 'service', None), 'process', None)
+        pid = process.pid if process else None
+        pgid = None
+        if pid:
+            try:
+                pgid = os.getpgid(pid)
+            except OSError:
+                pass
+            # Never signal our own group: that would take the web worker down too.
+            if pgid == os.getpgid(0):
+                pgid = None
+
+        with self._lock:
+            self._procs[id(driver)] = (process, pid, pgid)
+            self._stats['spawned'] += 1
+            if self._stats['reaped']:
+                self._stats['restarts'] += 1
+            self._latencies.append(latency)
+        logger.info(f"🚀 Browser spawned in {latency:.2f}s (pid={pid}, pgid={pgid})")
+        return driver
+
+    # --- REAP ---
+    def reap(self, driver):
+        with self._lock:
+            process, pid, pgid = self._procs.pop(id(driver), (None, None, None))
+
+        try:
+            driver.quit()
+            logger.info("🛑 Driver quit successfully")
+        except Exception as e:
+            logger.warning(f"Error quitting driver: {e}")
+
+        deadline = time.monotonic() + self.reap_timeout
+        if process is not None:
+            try:
+                process.wait(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception:
+                pass
+
+        forced = False
+        if pgid and self._group_alive(pgid):
+            self._signal_group(pgid, signal.SIGTERM)
+            if not self._wait_group(pgid, deadline):
+                self._signal_group(pgid, signal.SIGKILL)
+                self._wait_group(pgid, time.monotonic() + 1.0)
+                forced = True
+        if process is not None and process.poll() is None:
+            process.kill()
+            forced = True
+
+        with self._lock:
+            self._stats['reaped'] += 1
+            if forced:
+                self._stats['forced_kills'] += 1
+        if forced:
+            logger.warning(f"⚠️ Browser group {pgid or pid} had to be force-killed")
+
+    # --- PROCESS GROUP HELPERS ---
+    @staticmethod
+    def _signal_group(pgid, sig):
+        try:
+            os.killpg(pgid, sig)
+        except ProcessLookupError:
+            pass
+        except OSError as e:
+            logger.warning(f"Could not signal process group {pgid}: {e}")
+
+    @staticmethod
+    def _group_alive(pgid):
+        """True while any non-zombie process remains in the group."""
+        try:
+            entries = os.listdir('/proc')
+        except OSError:
+            try:
+                os.killpg(pgid, 0)
+                return True
+            except OSError:
+                return False
+
+        for entry in entries:
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            # fields[0] is the state, fields[2] the process group id
+            if int(fields[2]) == pgid and fields[0] != 'Z':
+                return True
+        return False
+
+    def _wait_group(self, pgid, deadline):
+        delay = 0.01
+        while time.monotonic() < deadline:
+            if not self._group_alive(pgid):
+                return True
+            time.sleep(delay)
+            delay = min(delay * 2, 0.2)
+        return not self._group_alive(pgid)
+
+    # --- STATS ---
+    def stats(self):
+        with self._lock:
+            last = self._latencies[-1] if self._latencies else None
+            latencies = sorted(self._latencies)
+            tracked = len(self._procs)
+            stats = dict(self._stats, tracked=tracked)
+        if latencies:
+            stats['spawn_latency'] = {
+                'last': round(last, 3),
+                'avg': round(sum(latencies) / len(latencies), 3),
+                'p95': round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+                'max': round(latencies[-1], 3),
+            }
+        return stats
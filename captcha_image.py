@@ -0,0 +1,56 @@
+"""
+Compact re-encoding of captcha images before they are sent to students.
+
+CAPTCHA_ENCODING picks the output:
+- 'original': bytes exactly as captured
+- 'gray':     cropped to the drawn area, grayscale, quantized to
+              CAPTCHA_COLORS levels and saved as an optimized PNG
+
+Re-encoding needs Pillow; without it (or if the result is not smaller)
+the original bytes are returned.
+"""
+
+import io
+import os
+import hashlib
+import logging
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+CAPTCHA_ENCODING = os.getenv('CAPTCHA_ENCODING', 'gray').lower()
+CAPTCHA_COLORS = int(os.getenv('CAPTCHA_COLORS', 16))
+
+
+def captcha_id(image):
+    """Short content hash: changes with every new captcha, usable for cache busting."""
+    return hashlib.sha1(image).hexdigest()[:16]
+
+
+def compact(image, content_type):
+    """Return (bytes, content_type), re-encoded smaller when possible."""
+    if CAPTCHA_ENCODING != 'gray' or Image is None:
+        return image, content_type
+    try:
+        with Image.open(io.BytesIO(image)) as src:
+            gray = ImageOps.grayscale(src.convert('RGB'))
+        # Trim the plain white margin around the characters, keeping a little padding.
+        box = ImageOps.invert(gray).getbbox()
+        if box:
+            left, top, right, bottom = box
+            gray = gray.crop((max(0, left - 2), max(0, top - 2),
+                              min(gray.width, right + 2), min(gray.height, bottom + 2)))
+        quantized = gray.quantize(colors=CAPTCHA_COLORS)
+        out = io.BytesIO()
+        quantized.save(out, format='PNG', optimize=True)
+    except Exception as e:
+        logger.warning(f"⚠️ Captcha re-encode failed, sending original: {e}")
+        return image, content_type
+    data = out.getvalue()
+    if len(data) >= len(image):
+        return image, content_type
+    return data, 'image/png'
@@ -0,0 +1,164 @@
+import time
+import logging
+import threading
+from collections import deque
+from session_pool import PoolExhausted
+
+logger = logging.getLogger(__name__)
+
+
+class WarmCaptcha:
+    __slots__ = ('token', 'image', 'content_type', 'ready_at')
+
+    def __init__(self, token, image, content_type):
+        self.token = token
+        self.image = image
+        self.content_type = content_type
+        self.ready_at = time.time()
+
+    def age(self, now=None):
+        return (now or time.time()) - self.ready_at
+
+
+class CaptchaPrewarmer:
+    """
+    Keeps `target` portal sessions in `pool` with a captcha already loaded.
+
+    `prepare(handle)` loads the portal page on a session handle and returns
+    (image, content_type). A background thread tops the stock up whenever
+    `active()` is true, leaving `headroom` pool slots free for cold opens.
+    Captchas older than `max_age` are reloaded on the same session rather
+    than handed out, since the portal expires them.
+    """
+
+    def __init__(self, pool, prepare, target=2, max_age=180, headroom=1,
+                 active=lambda: True, name="prewarm"):
+        self.pool = pool
+        self.prepare = prepare
+        self.target = target
+        self.max_age = max_age
+        self.headroom = headroom
+        self.active = active
+        self.name = name
+
+        self._ready = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {'served': 0, 'empty': 0, 'warmed': 0, 'refreshed': 0, 'lost': 0, 'failures': 0}
+        self._warm_seconds = deque(maxlen=50)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or self.target <= 0:
+                return
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-warmer", daemon=True)
+            self._thread.start()
+        logger.info(f"🔥 [{self.name}] Keeping {self.target} captcha session(s) warm")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def take(self):
+        """Hand out the oldest still-valid warm captcha, or None if the stock is empty."""
+        now = time.time()
+        stale = []
+        entry = None
+        while entry is None:
+            with self._lock:
+                candidate = self._ready.popleft() if self._ready else None
+            if candidate is None:
+                break
+            if candidate.age(now) > self.max_age:
+                stale.append(candidate)
+            elif self.pool.lookup(candidate.token) is None:
+                with self._lock:
+                    self._stats['lost'] += 1
+            else:
+                entry = candidate
+        with self._lock:
+            # Expired ones go back for the warmer to reload in place.
+            self._ready.extend(stale)
+            self._stats['served' if entry else 'empty'] += 1
+        self._wake.set()
+        return entry
+
+    # --- BACKGROUND WARMING ---
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            try:
+                worked = self._refresh_expired() or self._top_up()
+                backoff = 1
+            except PoolExhausted:
+                worked = False
+            except Exception as e:
+                with self._lock:
+                    self._stats['failures'] += 1
+                logger.warning(f"⚠️ [{self.name}] Warming failed: {e}")
+                worked = False
+                backoff = min(backoff * 2, 60)
+                self._stop.wait(backoff)
+            if not worked:
+                self._wake.wait(timeout=5)
+                self._wake.clear()
+
+    def _load(self, pooled):
+        started = time.time()
+        with self.pool.using(pooled) as handle:
+            image, content_type = self.prepare(handle)
+        self._warm_seconds.append(time.time() - started)
+        return WarmCaptcha(pooled.token, image, content_type)
+
+    def _refresh_expired(self):
+        now = time.time()
+        with self._lock:
+            expired = next((e for e in self._ready if e.age(now) > self.max_age), None)
+            if expired is None:
+                return False
+            self._ready.remove(expired)
+        pooled = self.pool.lookup(expired.token)
+        if pooled is None:
+            with self._lock:
+                self._stats['lost'] += 1
+            return True
+        if not self.active():
+            self.pool.discard(expired.token)
+            return True
+        try:
+            entry = self._load(pooled)
+        except Exception:
+            self.pool.discard(expired.token)
+            raise
+        with self._lock:
+            self._ready.append(entry)
+            self._stats['refreshed'] += 1
+        return True
+
+    def _top_up(self):
+        with self._lock:
+            missing = self.target - len(self._ready)
+        if missing <= 0 or not self.active() or self.pool.free_slots() <= self.headroom:
+            return False
+        pooled = self.pool.open()
+        try:
+            entry = self._load(pooled)
+        except Exception:
+            self.pool.discard(pooled.token)
+            raise
+        with self._lock:
+            self._ready.append(entry)
+            self._stats['warmed'] += 1
+        return True
+
+    def stats(self):
+        with self._lock:
+            warm = list(self._warm_seconds)
+            return dict(self._stats,
+                        ready=len(self._ready),
+                        target=self.target,
+                        running=self._thread is not None,
+                        oldest_age=round(max((e.age() for e in self._ready), default=0), 1),
+                        avg_warm_seconds=round(sum(warm) / len(warm), 2) if warm else None)
@@ -0,0 +1,159 @@
+import time
+import random
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling a dependency that is known to be failing."""
+
+    def __init__(self, message, retry_after=5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def backoff_delay(attempt, base=1.0, cap=10.0):
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Rolling failure-rate circuit breaker.
+
+    Outcomes from the last `window` seconds are kept. Once at least
+    `min_calls` were seen and `failure_rate` of them failed, the circuit
+    opens: `allow()` raises CircuitOpen until the open period (doubling on
+    each consecutive trip, from `open_base` up to `open_max`, with jitter)
+    has passed. It then goes half-open and lets one probe call through; the
+    probe's outcome closes the circuit or opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, name="circuit", window=60, min_calls=5, failure_rate=0.5,
+                 open_base=15, open_max=300, probe_timeout=60):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_base = open_base
+        self.open_max = open_max
+        self.probe_timeout = probe_timeout
+
+        self.state = self.CLOSED
+        self._outcomes = deque()
+        self._trips = 0
+        self._open_until = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self._stats = {'successes': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def _prune(self, now):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def _half_open_if_due(self, now):
+        """OPEN -> HALF_OPEN once the open period is over. Caller holds the lock."""
+        if self.state == self.OPEN and now >= self._open_until:
+            self.state = self.HALF_OPEN
+            self._probe_started = None
+            logger.info(f"🟡 [{self.name}] Circuit half-open, probing")
+
+    def _retry_after(self, now):
+        return max(1, int(self._open_until - now + 0.999))
+
+    def allow(self):
+        """
+        Raise CircuitOpen if calls should not be made right now.
+
+        Returns a probe claim (truthy) when this call is the half-open probe,
+        else None. A caller that ends up not reaching the dependency must
+        hand the claim back with `release()`, or every other call is refused
+        until `probe_timeout` passes.
+        """
+        now = time.time()
+        with self._lock:
+            self._half_open_if_due(now)
+            if self.state == self.CLOSED:
+                return None
+            if self.state == self.HALF_OPEN:
+                if self._probe_started is None or now - self._probe_started > self.probe_timeout:
+                    self._probe_started = now
+                    return now
+                retry_after = 5
+            else:
+                retry_after = self._retry_after(now)
+            self._stats['rejected'] += 1
+        raise CircuitOpen(f"{self.name} circuit is {self.state}", retry_after=retry_after)
+
+    def release(self, claim):
+        """Give back a probe claim whose call never reached the dependency (no-op once an outcome is recorded)."""
+        if not claim:
+            return
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._probe_started == claim:
+                self._probe_started = None
+
+    def available(self):
+        """True if `allow()` would currently let a call through (without claiming a probe)."""
+        now = time.time()
+        with self._lock:
+            self._half_open_if_due(now)
+            if self.state == self.OPEN:
+                return False
+            if self.state == self.HALF_OPEN:
+                return self._probe_started is None or now - self._probe_started > self.probe_timeout
+            return True
+
+    def record_success(self):
+        now = time.time()
+        with self._lock:
+            self._stats['successes'] += 1
+            if self.state != self.CLOSED:
+                logger.info(f"🟢 [{self.name}] Circuit closed after successful probe")
+                self.state = self.CLOSED
+                self._trips = 0
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._prune(now)
+
+    def record_failure(self):
+        now = time.time()
+        with self._lock:
+            self._stats['failures'] += 1
+            self._outcomes.append((now, False))
+            self._prune(now)
+            # A failure after the open period (even from a caller that never
+            # claimed the probe) counts as a failed probe and re-trips.
+            self._half_open_if_due(now)
+            if self.state == self.HALF_OPEN:
+                self._trip(now)
+            elif self.state == self.CLOSED:
+                failed = sum(1 for _, ok in self._outcomes if not ok)
+                if len(self._outcomes) >= self.min_calls and failed / len(self._outcomes) >= self.failure_rate:
+                    self._trip(now)
+
+    def _trip(self, now):
+        period = min(self.open_max, self.open_base * (2 ** self._trips))
+        period *= random.uniform(0.8, 1.2)
+        self._trips += 1
+        self._open_until = now + period
+        self._probe_started = None
+        self.state = self.OPEN
+        self._stats['opened'] += 1
+        logger.warning(f"🔴 [{self.name}] Circuit open for {period:.0f}s (trip {self._trips})")
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            failed = sum(1 for _, ok in self._outcomes if not ok)
+            return dict(self._stats,
+                        state=self.state,
+                        window_calls=len(self._outcomes),
+                        window_failure_rate=round(failed / len(self._outcomes), 3) if self._outcomes else None,
+                        retry_after=self._retry_after(now) if self.state == self.OPEN else 0)
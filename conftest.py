@@ -0,0 +1,76 @@
+"""Shared pytest fixtures: a mongomock database and the Flask app wired to one."""
+
+import pytest
+from pymongo import UpdateOne, ReplaceOne
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+# test_mongodb.py is the interactive connection diagnostic, not a pytest module.
+collect_ignore = ['test_mongodb.py']
+
+
+def _bulk_write(self, requests, ordered=True, **kwargs):
+    # mongomock's bulk_write does not accept the `sort` argument newer pymongo
+    # passes along, so replay each operation as a single-document write.
+    for op in requests:
+        if isinstance(op, UpdateOne):
+            self.update_one(op._filter, op._doc, upsert=op._upsert)
+        elif isinstance(op, ReplaceOne):
+            self.replace_one(op._filter, op._doc, upsert=op._upsert)
+        else:
+            raise NotImplementedError(f"bulk {type(op).__name__}")
+
+
+if mongomock is not None:
+    mongomock.collection.Collection.bulk_write = _bulk_write
+
+
+@pytest.fixture
+def mongo_db():
+    if mongomock is None:
+        pytest.skip("mongomock is not installed")
+    return mongomock.MongoClient()['vtu_test']
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    """run_app imported against a mongomock database (in-process scraper, no browsers started)."""
+    if mongomock is None:
+        pytest.skip("mongomock is not installed")
+    import result_store
+    db = mongomock.MongoClient()['vtu_app_test']
+    original = result_store.connect
+    result_store.connect = lambda uri=None: db
+    try:
+        import run_app
+    finally:
+        result_store.connect = original
+    return run_app
+
+
+@pytest.fixture
+def client(app_module, monkeypatch):
+    """Test client over an empty database, rank tree and response cache."""
+    from response_cache import ResponseCache
+    db = app_module.students_col.database
+    for name in db.list_collection_names():
+        # The write version only moves forward, as it does in production.
+        if name != 'meta':
+            db.drop_collection(name)
+    app_module.store.ranks.rebuild([])
+    monkeypatch.setattr(app_module, 'response_cache', ResponseCache())
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def seed(app_module):
+    """Insert students as stored documents and bump the write version, like a save would."""
+    from student_store import student_doc
+
+    def insert(*students):
+        app_module.students_col.insert_many([student_doc(dict(s)) for s in students])
+        app_module.store.write_version.bump()
+    return insert
@@ -0,0 +1,127 @@
+"""
+Streaming exports of student results as CSV, NDJSON or XLSX.
+
+Rows come from a Mongo cursor read in EXPORT_BATCH_SIZE batches and are
+written out as they arrive, so memory stays flat however many students
+are exported. CSV and XLSX flatten subjects into one marks column and
+one result column per subject code; NDJSON keeps the subject list.
+
+XLSX needs xlsxwriter. Its zip container cannot be streamed, so the
+workbook is built in constant_memory mode in a temporary file and that
+file is streamed back.
+"""
+
+import io
+import os
+import csv
+import json
+import tempfile
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 500))
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+BASE_COLUMNS = ('rank', 'usn', 'name', 'total_marks', 'sgpa', 'percentage', 'class_result')
+EXPORT_FIELDS = {'_id': 0, 'usn': 1, 'name': 1, 'total_marks': 1, 'sgpa': 1, 'percentage': 1,
+                 'class_result': 1, 'subjects.code': 1, 'subjects.total': 1, 'subjects.result': 1}
+CHUNK_BYTES = 64 * 1024
+
+
+def available(fmt):
+    return fmt in EXPORT_FORMATS and (fmt != 'xlsx' or xlsxwriter is not None)
+
+
+def subject_codes(students_col, query):
+    """Sorted subject codes present in the export (one small distinct, not a scan into memory)."""
+    return sorted(code for code in students_col.distinct('subjects.code', query) if code)
+
+
+def header(codes):
+    columns = list(BASE_COLUMNS)
+    for code in codes:
+        columns += [code, f"{code} result"]
+    return columns
+
+
+def flatten(doc, codes):
+    row = [doc.get(k, '') for k in BASE_COLUMNS]
+    marks = {sub.get('code'): sub for sub in doc.get('subjects') or []}
+    for code in codes:
+        sub = marks.get(code) or {}
+        total = str(sub.get('total', ''))
+        row += [int(total) if total.isdigit() else total, sub.get('result', '')]
+    return row
+
+
+def iter_students(students_col, query, sort_spec, rank=None):
+    """Students in export order, with `rank` filled in when a rank function is given."""
+    cursor = students_col.find(query, EXPORT_FIELDS).sort(sort_spec).batch_size(EXPORT_BATCH_SIZE)
+    try:
+        for doc in cursor:
+            if rank:
+                doc['rank'] = rank(doc)
+            yield doc
+    finally:
+        cursor.close()
+
+
+# --- WRITERS ---
+def stream_csv(docs, codes):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    # BOM so Excel opens the UTF-8 names correctly.
+    buf.write('\ufeff')
+    writer.writerow(header(codes))
+    for doc in docs:
+        writer.writerow(flatten(doc, codes))
+        if buf.tell() >= CHUNK_BYTES:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def stream_ndjson(docs):
+    lines = []
+    size = 0
+    for doc in docs:
+        line = json.dumps(doc, ensure_ascii=False) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= CHUNK_BYTES:
+            yield ''.join(lines)
+            lines, size = [], 0
+    yield ''.join(lines)
+
+
+def stream_xlsx(docs, codes, sheet='Results'):
+    with tempfile.TemporaryFile() as tmp:
+        workbook = xlsxwriter.Workbook(tmp, {'constant_memory': True, 'in_memory': False})
+        worksheet = workbook.add_worksheet(sheet)
+        bold = workbook.add_format({'bold': True})
+        worksheet.write_row(0, 0, header(codes), bold)
+        worksheet.freeze_panes(1, 0)
+        for i, doc in enumerate(docs, 1):
+            worksheet.write_row(i, 0, flatten(doc, codes))
+        workbook.close()
+        tmp.seek(0)
+        while True:
+            chunk = tmp.read(CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream(fmt, docs, codes):
+    if fmt == 'csv':
+        return stream_csv(docs, codes)
+    if fmt == 'ndjson':
+        return stream_ndjson(docs)
+    return stream_xlsx(docs, codes)
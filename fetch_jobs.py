@@ -0,0 +1,121 @@
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from session_pool import PoolExhausted
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = ('done', 'failed')
+
+
+class FetchJob:
+    """One queued result fetch; `events` is the ordered list of phases it has reached."""
+
+    def __init__(self, usn):
+        self.id = uuid.uuid4().hex
+        self.usn = usn
+        self.state = 'queued'
+        self.result = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.events = [{'phase': 'queued', 'at': self.created_at}]
+
+    @property
+    def finished(self):
+        return self.state in TERMINAL_STATES
+
+    def to_dict(self, since=0):
+        return {
+            'job_id': self.id,
+            'usn': self.usn,
+            'state': self.state,
+            'phase': self.events[-1]['phase'],
+            'events': self.events[since:],
+            'result': self.result,
+        }
+
+
+class JobRegistry:
+    """
+    Runs result fetches on a bounded thread pool and tracks their progress.
+
+    `submit(usn, work)` queues `work(report)` and returns the job at once;
+    `work` calls `report(phase)` as it goes and returns the final JSON
+    payload. At most `max_pending` jobs may be queued or running; beyond
+    that `PoolExhausted` is raised. Finished jobs are kept for `ttl` seconds
+    so clients can still collect the result.
+    """
+
+    def __init__(self, max_workers=4, max_pending=32, ttl=300):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='fetch-job')
+        self._jobs = {}
+        self._active = 0
+        self._cond = threading.Condition()
+        self._stats = {'submitted': 0, 'rejected': 0, 'done': 0, 'failed': 0}
+
+    def submit(self, usn, work):
+        with self._cond:
+            self._expire()
+            if self._active >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise PoolExhausted(f"Fetch queue full ({self._active} jobs)", retry_after=5)
+            job = FetchJob(usn)
+            self._jobs[job.id] = job
+            self._active += 1
+            self._stats['submitted'] += 1
+        self._executor.submit(self._run, job, work)
+        return job
+
+    def _run(self, job, work):
+        self._advance(job, 'running', state='running')
+        try:
+            result = work(lambda phase: self._advance(job, phase))
+            state = 'done'
+        except Exception as e:
+            logger.error(f"❌ Fetch job {job.id[:8]} for {job.usn} crashed: {e}")
+            result = {'status': 'error', 'message': "Server Error. Try again."}
+            state = 'failed'
+        with self._cond:
+            job.result = result
+            job.finished_at = time.time()
+            self._active -= 1
+            self._stats[state] += 1
+        self._advance(job, state, state=state)
+
+    def _advance(self, job, phase, state=None):
+        with self._cond:
+            if state:
+                job.state = state
+            job.events.append({'phase': phase, 'at': time.time()})
+            self._cond.notify_all()
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def wait(self, job, seen, timeout):
+        """Block until the job has more than `seen` events or finishes; returns the event count."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while len(job.events) <= seen and not job.finished:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return len(job.events)
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, active=self._active, tracked=len(self._jobs))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
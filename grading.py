@@ -0,0 +1,123 @@
+"""
+Grading-scheme registry loaded from grading_schemes.json (or $GRADING_SCHEMES).
+
+Each scheme is keyed by scheme/branch/semester and carries its credit table,
+grade-point bands and class thresholds. The student's USN series picks the
+scheme; subject codes break ties when several schemes share a series.
+"""
+
+import os
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grading_schemes.json')
+GRADE_TABLE_SIZE = 201
+
+
+class GradingScheme:
+    def __init__(self, spec):
+        self.id = spec['id']
+        self.scheme = str(spec.get('scheme', ''))
+        self.branch = spec.get('branch', '')
+        self.semester = spec.get('semester')
+        self.usn_prefixes = [p.upper() for p in spec.get('usn_prefixes', [])]
+        self.max_total = spec.get('max_total', 700)
+        self.fail_below = spec.get('fail_below', 18)
+
+        # Credits match on the longest listed prefix of a subject code
+        # (e.g. "BEE755B"); results are memoized, so repeats are one dict hit.
+        self._credits = {code.upper(): c for code, c in spec.get('credits', {}).items()}
+        self._prefix_lengths = sorted({len(code) for code in self._credits}, reverse=True)
+        self._credit_memo = {}
+
+        bands = sorted(spec.get('grade_points', []), reverse=True)
+        self._grade_table = [self._band(bands, m) for m in range(GRADE_TABLE_SIZE)]
+        self._bands = bands
+        self.classes = sorted(spec.get('classes', []), reverse=True)
+
+    @staticmethod
+    def _band(bands, marks):
+        for threshold, gp in bands:
+            if marks >= threshold:
+                return gp
+        return 0
+
+    def credits(self, sub_code):
+        code = sub_code.upper().strip()
+        credit = self._credit_memo.get(code)
+        if credit is None:
+            credit = 0
+            for length in self._prefix_lengths:
+                if length <= len(code) and code[:length] in self._credits:
+                    credit = self._credits[code[:length]]
+                    break
+            self._credit_memo[code] = credit
+        return credit
+
+    @property
+    def grade_table(self):
+        """Grade point for every mark 0..GRADE_TABLE_SIZE-1, for vectorized lookups."""
+        return self._grade_table
+
+    def grade_point(self, marks):
+        try:
+            m = int(marks)
+        except (TypeError, ValueError):
+            return 0
+        if 0 <= m < GRADE_TABLE_SIZE:
+            return self._grade_table[m]
+        return self._band(self._bands, m)
+
+    def classify(self, percentage, has_fail):
+        if has_fail:
+            return "Fail"
+        for threshold, label in self.classes:
+            if percentage >= threshold:
+                return label
+        return "Fail"
+
+    def matches_usn(self, usn):
+        """Length of the longest USN prefix this scheme claims (0 if none)."""
+        usn = (usn or '').upper()
+        return max((len(p) for p in self.usn_prefixes if usn.startswith(p)), default=0)
+
+    def coverage(self, codes):
+        return sum(1 for code in codes if self.credits(code) > 0)
+
+
+class SchemeRegistry:
+    def __init__(self, schemes):
+        if not schemes:
+            raise ValueError("No grading schemes configured")
+        self.schemes = schemes
+        self.by_key = {(s.scheme, s.branch, s.semester): s for s in schemes}
+        self.default = schemes[0]
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        registry = cls([GradingScheme(spec) for spec in data.get('schemes', [])])
+        logger.info(f"🎓 Loaded {len(registry.schemes)} grading scheme(s) from {path}")
+        return registry
+
+    def get(self, scheme, branch, semester):
+        return self.by_key.get((str(scheme), branch, semester))
+
+    def select(self, usn, codes=()):
+        """Scheme for this USN; subject codes decide between schemes sharing a series."""
+        best_len = max((s.matches_usn(usn) for s in self.schemes), default=0)
+        if not best_len:
+            return None
+        candidates = [s for s in self.schemes if s.matches_usn(usn) == best_len]
+        if len(candidates) > 1 and codes:
+            return max(candidates, key=lambda s: s.coverage(codes))
+        return candidates[0]
+
+    def accepts_usn(self, usn):
+        return self.select(usn) is not None
+
+
+registry = SchemeRegistry.load(os.getenv('GRADING_SCHEMES', DEFAULT_PATH))
@@ -0,0 +1,119 @@
+import re
+import logging
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+ALERT_RE = re.compile(r"alert\(\s*(['\"])(.*?)\1\s*\)", re.S)
+
+
+class PortalError(Exception):
+    """The plain-HTTP path could not complete; callers fall back to Selenium.
+
+    `transient` marks network errors and 5xx answers, i.e. the portal itself
+    being down or overloaded rather than the page not matching what we expect.
+    """
+
+    def __init__(self, message, transient=False):
+        super().__init__(message)
+        self.transient = transient
+
+
+def is_transient(e):
+    if isinstance(e, requests.HTTPError):
+        return e.response is None or e.response.status_code >= 500
+    return True
+
+
+class HttpPortalSession:
+    """One student's portal session: a cookie jar plus the form scraped from index.php."""
+
+    def __init__(self, adapter, index_url, timeout):
+        self.index_url = index_url
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+        self.http.headers['User-Agent'] = USER_AGENT
+        self.form_action = None
+        self.form_fields = {}
+
+    def load_captcha(self):
+        """GET index.php, remember its form, and download the captcha image bytes."""
+        try:
+            resp = self.http.get(self.index_url, timeout=self.timeout)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            raise PortalError(f"Index page request failed: {e}", transient=is_transient(e))
+
+        soup = BeautifulSoup(resp.text, 'html.parser')
+        form = soup.find('form')
+        img = soup.find('img', src=lambda src: src and 'captcha' in src.lower())
+        if form is None or img is None or not form.find('input', attrs={'name': 'lns'}):
+            raise PortalError("Result form not present in static HTML (JavaScript required?)")
+
+        self.form_action = urljoin(resp.url, form.get('action') or resp.url)
+        self.form_fields = {
+            field['name']: field.get('value', '')
+            for field in form.find_all('input', attrs={'type': 'hidden'})
+            if field.get('name')
+        }
+
+        captcha_url = urljoin(resp.url, img['src'].replace('&amp;', '&'))
+        try:
+            img_resp = self.http.get(captcha_url, timeout=self.timeout, headers={'Referer': resp.url})
+            img_resp.raise_for_status()
+        except requests.RequestException as e:
+            raise PortalError(f"Captcha request failed: {e}", transient=is_transient(e))
+
+        content_type = img_resp.headers.get('Content-Type', 'image/png').split(';')[0]
+        if not content_type.startswith('image/') or len(img_resp.content) <= 100:
+            raise PortalError(f"Unexpected captcha response ({content_type}, {len(img_resp.content)} bytes)")
+        return img_resp.content, content_type
+
+    def submit(self, usn, captcha):
+        """POST the result form. Returns ('alert', message) or ('page', html)."""
+        if not self.form_action:
+            raise PortalError("Captcha was never loaded for this session")
+
+        payload = dict(self.form_fields, lns=usn, captchacode=captcha)
+        try:
+            resp = self.http.post(self.form_action, data=payload, timeout=self.timeout,
+                                  headers={'Referer': self.index_url})
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            raise PortalError(f"Result form submission failed: {e}", transient=is_transient(e))
+
+        html = resp.text
+        # VTU reports bad captcha / unknown USN as a bare <script>alert(...)</script> page.
+        if 'divTableRow' not in html:
+            match = ALERT_RE.search(html)
+            if match:
+                return 'alert', match.group(2)
+        return 'page', html
+
+    def close(self):
+        # Only drop this student's cookies; closing the Session would also
+        # close the adapter (and its connection pool) shared by every session.
+        self.http.cookies.clear()
+
+
+class HttpEngine:
+    """Builds portal sessions that share one pooled connection adapter."""
+
+    def __init__(self, index_url, timeout=15, pool_maxsize=32):
+        self.index_url = index_url
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+
+    def new_session(self):
+        return HttpPortalSession(self.adapter, self.index_url, self.timeout)
+
+    @staticmethod
+    def close_session(portal):
+        portal.close()
@@ -0,0 +1,84 @@
+"""
+Validation for results uploaded by operator machines (local_scraper.py).
+
+Uploads are a JSON array, a single JSON object, or NDJSON (one result per
+line) in the shape parse_result_page produces. Only the identifying fields
+and the subject rows are trusted: total_marks, sgpa, percentage and
+class_result are recomputed here with the same grading code the scraper
+uses, so an upload can never disagree with a scrape of the same page.
+"""
+
+import json
+import grading
+from result_parser import build_result
+
+RESULT_CODES = {'P', 'F', 'A', 'W', 'X', 'NE'}
+
+
+class InvalidRecord(ValueError):
+    pass
+
+
+def parse_body(body, content_type=''):
+    """
+    Split a request body into records. Returns a list of (record, error)
+    pairs so one malformed NDJSON line does not sink the whole upload.
+    """
+    text = body.decode('utf-8-sig') if isinstance(body, bytes) else body
+    if 'ndjson' not in content_type and 'jsonl' not in content_type:
+        try:
+            payload = json.loads(text)
+        except ValueError:
+            payload = None
+        if isinstance(payload, list):
+            return [(record, None) for record in payload]
+        if isinstance(payload, dict):
+            return [(payload, None)]
+    records = []
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            records.append((json.loads(line), None))
+        except ValueError as e:
+            records.append((None, f"Invalid JSON: {e}"))
+    return records
+
+
+def _text(value, field):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(int(value)) if float(value).is_integer() else str(value)
+    if not isinstance(value, str):
+        raise InvalidRecord(f"{field} must be a string")
+    return value.strip()
+
+
+def clean_record(record):
+    """Validated, server-scored student dict for one uploaded record; raises InvalidRecord."""
+    if not isinstance(record, dict):
+        raise InvalidRecord("Record must be an object")
+    usn = _text(record.get('usn'), 'usn').upper()
+    if not grading.registry.accepts_usn(usn):
+        raise InvalidRecord("Invalid USN Series")
+    name = _text(record.get('name'), 'name')
+    if not name or name == "Unknown":
+        raise InvalidRecord("Missing student name")
+
+    subjects = record.get('subjects')
+    if not isinstance(subjects, list) or not subjects:
+        raise InvalidRecord("subjects must be a non-empty list")
+    rows = []
+    for i, sub in enumerate(subjects):
+        if not isinstance(sub, dict):
+            raise InvalidRecord(f"subjects[{i}] must be an object")
+        code = _text(sub.get('code'), f"subjects[{i}].code").upper()
+        if not code:
+            raise InvalidRecord(f"subjects[{i}].code is empty")
+        total = _text(sub.get('total'), f"subjects[{i}].total")
+        result = _text(sub.get('result'), f"subjects[{i}].result").upper()
+        if result not in RESULT_CODES:
+            raise InvalidRecord(f"subjects[{i}].result must be one of {sorted(RESULT_CODES)}")
+        sub_name = _text(sub.get('name', ''), f"subjects[{i}].name")
+        # Same cell layout the page parsers hand to build_result.
+        rows.append([code, sub_name, '', '', total, result])
+    return build_result(usn, name, rows)
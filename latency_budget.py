@@ -0,0 +1,79 @@
+import time
+import logging
+import threading
+from collections import deque, defaultdict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds each phase of a lookup may take before we give up waiting on it.
+DEFAULT_BUDGETS = {
+    'page_load': 35.0,   # driver.get(index.php)
+    'captcha': 10.0,     # captcha <img> present and decoded
+    'submit': 10.0,      # form click until alert or result table
+    'parse': 1.0,
+    'archive': 1.0,      # compress + write the raw page
+    'store': 3.0,
+}
+
+
+def load_budgets(spec):
+    """Parse 'page_load=20,submit=8' overrides on top of DEFAULT_BUDGETS."""
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, value = item.split('=', 1)
+        try:
+            budgets[name.strip()] = float(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid latency budget: {item!r}")
+    return budgets
+
+
+class PhaseTimer:
+    """Rolling per-phase latency samples, with a warning whenever a budget is blown."""
+
+    def __init__(self, budgets, window=200):
+        self.budgets = budgets
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._over = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def budget(self, name):
+        return self.budgets.get(name, 30.0)
+
+    @contextmanager
+    def track(self, name):
+        started = time.perf_counter()
+        try:
+            yield self.budget(name)
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name, elapsed):
+        over = elapsed > self.budget(name)
+        with self._lock:
+            self._samples[name].append(elapsed)
+            if over:
+                self._over[name] += 1
+        if over:
+            logger.warning(f"⏱️ Phase '{name}' took {elapsed:.2f}s (budget {self.budget(name):.1f}s)")
+
+    def stats(self):
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+            over = dict(self._over)
+        result = {}
+        for name, samples in snapshot.items():
+            if not samples:
+                continue
+            result[name] = {
+                'count': len(samples),
+                'p50': round(samples[len(samples) // 2], 3),
+                'p95': round(samples[int(0.95 * (len(samples) - 1))], 3),
+                'max': round(samples[-1], 3),
+                'budget': self.budget(name),
+                'over_budget': over.get(name, 0),
+            }
+        return result
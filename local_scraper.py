@@ -1,102 +1,339 @@
+"""
+Scrape results on an operator's machine and upload them to the cloud app.
+
+    python local_scraper.py                       # one USN, prompted
+    python local_scraper.py 1DB22CS001-120        # a whole range
+    python local_scraper.py 1DB22CS007 1DB22CS042 --file extra_usns.txt
+
+One Chrome window is reused for the whole run; the operator only types
+captchas. Every parsed result is appended to a local NDJSON spool first,
+and a background thread uploads the spool to /submit_result in batches,
+retrying with backoff, so typing the next captcha never waits on the
+network. Re-running with the same spool skips USNs already harvested and
+resumes any upload that did not finish (`--upload-only` just flushes).
+"""
+
+import os
+import re
+import json
 import time
+import argparse
+import threading
 import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from result_parser import parse_result_page, alert_or_result
+from circuit_breaker import backoff_delay
 
 # ==============================
 # CONFIG
 # ==============================
-CLOUD_URL = "https://college-rank-list-with-sgpa.onrender.com/submit_result"
+CLOUD_URL = os.getenv('CLOUD_URL', "https://college-rank-list-with-sgpa.onrender.com/submit_result")
 VTU_URL = "https://results.vtu.ac.in/D25J26Ecbcs/index.php"
+SPOOL_FILE = "local_results.ndjson"
+UPLOAD_BATCH = 25
+IDLE_FLUSH = 30
+SUBMIT_TIMEOUT = 15
 
 
 # ==============================
 # PARSER
 # ==============================
 def parse_result(html, usn):
-    soup = BeautifulSoup(html, "html.parser")
-
-    data = {
-        "usn": usn,
-        "name": "Unknown",
-        "total_marks": 0
-    }
-
-    # Student name
-    texts = list(soup.stripped_strings)
-    for i, t in enumerate(texts):
-        if "Student Name" in t and i + 2 < len(texts):
-            data["name"] = texts[i + 2].strip()
-            break
+    # Same parser (and output schema) as the cloud app's /fetch_result.
+    return parse_result_page(html, usn)
 
-    # Total marks
-    total = 0
-    rows = soup.find_all("div", class_="divTableRow")
-    for r in rows:
-        cells = r.find_all("div", class_="divTableCell")
-        if len(cells) >= 6:
-            try:
-                total += int(cells[4].text.strip())
-            except:
-                pass
 
-    data["total_marks"] = total
-    return data
+# ==============================
+# USN LISTS
+# ==============================
+RANGE_RE = re.compile(r'^([0-9A-Z]*?)(\d+)-([0-9A-Z]*?)(\d+)$')
+
+
+def expand_usns(specs):
+    """'1DB22CS001-120' or '1DB22CS001-1DB22CS120' -> every USN in between; plain USNs pass through."""
+    usns = []
+    for spec in specs:
+        spec = spec.strip().upper()
+        if not spec or spec.startswith('#'):
+            continue
+        match = RANGE_RE.match(spec) if '-' in spec else None
+        if not match:
+            usns.append(spec)
+            continue
+        prefix, first, end_prefix, last = match.groups()
+        if end_prefix and end_prefix != prefix:
+            raise ValueError(f"Range {spec} spans two USN series")
+        width = len(first)
+        for n in range(int(first), int(last) + 1):
+            usns.append(f"{prefix}{n:0{width}d}")
+    return list(dict.fromkeys(usns))
 
 
 # ==============================
-# MAIN
+# SPOOL + BACKGROUND UPLOADER
 # ==============================
-def main():
-    print("\n🔵 Starting browser...")
+class SpoolUploader:
+    """
+    Appends results to an NDJSON spool and uploads it in batches from a
+    background thread. The byte offset of the last uploaded line is kept
+    in `<spool>.sent`, so an interrupted run resumes where it stopped.
+    """
 
-    options = Options()
-    options.add_argument("--start-maximized")
+    def __init__(self, path, url, api_key=None, batch=UPLOAD_BATCH):
+        self.path = path
+        self.offset_path = path + '.sent'
+        self.url = url
+        self.batch = batch
+        self.headers = {'Content-Type': 'application/x-ndjson'}
+        if api_key:
+            self.headers['X-API-Key'] = api_key
+        self.uploaded = 0
+        self.rejected = []
+        self.fatal = None
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="spool-uploader", daemon=True)
 
-    driver = webdriver.Chrome(options=options)
-    driver.get(VTU_URL)
+    def harvested(self):
+        """USNs already in the spool (uploaded or not)."""
+        done = set()
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        done.add(json.loads(line)['usn'])
+                    except (ValueError, KeyError):
+                        pass
+        return done
+
+    def start(self):
+        self._thread.start()
+
+    def append(self, record):
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._wake.set()
+
+    def close(self, timeout=120):
+        """Upload whatever is left, then stop."""
+        self._closing.set()
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def pending(self):
+        return max(0, self._size() - self._sent_offset())
+
+    def _size(self):
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def _sent_offset(self):
+        try:
+            with open(self.offset_path) as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _read_batch(self, offset):
+        """Up to `batch` complete lines from `offset`: (body bytes, new offset, count)."""
+        lines = []
+        with self._lock, open(self.path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                lines.append(line)
+                if len(lines) >= self.batch:
+                    break
+        body = b''.join(lines)
+        return body, offset + len(body), len(lines)
+
+    def _run(self):
+        attempt = 0
+        while not self.fatal:
+            offset = self._sent_offset()
+            body, end, count = self._read_batch(offset) if self._size() > offset else (b'', offset, 0)
+            closing = self._closing.is_set()
+            if count == 0 and closing:
+                return
+            # Full batches go straight away; a partial one is sent when closing
+            # or once no new result has arrived for IDLE_FLUSH seconds.
+            if count < self.batch and not closing:
+                woke = self._wake.wait(timeout=IDLE_FLUSH)
+                self._wake.clear()
+                if count == 0 or woke:
+                    continue
+            if self._upload(body, end, count):
+                attempt = 0
+            elif not self.fatal:
+                attempt += 1
+                time.sleep(backoff_delay(attempt, base=2, cap=60))
 
-    usn = input("Enter USN: ").strip().upper()
-    captcha = input("Enter CAPTCHA shown in browser: ").strip()
+    def _upload(self, body, end, count):
+        try:
+            resp = requests.post(self.url, data=body, headers=self.headers, timeout=30)
+        except requests.RequestException as e:
+            print(f"\n⚠️ Upload failed ({e}); {count} result(s) stay spooled, retrying")
+            return False
+        if resp.status_code == 429 or resp.status_code >= 500:
+            print(f"\n⚠️ Server busy (HTTP {resp.status_code}); retrying")
+            return False
+        # Only a processed upload (every record accepted, or each one given a
+        # status) moves the spool forward; anything else keeps it for a retry.
+        try:
+            results = resp.json().get('results') if resp.status_code in (200, 422) else None
+        except (ValueError, AttributeError):
+            results = None
+        if not isinstance(results, list) or len(results) != count:
+            self.fatal = f"HTTP {resp.status_code}: {resp.text[:200]}"
+            print(f"\n❌ Upload refused, {self.fatal}. Results stay in {self.path} (check --url / --api-key)")
+            return False
+        for entry in results:
+            if entry.get('status') == 'error':
+                self.rejected.append((entry.get('usn'), entry.get('message')))
+                print(f"\n⚠️ Server rejected {entry.get('usn')}: {entry.get('message')}")
+        with open(self.offset_path, 'w') as f:
+            f.write(str(end))
+        self.uploaded += count
+        print(f"\n☁️ Uploaded {count} result(s) ({self.uploaded} this run)")
+        return True
 
-    print("🔵 Submitting form...")
 
+# ==============================
+# BROWSER
+# ==============================
+def open_form(driver):
+    """Load a fresh form (and captcha) and wait until the USN box is there."""
+    driver.get(VTU_URL)
+    WebDriverWait(driver, 30).until(lambda d: d.find_elements(By.NAME, "lns"))
+
+
+def submit(driver, usn, captcha):
+    """Submit one lookup: ('alert', text) or ('result', html)."""
     driver.find_element(By.NAME, "lns").send_keys(usn)
     driver.find_element(By.NAME, "captchacode").send_keys(captcha)
     driver.find_element(By.XPATH, "//input[@type='submit']").click()
+    try:
+        outcome = WebDriverWait(driver, SUBMIT_TIMEOUT, poll_frequency=0.1).until(alert_or_result)
+    except TimeoutException:
+        outcome = 'timeout'
+    if outcome == 'alert':
+        alert = driver.switch_to.alert
+        text = alert.text
+        alert.accept()
+        return 'alert', text
+    html = driver.page_source
+    if len(driver.window_handles) > 1:
+        driver.close()
+        driver.switch_to.window(driver.window_handles[0])
+    return 'result', html
 
-    time.sleep(3)
 
-    html = driver.page_source
-    result = parse_result(html, usn)
+def harvest(driver, usns, spool, attempts=3):
+    """Walk the USN list, prompting for each captcha. Returns (saved, skipped)."""
+    saved, skipped = 0, []
+    for i, usn in enumerate(usns, 1):
+        for attempt in range(attempts):
+            try:
+                open_form(driver)
+            except (TimeoutException, WebDriverException) as e:
+                print(f"⚠️ Portal did not load ({e.__class__.__name__}); retrying")
+                time.sleep(backoff_delay(attempt, base=2, cap=20))
+                continue
+            captcha = input(f"[{i}/{len(usns)}] {usn} captcha (blank = skip, q = quit): ").strip()
+            if captcha.lower() == 'q':
+                return saved, skipped + usns[i - 1:]
+            if not captcha:
+                skipped.append(usn)
+                break
+            try:
+                outcome, payload = submit(driver, usn, captcha)
+            except WebDriverException as e:
+                print(f"⚠️ Browser error: {e.__class__.__name__}; try again")
+                continue
+            if outcome == 'alert':
+                print(f"❌ VTU says: {payload}")
+                if 'captcha' in payload.lower():
+                    continue
+                skipped.append(usn)
+                break
+            result = parse_result(payload, usn)
+            if result['name'] == "Unknown":
+                print(f"❌ No result table for {usn}; try again")
+                continue
+            spool.append(result)
+            saved += 1
+            print(f"✅ {result['name']} | SGPA {result['sgpa']} | {result['total_marks']} marks (spooled)")
+            break
+        else:
+            skipped.append(usn)
+    return saved, skipped
+
 
-    print("\n📦 Parsed Data:")
-    print(result)
+# ==============================
+# MAIN
+# ==============================
+def main():
+    parser = argparse.ArgumentParser(description="Harvest VTU results locally and upload them in batches.")
+    parser.add_argument('usns', nargs='*', help="USNs or ranges such as 1DB22CS001-120")
+    parser.add_argument('--file', help="File with one USN or range per line")
+    parser.add_argument('--spool', default=SPOOL_FILE, help=f"Local NDJSON spool (default {SPOOL_FILE})")
+    parser.add_argument('--url', default=CLOUD_URL, help="Upload endpoint")
+    parser.add_argument('--api-key', default=os.getenv('INGEST_API_KEY'), help="Sent as X-API-Key")
+    parser.add_argument('--batch', type=int, default=UPLOAD_BATCH, help="Results per upload")
+    parser.add_argument('--upload-only', action='store_true', help="Just upload what is spooled")
+    parser.add_argument('--redo', action='store_true', help="Scrape USNs already in the spool again")
+    args = parser.parse_args()
 
-    print("\n🌐 Uploading to cloud server...")
+    spool = SpoolUploader(args.spool, args.url, api_key=args.api_key, batch=args.batch)
+    spool.start()
 
-    try:
-        resp = requests.post(
-            CLOUD_URL,
-            json=result,
-            headers={"Content-Type": "application/json"},
-            timeout=20
-        )
-
-        print("✅ HTTP Status:", resp.status_code)
-        print("✅ Server Response:", resp.text)
-
-        if resp.status_code == 200:
-            print("\n🎉 SUCCESS: Data stored in MongoDB Atlas")
-        else:
-            print("\n❌ Upload failed")
+    if not args.upload_only:
+        specs = list(args.usns)
+        if args.file:
+            with open(args.file, encoding='utf-8') as f:
+                specs.extend(f.read().split())
+        if not specs:
+            specs = [input("Enter USN: ")]
+        usns = expand_usns(specs)
+        if not args.redo:
+            done = spool.harvested()
+            if done & set(usns):
+                print(f"⏭️ Skipping {len(done & set(usns))} USN(s) already in {args.spool}")
+            usns = [u for u in usns if u not in done]
 
-    except Exception as e:
-        print("\n❌ Network error:", e)
+        if usns:
+            print(f"\n🔵 Starting browser for {len(usns)} USN(s)...")
+            options = Options()
+            options.add_argument("--start-maximized")
+            driver = webdriver.Chrome(options=options)
+            try:
+                saved, skipped = harvest(driver, usns, spool)
+            except KeyboardInterrupt:
+                print("\n⏹️ Stopped by operator")
+                saved, skipped = None, []
+            finally:
+                driver.quit()
+            if saved is not None:
+                print(f"\n📦 Harvested {saved} result(s), skipped {len(skipped)}")
+            if skipped:
+                print("⏭️ Skipped: " + " ".join(skipped))
 
-    driver.quit()
+    if spool.pending():
+        print("\n🌐 Uploading the rest of the spool...")
+    spool.close()
+    if spool.pending():
+        print(f"\n❌ Upload incomplete; re-run with --upload-only to retry ({args.spool})")
+    else:
+        print(f"\n🎉 All results uploaded ({spool.uploaded} this run)")
+    if spool.rejected:
+        print(f"⚠️ {len(spool.rejected)} result(s) rejected by the server")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,230 @@
+"""
+Compressed, content-addressed archive of raw result pages.
+
+Every successfully parsed result page is kept so the dataset can be
+re-derived after parser or grading changes without scraping VTU again.
+Pages are stored once per content hash (sha256 of the raw HTML) and
+compressed with zstd when `zstandard` is installed, zlib otherwise. A
+Mongo index collection maps (usn, exam_session) to the current page hash.
+
+PAGE_ARCHIVE picks where the compressed blobs live:
+- 'disk':   files under PAGE_ARCHIVE_DIR (default; must be a persistent
+            volume, or redeploys leave the index pointing at lost blobs)
+- 'gridfs': GridFS bucket in the results database (what the container uses)
+- 'off':    nothing is archived
+"""
+
+import os
+import time
+import zlib
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import PyMongoError
+from result_parser import parse_result_page
+from student_store import student_doc
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+PAGE_ARCHIVE = os.getenv('PAGE_ARCHIVE', 'disk').lower()
+PAGE_ARCHIVE_DIR = os.getenv('PAGE_ARCHIVE_DIR', 'page_archive')
+PAGE_ARCHIVE_CODEC = os.getenv('PAGE_ARCHIVE_CODEC', 'zstd' if zstandard else 'zlib').lower()
+
+
+# --- CODECS ---
+def compress(raw, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(raw)
+    return zlib.compress(raw, 9)
+
+
+def decompress(blob, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+# --- BLOB BACKENDS ---
+class DiskBlobs:
+    """Blobs as files: <root>/<digest[:2]>/<digest>.<codec>"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, digest, codec):
+        return os.path.join(self.root, digest[:2], f"{digest}.{codec}")
+
+    def has(self, digest, codec):
+        return os.path.exists(self._path(digest, codec))
+
+    def put(self, digest, codec, blob):
+        path = self._path(digest, codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp, path)
+
+    def get(self, digest, codec):
+        with open(self._path(digest, codec), 'rb') as f:
+            return f.read()
+
+
+class GridFSBlobs:
+    """Blobs in a GridFS bucket, one file per digest."""
+
+    def __init__(self, db, bucket='raw_pages'):
+        import gridfs
+        self.fs = gridfs.GridFSBucket(db, bucket_name=bucket)
+        self.files = db[f'{bucket}.files']
+
+    def has(self, digest, codec):
+        return self.files.count_documents({'filename': f"{digest}.{codec}"}, limit=1) > 0
+
+    def put(self, digest, codec, blob):
+        self.fs.upload_from_stream(f"{digest}.{codec}", blob)
+
+    def get(self, digest, codec):
+        return self.fs.open_download_stream_by_name(f"{digest}.{codec}").read()
+
+
+class PageArchive:
+    def __init__(self, db, backend=PAGE_ARCHIVE, root=PAGE_ARCHIVE_DIR, codec=PAGE_ARCHIVE_CODEC):
+        self.enabled = db is not None and backend != 'off'
+        self.index_col = db['raw_pages'] if db is not None else None
+        self.codec = codec if codec != 'zstd' or zstandard else 'zlib'
+        self.blobs = None
+        if self.enabled:
+            self.blobs = GridFSBlobs(db) if backend == 'gridfs' else DiskBlobs(root)
+        self._stats = {'archived': 0, 'deduplicated': 0, 'failures': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+
+    def ensure_indexes(self):
+        if not self.enabled:
+            return
+        try:
+            self.index_col.create_index([('usn', ASCENDING), ('exam_session', ASCENDING)],
+                                        unique=True, name='usn_session')
+        except PyMongoError as e:
+            logger.error(f"❌ Page archive index not created: {e}")
+
+    def put(self, usn, exam_session, html):
+        """Archive one raw page. Never raises: a failed archive must not fail the fetch."""
+        if not self.enabled:
+            return None
+        try:
+            raw = html.encode('utf-8') if isinstance(html, str) else html
+            digest = hashlib.sha256(raw).hexdigest()
+            if self.blobs.has(digest, self.codec):
+                self._stats['deduplicated'] += 1
+            else:
+                blob = compress(raw, self.codec)
+                self.blobs.put(digest, self.codec, blob)
+                self._stats['stored_bytes'] += len(blob)
+            self.index_col.update_one(
+                {'usn': usn, 'exam_session': exam_session},
+                {'$set': {'digest': digest, 'codec': self.codec, 'size': len(raw), 'archived_at': time.time()}},
+                upsert=True)
+            self._stats['archived'] += 1
+            self._stats['raw_bytes'] += len(raw)
+            return digest
+        except Exception as e:
+            self._stats['failures'] += 1
+            logger.warning(f"⚠️ Could not archive page for {usn}: {e}")
+            return None
+
+    def get(self, usn, exam_session):
+        """Raw HTML bytes of the archived page, or None."""
+        entry = self.index_col.find_one({'usn': usn, 'exam_session': exam_session})
+        if entry is None:
+            return None
+        return decompress(self.blobs.get(entry['digest'], entry['codec']), entry['codec'])
+
+    def entries(self, exam_session=None):
+        """Index entries for one session, or for all (each USN's newest page first)."""
+        query = {'exam_session': exam_session} if exam_session else {}
+        return self.index_col.find(query, {'_id': 0}).sort([('usn', ASCENDING), ('archived_at', DESCENDING)])
+
+    def stats(self):
+        stats = dict(self._stats, enabled=self.enabled, codec=self.codec)
+        if self._stats['raw_bytes']:
+            stats['ratio'] = round(self._stats['stored_bytes'] / self._stats['raw_bytes'], 3)
+        return stats
+
+
+# --- BATCH RE-PARSE ---
+def _parse_archived(item):
+    """Worker: decompress and parse one page. Runs in a pool process."""
+    usn, exam_session, codec, blob = item
+    try:
+        data = parse_result_page(decompress(blob, codec), usn)
+    except Exception as e:
+        return usn, None, str(e)
+    if data['name'] == "Unknown":
+        return usn, None, "no result table"
+    data['exam_session'] = exam_session
+    return usn, data, None
+
+
+def reparse_all(archive, students_col, exam_session=None, workers=None, batch_size=500,
+                dry_run=False, progress=None):
+    """
+    Re-derive student documents from archived pages in a process pool.
+
+    Compressed blobs are read here and shipped to the workers, which do the
+    CPU-bound decompress + parse; parsed results are written back with one
+    unordered bulk_write per batch. With `exam_session=None` every session
+    is considered but only each USN's most recently archived page is used,
+    so an older session never overwrites a newer result. Returns counts of
+    what happened.
+    """
+    started = time.time()
+    result = {'pages': 0, 'parsed': 0, 'failed': 0, 'written': 0, 'superseded': 0}
+    failures = []
+
+    def flush(batch, pool):
+        ops = []
+        for usn, data, error in pool.map(_parse_archived, batch, chunksize=16):
+            if data is None:
+                result['failed'] += 1
+                failures.append((usn, error))
+                continue
+            result['parsed'] += 1
+            ops.append(UpdateOne({'usn': usn}, {'$set': student_doc(data)}, upsert=True))
+        if ops and not dry_run:
+            students_col.bulk_write(ops, ordered=False)
+            result['written'] += len(ops)
+        if progress:
+            progress(result['pages'], result['parsed'], result['failed'])
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        batch = []
+        last_usn = None
+        for entry in archive.entries(exam_session):
+            if entry['usn'] == last_usn:
+                result['superseded'] += 1
+                continue
+            last_usn = entry['usn']
+            result['pages'] += 1
+            try:
+                blob = archive.blobs.get(entry['digest'], entry['codec'])
+            except Exception as e:
+                result['failed'] += 1
+                failures.append((entry['usn'], f"blob missing: {e}"))
+                continue
+            batch.append((entry['usn'], entry['exam_session'], entry['codec'], blob))
+            if len(batch) >= batch_size:
+                flush(batch, pool)
+                batch = []
+        if batch:
+            flush(batch, pool)
+
+    for usn, error in failures[:20]:
+        logger.warning(f"⚠️ Re-parse failed for {usn}: {error}")
+    result['seconds'] = round(time.time() - started, 2)
+    return result
@@ -0,0 +1,127 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SGPA_SCALE = 100
+
+
+class FenwickCounter:
+    """Counts integer keys in [0, size) with O(log n) updates and prefix sums."""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+        self.total = 0
+
+    def _grow(self, key):
+        new_size = self.size
+        while key >= new_size:
+            new_size *= 2
+        counts = [self.count_at(k) for k in range(self.size)]
+        self.size = new_size
+        self.tree = [0] * (new_size + 1)
+        self.total = 0
+        for k, c in enumerate(counts):
+            if c:
+                self.add(k, c)
+
+    def add(self, key, delta=1):
+        if key >= self.size:
+            self._grow(key)
+        self.total += delta
+        i = key + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def count_le(self, key):
+        """Number of stored keys <= key."""
+        if key < 0:
+            return 0
+        i = min(key, self.size - 1) + 1
+        result = 0
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
+
+    def count_at(self, key):
+        return self.count_le(key) - self.count_le(key - 1)
+
+    def count_gt(self, key):
+        return self.total - self.count_le(key)
+
+
+def marks_key(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def sgpa_key(value):
+    try:
+        return max(0, int(round(float(value) * SGPA_SCALE)))
+    except (TypeError, ValueError):
+        return 0
+
+
+class RankService:
+    """
+    In-process order statistics over total marks and SGPA.
+
+    Rank is standard competition ranking ("1224"): one plus the number of
+    students strictly ahead, the same rule `/leaderboard` applies to ties.
+    """
+
+    METRICS = {'marks': marks_key, 'sgpa': sgpa_key}
+
+    def __init__(self, max_marks=1024):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._trees = {
+            'marks': FenwickCounter(max_marks),
+            'sgpa': FenwickCounter(10 * SGPA_SCALE + 1),
+        }
+
+    def rebuild(self, docs):
+        """Reload from an iterable of {'usn', 'total_marks', 'sgpa'} documents."""
+        fresh = RankService(max_marks=self._trees['marks'].size)
+        for doc in docs:
+            if doc.get('usn'):
+                fresh._put(doc['usn'], doc.get('total_marks'), doc.get('sgpa'))
+        with self._lock:
+            self._entries, self._trees = fresh._entries, fresh._trees
+        logger.info(f"🏁 Rank service loaded {len(self._entries)} students")
+
+    def _put(self, usn, total_marks, sgpa):
+        old = self._entries.get(usn)
+        if old:
+            for metric, key in old.items():
+                self._trees[metric].add(key, -1)
+        keys = {metric: to_key(total_marks if metric == 'marks' else sgpa)
+                for metric, to_key in self.METRICS.items()}
+        for metric, key in keys.items():
+            self._trees[metric].add(key, 1)
+        self._entries[usn] = keys
+
+    def upsert(self, usn, total_marks, sgpa):
+        with self._lock:
+            self._put(usn, total_marks, sgpa)
+
+    def remove(self, usn):
+        with self._lock:
+            old = self._entries.pop(usn, None)
+            if old:
+                for metric, key in old.items():
+                    self._trees[metric].add(key, -1)
+
+    def rank(self, metric, value):
+        """Competition rank a student with this marks/SGPA value holds."""
+        key = self.METRICS[metric](value)
+        with self._lock:
+            return self._trees[metric].count_gt(key) + 1
+
+    def __len__(self):
+        return len(self._entries)
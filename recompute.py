@@ -0,0 +1,152 @@
+"""
+Batch recompute of sgpa, percentage and class_result for stored students.
+
+Used after a grading scheme changes (credits, bands, thresholds) so stored
+documents can be brought up to date without re-scraping. Students are
+streamed in batches; each batch is grouped by grading scheme and scored as
+a marks matrix with NumPy, then written back through ordered bulk_write
+chunks. Results match result_parser.build_result for the same subjects.
+"""
+
+import time
+import logging
+import numpy as np
+from pymongo import UpdateOne
+import grading
+
+logger = logging.getLogger(__name__)
+
+PROJECTION = {'_id': 0, 'usn': 1, 'total_marks': 1, 'sgpa': 1, 'percentage': 1, 'class_result': 1,
+              'subjects.code': 1, 'subjects.total': 1, 'subjects.result': 1}
+
+
+def _marks(value):
+    value = str(value if value is not None else '')
+    return int(value) if value.isdigit() else 0
+
+
+def score_batch(scheme, docs):
+    """Recomputed {'total_marks', 'sgpa', 'percentage', 'class_result'} for each doc, in order."""
+    width = max((len(d.get('subjects') or []) for d in docs), default=0) or 1
+    n = len(docs)
+    marks = np.zeros((n, width), dtype=np.int64)
+    code_idx = np.zeros((n, width), dtype=np.int64)
+    valid = np.zeros((n, width), dtype=bool)
+    failed = np.zeros((n, width), dtype=bool)
+
+    # Index 0 is the "no subject" slot with zero credits.
+    codes = {None: 0}
+    for i, doc in enumerate(docs):
+        for j, sub in enumerate(doc.get('subjects') or []):
+            marks[i, j] = _marks(sub.get('total'))
+            code_idx[i, j] = codes.setdefault(sub.get('code') or '', len(codes))
+            valid[i, j] = True
+            failed[i, j] = sub.get('result') == 'F'
+
+    credit_vec = np.array([0] + [scheme.credits(c) for c in list(codes)[1:]], dtype=np.int64)
+    table = np.asarray(scheme.grade_table, dtype=np.int64)
+
+    credits = credit_vec[code_idx] * valid
+    # Band thresholds never exceed the table, so clipping keeps lookups exact.
+    gp = table[np.clip(marks, 0, len(table) - 1)]
+    total_credits = credits.sum(axis=1)
+    total_gp = (credits * gp).sum(axis=1)
+    total_marks = (marks * valid).sum(axis=1)
+    has_fail = ((failed | (marks < scheme.fail_below)) & valid).any(axis=1)
+
+    scored = total_credits > 0
+    sgpa = np.divide(total_gp, total_credits, out=np.zeros(n), where=scored)
+    percentage = total_marks / scheme.max_total * 100
+
+    labels = np.full(n, 'Fail', dtype=object)
+    # Walk thresholds low to high so the highest one reached wins.
+    for threshold, label in reversed(scheme.classes):
+        labels[percentage >= threshold] = label
+    labels[has_fail] = 'Fail'
+
+    results = []
+    for i in range(n):
+        row = {'total_marks': int(total_marks[i]), 'sgpa': '0.00', 'percentage': None, 'class_result': 'N/A'}
+        if scored[i]:
+            row['sgpa'] = "{:.2f}".format(sgpa[i])
+            row['percentage'] = "{:.2f}%".format(percentage[i])
+            row['class_result'] = labels[i]
+        results.append(row)
+    return results
+
+
+def update_for(doc, row):
+    """UpdateOne bringing `doc` in line with `row`, or None if nothing changed."""
+    set_fields = {}
+    for field in ('total_marks', 'sgpa', 'class_result'):
+        if doc.get(field) != row[field]:
+            set_fields[field] = row[field]
+    if 'sgpa' in set_fields:
+        set_fields['sgpa_num'] = float(row['sgpa'])
+    update = {}
+    if row['percentage'] is None:
+        if 'percentage' in doc:
+            update['$unset'] = {'percentage': ''}
+    elif doc.get('percentage') != row['percentage']:
+        set_fields['percentage'] = row['percentage']
+    if set_fields or update:
+        # Lets other processes' rank sync pick up the new values.
+        set_fields['updated_at'] = time.time()
+        update['$set'] = set_fields
+    return UpdateOne({'usn': doc['usn']}, update) if update else None
+
+
+def recompute_all(students_col, registry=None, batch_size=2000, write_chunk=500, dry_run=False, progress=None):
+    """
+    Rescore every student. Returns {'scanned', 'changed', 'unmatched', 'seconds'}.
+
+    `progress(scanned, changed)` is called after each batch. Students whose USN
+    matches no scheme are scored with the registry default, as build_result does.
+    """
+    registry = registry or grading.registry
+    started = time.perf_counter()
+    counts = {'scanned': 0, 'changed': 0, 'unmatched': 0}
+    pending = []
+
+    def flush(force=False):
+        while pending and (force or len(pending) >= write_chunk):
+            chunk = pending[:write_chunk]
+            del pending[:write_chunk]
+            if not dry_run:
+                students_col.bulk_write(chunk, ordered=True)
+
+    def score(batch):
+        groups = {}
+        for doc in batch:
+            codes = [s.get('code') for s in doc.get('subjects') or []]
+            scheme = registry.select(doc.get('usn'), codes)
+            if scheme is None:
+                counts['unmatched'] += 1
+                scheme = registry.default
+            groups.setdefault(scheme.id, (scheme, []))[1].append(doc)
+        for scheme, docs in groups.values():
+            for doc, row in zip(docs, score_batch(scheme, docs)):
+                op = update_for(doc, row)
+                if op is not None:
+                    pending.append(op)
+                    counts['changed'] += 1
+        counts['scanned'] += len(batch)
+        flush()
+        if progress:
+            progress(counts['scanned'], counts['changed'])
+
+    batch = []
+    for doc in students_col.find({}, PROJECTION, batch_size=batch_size):
+        if not doc.get('usn'):
+            continue
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            score(batch)
+            batch = []
+    if batch:
+        score(batch)
+    flush(force=True)
+
+    counts['seconds'] = round(time.perf_counter() - started, 2)
+    logger.info(f"🧮 Recomputed {counts['scanned']} students, {counts['changed']} changed in {counts['seconds']}s")
+    return counts
@@ -0,0 +1,113 @@
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+
+class WriteVersion:
+    """
+    Monotonic counter bumped on every student upsert.
+
+    The value lives in Mongo so every worker sees writes made by the others;
+    reads are served from a local copy refreshed at most every `check_interval`.
+    """
+
+    DOC_ID = 'write_version'
+
+    def __init__(self, meta_col, check_interval=1.0):
+        self.meta_col = meta_col
+        self.check_interval = check_interval
+        self._value = 0
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def bump(self):
+        doc = self.meta_col.find_one_and_update(
+            {'_id': self.DOC_ID}, {'$inc': {'value': 1}},
+            upsert=True, return_document=ReturnDocument.AFTER
+        )
+        with self._lock:
+            self._value = max(self._value, doc['value'])
+            self._checked_at = time.monotonic()
+            return self._value
+
+    def current(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._value
+            self._checked_at = now
+        try:
+            doc = self.meta_col.find_one({'_id': self.DOC_ID}) or {}
+        except Exception as e:
+            logger.warning(f"⚠️ Write version check failed: {e}")
+            return self._value
+        with self._lock:
+            self._value = max(self._value, doc.get('value', 0))
+            return self._value
+
+
+class CachedResponse:
+    __slots__ = ('version', 'body', 'mimetype', 'etag')
+
+    def __init__(self, version, body, mimetype):
+        self.version = version
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+
+
+class ResponseCache:
+    """LRU cache of rendered responses; an entry is only valid for the version it was built at."""
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stale': 0, 'not_modified': 0, 'evictions': 0}
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            if entry.version != version:
+                self._drop(key)
+                self._stats['stale'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def put(self, key, version, body, mimetype):
+        entry = CachedResponse(version, body, mimetype)
+        if len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+        return entry
+
+    def note_not_modified(self):
+        with self._lock:
+            self._stats['not_modified'] += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._bytes)
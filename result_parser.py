@@ -0,0 +1,228 @@
+"""
+Shared parser for VTU result pages, used by run_app.py and local_scraper.py.
+Also holds alert_or_result, the Selenium wait both use to tell a rendered
+result page from a portal alert.
+
+Extraction has two backends that must produce identical output:
+- 'lxml': one streaming walk over an lxml tree (fast path)
+- 'bs4':  BeautifulSoup with html.parser (fallback when lxml is missing)
+"""
+
+import os
+import logging
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoAlertPresentException, UnexpectedAlertPresentException, WebDriverException
+import grading
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+logger = logging.getLogger(__name__)
+
+SKIP_TAGS = {'script', 'style'}
+
+
+# --- GRADING ---
+def calculate_grade_point(marks, scheme=None):
+    return (scheme or grading.registry.default).grade_point(marks)
+
+
+# --- EXTRACTION BACKENDS ---
+# Each returns (name, rows) where rows are the cell texts of every
+# divTableRow with at least six divTableCells, header rows included.
+
+def _has_class(value, name):
+    return value is not None and name in value.split()
+
+def _clean_name(text):
+    return text.replace(":", "").strip()
+
+def extract_lxml(html):
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+    root = lxml.html.fromstring(html)
+
+    name = None
+    after_label = -1            # non-empty strings seen since "Student Name"
+    rows = []
+    row = None                  # cells of the divTableRow being read
+    cell = None                 # text chunks of the divTableCell being read
+    skip_depth = 0
+    cell_el = None
+
+    def feed(text):
+        nonlocal name, after_label
+        if not text:
+            return
+        if cell is not None:
+            cell.append(text)
+        if name is None:
+            stripped = text.strip()
+            if not stripped:
+                return
+            if after_label >= 0:
+                after_label += 1
+                if after_label == 2:
+                    name = _clean_name(stripped)
+            elif "Student Name" in stripped:
+                after_label = 0
+
+    for event, el in etree.iterwalk(root, events=('start', 'end')):
+        tag = el.tag
+        if not isinstance(tag, str):
+            # Comments and processing instructions: only their tail is document text.
+            if event == 'end' and not skip_depth:
+                feed(el.tail)
+            continue
+
+        if event == 'start':
+            if tag in SKIP_TAGS:
+                skip_depth += 1
+                continue
+            if skip_depth:
+                continue
+            if tag == 'div':
+                cls = el.get('class')
+                if _has_class(cls, 'divTableRow'):
+                    row = []
+                elif _has_class(cls, 'divTableCell') and row is not None and cell is None:
+                    cell = []
+                    cell_el = el
+            feed(el.text)
+        else:
+            if tag in SKIP_TAGS:
+                skip_depth -= 1
+                if not skip_depth:
+                    feed(el.tail)
+                continue
+            if skip_depth:
+                continue
+            if tag == 'div':
+                if cell is not None and el is cell_el:
+                    row.append(''.join(cell).strip())
+                    cell = None
+                elif row is not None and _has_class(el.get('class'), 'divTableRow'):
+                    if len(row) >= 6:
+                        rows.append(row)
+                    row = None
+            feed(el.tail)
+
+    return name, rows
+
+def extract_bs4(html):
+    soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, 'html.parser')
+
+    name = None
+    strings = soup.stripped_strings
+    for text in strings:
+        if "Student Name" in text:
+            next(strings, None)
+            value = next(strings, None)
+            if value is not None:
+                name = _clean_name(value)
+            break
+
+    rows = []
+    for div in soup.find_all('div', class_='divTableRow'):
+        cells = div.find_all('div', class_='divTableCell')
+        if len(cells) >= 6:
+            rows.append([c.get_text().strip() for c in cells])
+    return name, rows
+
+BACKENDS = {'bs4': extract_bs4}
+if lxml is not None:
+    BACKENDS['lxml'] = extract_lxml
+
+def default_backend():
+    wanted = os.getenv('PARSER_BACKEND', 'auto').lower()
+    if wanted in BACKENDS:
+        return wanted
+    return 'lxml' if 'lxml' in BACKENDS else 'bs4'
+
+
+# --- RESULT ASSEMBLY ---
+def build_result(usn, name, rows, scheme=None):
+    if scheme is None:
+        codes = [cells[0] for cells in rows]
+        scheme = grading.registry.select(usn, codes) or grading.registry.default
+    data = {'usn': usn, 'name': name or "Unknown", 'sgpa': "0.00", 'total_marks': 0, 'class_result': "N/A", 'subjects': []}
+    total_credits = 0
+    total_gp = 0
+    running_total = 0
+    has_fail = False
+
+    for cells in rows:
+        code = cells[0]
+        sub_name = cells[1]
+        marks = cells[4]
+        res = cells[5]
+        if not marks.isdigit():
+            # Column headings ("Subject Code ... Total ...") of each result table.
+            if code.lower() == 'subject code' or not code:
+                continue
+            marks_val = 0
+        else:
+            marks_val = int(marks)
+
+        if res == 'F' or marks_val < scheme.fail_below:
+            has_fail = True
+
+        credits = scheme.credits(code)
+        gp = scheme.grade_point(marks_val)
+
+        if credits > 0:
+            total_credits += credits
+            total_gp += (credits * gp)
+
+        running_total += marks_val
+        data['subjects'].append({'code': code, 'name': sub_name, 'total': marks, 'result': res})
+
+    data['total_marks'] = running_total
+    if total_credits > 0:
+        sgpa_val = total_gp / total_credits
+        data['sgpa'] = "{:.2f}".format(sgpa_val)
+        perc = (running_total / scheme.max_total) * 100
+        data['percentage'] = "{:.2f}%".format(perc)
+        data['class_result'] = scheme.classify(perc, has_fail)
+    return data
+
+def parse_result_page(page, usn, backend=None):
+    """Parse a result page (HTML str/bytes, or an existing BeautifulSoup) into the student dict."""
+    backend = 'bs4' if isinstance(page, BeautifulSoup) else (backend or default_backend())
+    try:
+        name, rows = BACKENDS[backend](page)
+    except Exception as e:
+        logger.error(f"Parse error ({backend}): {e}")
+        if backend == 'bs4':
+            return build_result(usn, None, [])
+        name, rows = extract_bs4(page)
+    return build_result(usn, name, rows)
+
+
+# --- BROWSER WAIT ---
+RESULT_READY_JS = """
+return document.readyState !== 'loading' && (
+    document.querySelector('.divTableRow') !== null ||
+    document.body.innerText.indexOf('Student Name') !== -1
+);
+"""
+
+def alert_or_result(driver):
+    """WebDriverWait condition: 'alert', 'result', or False to keep polling."""
+    try:
+        driver.switch_to.alert
+        return 'alert'
+    except NoAlertPresentException:
+        pass
+    try:
+        if len(driver.window_handles) > 1:
+            driver.switch_to.window(driver.window_handles[-1])
+        return 'result' if driver.execute_script(RESULT_READY_JS) else False
+    except UnexpectedAlertPresentException:
+        return 'alert'
+    except WebDriverException:
+        # Script ran mid-navigation; poll again.
+        return False
@@ -0,0 +1,234 @@
+"""
+Student results in Mongo plus every view derived from them.
+
+Shared by the web tier (reads, ranks, cache versions) and the scraper
+service (writes), which run as separate processes. Ranks are kept in an
+in-process RankService and synced from documents other processes wrote.
+
+Nothing here touches Mongo at construction: migrations and index builds
+run from `flask init-db`, and ranks plus missing views are loaded in the
+background (or by the first caller that needs them).
+"""
+
+import os
+import time
+import logging
+import threading
+from pymongo import MongoClient, UpdateOne
+from rank_service import RankService
+from student_store import ensure_indexes, save_student, student_doc, HIDDEN_FIELDS
+from result_parser import calculate_grade_point
+from response_cache import WriteVersion
+from page_archive import PageArchive
+import analysis_stats
+import subject_analytics
+
+logger = logging.getLogger(__name__)
+
+MONGO_URI = os.getenv('MONGO_URI')
+
+# Writes this recent are re-read on every rank sync, so a save that lands
+# after another process's newer save is still picked up.
+RANK_SYNC_OVERLAP = 30
+
+RANK_FIELDS = {'_id': 0, 'usn': 1, 'total_marks': 1, 'sgpa': 1}
+
+# Exam session a stored result was scraped from: the portal path segment,
+# e.g. 'D25J26Ecbcs' for https://results.vtu.ac.in/D25J26Ecbcs/.
+EXAM_SESSION = os.getenv('EXAM_SESSION') or \
+    os.getenv('VTU_BASE_URL', 'https://results.vtu.ac.in/D25J26Ecbcs/').rstrip('/').rsplit('/', 1)[-1]
+
+# Stored results younger than this are served without re-scraping.
+RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 6 * 3600))
+
+# After a failed rank load, callers skip retrying for this long instead of
+# each waiting out the server-selection timeout while Mongo is down.
+RANK_LOAD_RETRY = int(os.getenv('RANK_LOAD_RETRY', 30))
+
+
+def connect(uri=MONGO_URI):
+    """Database handle, or None if the connection fails (callers report errors per request)."""
+    if not uri:
+        logger.error("❌ MONGO_URI is not set; running without a database")
+        return None
+    try:
+        client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+        db = client['vtu_7th_sem_db']
+        logger.info("✅ Connected to MongoDB Atlas!")
+        return db
+    except Exception as e:
+        logger.error(f"❌ DB Error: {e}")
+        return None
+
+
+class ResultStore:
+    def __init__(self, db, version_check_interval=1.0):
+        self.students_col = db['students'] if db is not None else None
+        self.stats_col = db['analysis_stats'] if db is not None else None
+        self.analytics_col = db['subject_analytics'] if db is not None else None
+        self.meta_col = db['meta'] if db is not None else None
+        self.write_version = WriteVersion(self.meta_col, check_interval=version_check_interval)
+        self.pages = PageArchive(db)
+        self.ranks = RankService()
+        self._ranks_version = None
+        self._ranks_synced_at = 0.0
+        self._ranks_loaded = False
+        self._rank_load_failed_at = None
+        self._load_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._cache_stats = {'hits': 0, 'misses': 0, 'stale': 0}
+
+    # --- SETUP ---
+    def migrate(self):
+        """sgpa_num backfill and index builds (`flask init-db`). Safe to re-run."""
+        ensure_indexes(self.students_col)
+        self.pages.ensure_indexes()
+
+    def ensure_views(self):
+        """Build the materialized views if they are missing. Cheap once they exist."""
+        try:
+            analysis_stats.ensure_stats(self.students_col, self.stats_col)
+        except Exception as e:
+            logger.error(f"❌ Stats bootstrap failed: {e}")
+        try:
+            subject_analytics.ensure_analytics(self.students_col, self.analytics_col, calculate_grade_point)
+        except Exception as e:
+            logger.error(f"❌ Subject analytics bootstrap failed: {e}")
+
+    def warm_up(self):
+        """Load ranks and missing views on a background thread so worker boot never waits on Mongo."""
+        if self.students_col is None:
+            return
+
+        def run():
+            self.ensure_views()
+            self.ensure_ranks()
+
+        threading.Thread(target=run, name="store-warm-up", daemon=True).start()
+
+    # --- RANKS ---
+    def load_ranks(self):
+        version = self.write_version.current()
+        started = time.time()
+        self.ranks.rebuild(self.students_col.find({}, RANK_FIELDS))
+        self._ranks_version, self._ranks_synced_at = version, started
+        self._ranks_loaded = True
+
+    def ensure_ranks(self):
+        """Load ranks once. Concurrent callers wait for the load in progress; after a failure they skip it for RANK_LOAD_RETRY."""
+        if self._ranks_loaded or self.students_col is None:
+            return
+        with self._load_lock:
+            failed_at = self._rank_load_failed_at
+            if self._ranks_loaded or (failed_at and time.time() - failed_at < RANK_LOAD_RETRY):
+                return
+            try:
+                self.load_ranks()
+                self._rank_load_failed_at = None
+            except Exception as e:
+                self._rank_load_failed_at = time.time()
+                logger.error(f"❌ Rank load failed: {e}")
+
+    def sync_ranks(self):
+        """Fold in students written by other processes since the last sync."""
+        self.ensure_ranks()
+        if not self._ranks_loaded:
+            return
+        version = self.write_version.current()
+        if version == self._ranks_version or self.students_col is None:
+            return
+        with self._sync_lock:
+            if version == self._ranks_version:
+                return
+            started = time.time()
+            since = self._ranks_synced_at - RANK_SYNC_OVERLAP
+            try:
+                for doc in self.students_col.find({'updated_at': {'$gte': since}}, RANK_FIELDS):
+                    self.ranks.upsert(doc['usn'], doc.get('total_marks'), doc.get('sgpa'))
+            except Exception as e:
+                logger.warning(f"⚠️ Rank sync failed: {e}")
+                return
+            self._ranks_version, self._ranks_synced_at = version, started
+
+    def rank(self, metric, value):
+        self.sync_ranks()
+        return self.ranks.rank(metric, value)
+
+    # --- RESULT CACHE ---
+    def cached_result(self, usn, ttl=RESULT_CACHE_TTL):
+        """A complete stored result for `usn` scraped this exam session within `ttl`, with its current rank."""
+        doc = self.students_col.find_one({'usn': usn}, HIDDEN_FIELDS)
+        fresh = (doc is not None
+                 and doc.get('exam_session') == EXAM_SESSION
+                 and doc.get('fetched_at', 0) >= time.time() - ttl
+                 and doc.get('name') not in (None, 'Unknown')
+                 and doc.get('subjects'))
+        with self._sync_lock:
+            self._cache_stats['hits' if fresh else ('stale' if doc else 'misses')] += 1
+        if not fresh:
+            return None
+        doc['rank'] = self.rank('marks', doc.get('total_marks', 0))
+        return doc
+
+    def cache_stats(self):
+        with self._sync_lock:
+            return dict(self._cache_stats, ttl=RESULT_CACHE_TTL, exam_session=EXAM_SESSION)
+
+    # --- WRITES ---
+    def archive_page(self, usn, html):
+        """Keep the raw result page so it can be re-parsed later (see page_archive)."""
+        return self.pages.put(usn, EXAM_SESSION, html)
+
+    def persist(self, student_data):
+        """Store one parsed result and fold it into every derived view."""
+        student_data['fetched_at'] = time.time()
+        student_data['exam_session'] = EXAM_SESSION
+        previous = save_student(self.students_col, student_data)
+        self.ranks.upsert(student_data['usn'], student_data['total_marks'], student_data['sgpa'])
+        try:
+            analysis_stats.apply_change(self.stats_col, previous, student_data)
+        except Exception as e:
+            logger.error(f"❌ Stats update failed for {student_data['usn']}: {e}")
+        try:
+            subject_analytics.apply_change(self.analytics_col, previous, student_data, calculate_grade_point)
+        except Exception as e:
+            logger.error(f"❌ Subject analytics update failed for {student_data['usn']}: {e}")
+        self.write_version.bump()
+
+    def persist_many(self, records, chunk=500):
+        """
+        Bulk version of persist for uploaded results: one previous-state read
+        and one unordered bulk_write per chunk, then the derived views.
+        Returns 'created' or 'updated' for each record, in order.
+        """
+        outcomes = []
+        now = time.time()
+        for start in range(0, len(records), chunk):
+            batch = records[start:start + chunk]
+            usns = [r['usn'] for r in batch]
+            previous = {doc['usn']: doc for doc in self.students_col.find({'usn': {'$in': usns}}, {'_id': 0})}
+            ops = []
+            for student_data in batch:
+                student_data['fetched_at'] = now
+                student_data['exam_session'] = EXAM_SESSION
+                ops.append(UpdateOne({'usn': student_data['usn']}, {'$set': student_doc(student_data)}, upsert=True))
+            self.students_col.bulk_write(ops, ordered=False)
+
+            for student_data in batch:
+                usn = student_data['usn']
+                self.ranks.upsert(usn, student_data['total_marks'], student_data['sgpa'])
+                try:
+                    analysis_stats.apply_change(self.stats_col, previous.get(usn), student_data)
+                    subject_analytics.apply_change(self.analytics_col, previous.get(usn), student_data,
+                                                   calculate_grade_point)
+                except Exception as e:
+                    logger.error(f"❌ View update failed for {usn}: {e}")
+                outcomes.append('updated' if usn in previous else 'created')
+        self.write_version.bump()
+        return outcomes
+
+    def rebuild_views(self):
+        count = analysis_stats.rebuild(self.students_col, self.stats_col)
+        subject_analytics.rebuild(self.students_col, self.analytics_col, calculate_grade_point)
+        self.write_version.bump()
+        return count
@@ -0,0 +1,679 @@
+"""
+Everything that talks to the VTU portal: Chrome sessions, the HTTP engine,
+captcha capture, form submission and the fetch job queue.
+
+A `Scraper` owns the browsers it starts, so exactly one process should run
+it: either the web app itself (single worker) or scraper_service.py, which
+the web workers reach over RPC. Every public method takes and returns plain
+picklable values so both setups look the same to the caller.
+"""
+
+import os
+import time
+import base64
+import logging
+import atexit
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import UnexpectedAlertPresentException, WebDriverException, TimeoutException
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+from session_pool import SessionPool, PoolExhausted
+from browser_supervisor import BrowserSupervisor
+from http_engine import HttpEngine, PortalError
+from latency_budget import PhaseTimer, load_budgets
+from fetch_jobs import JobRegistry
+from captcha_prewarmer import CaptchaPrewarmer
+from circuit_breaker import CircuitBreaker, CircuitOpen, backoff_delay
+from result_parser import parse_result_page, alert_or_result
+import captcha_image
+
+logger = logging.getLogger(__name__)
+
+# --- PORTAL CONFIG ---
+VTU_BASE_URL = os.getenv('VTU_BASE_URL', 'https://results.vtu.ac.in/D25J26Ecbcs/')
+VTU_INDEX_URL = VTU_BASE_URL + 'index.php'
+
+# 'http' = requests only, 'selenium' = browser only, 'auto' = http with browser fallback
+FETCH_ENGINE = os.getenv('FETCH_ENGINE', 'auto').lower()
+# In 'auto', fall back to the browser only once this share of recent HTTP
+# calls failed (not on one timed-out submit), for HTTP_FALLBACK_COOLDOWN.
+HTTP_FALLBACK_COOLDOWN = int(os.getenv('HTTP_FALLBACK_COOLDOWN', 300))
+HTTP_FALLBACK_FAILURE_RATE = float(os.getenv('HTTP_FALLBACK_FAILURE_RATE', 0.5))
+HTTP_FALLBACK_MIN_CALLS = int(os.getenv('HTTP_FALLBACK_MIN_CALLS', 5))
+
+# How long a loaded captcha stays usable on the portal; warm ones older than
+# this are reloaded before being handed out.
+CAPTCHA_MAX_AGE = int(os.getenv('CAPTCHA_MAX_AGE', 180))
+
+# --- LITE MODE ---
+# Blocks stylesheets, fonts, decorative images and trackers through DevTools
+# and returns from driver.get() at DOMContentLoaded. The captcha is served by
+# a script URL (not an image extension), so it still loads. Override the
+# list with LITE_BLOCKED_URLS (comma separated, '*' wildcards), e.g. add
+# '*.js' where the portal's own scripts are not needed.
+# Off by default until it has been checked against the live portal in real
+# Chrome; set BROWSER_LITE_MODE=on to opt in.
+BROWSER_LITE_MODE = os.getenv('BROWSER_LITE_MODE', 'off').lower() in ('1', 'on', 'true', 'yes')
+DEFAULT_BLOCKED_URLS = [
+    '*.css', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico',
+    '*fonts.googleapis.com*', '*fonts.gstatic.com*',
+    '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+]
+LITE_BLOCKED_URLS = [p.strip() for p in os.getenv('LITE_BLOCKED_URLS', ','.join(DEFAULT_BLOCKED_URLS)).split(',') if p.strip()]
+
+SESSION_EXPIRED = {'status': 'error', 'message': 'Session expired. Please reload captcha.'}
+
+
+# --- BROWSER SETUP ---
+def create_driver(page_load_timeout, lite=BROWSER_LITE_MODE):
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--disable-application-cache")
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--window-size=1280,720")
+    chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36")
+
+    chrome_options.add_argument("--single-process")
+    chrome_options.add_argument("--disable-software-rasterizer")
+    chrome_options.add_argument("--disable-background-timer-throttling")
+    chrome_options.add_argument("--disable-backgrounding-occluded-windows")
+    chrome_options.add_argument("--disable-renderer-backgrounding")
+
+    if lite:
+        # Hand control back at DOMContentLoaded; callers wait for the exact
+        # element they need (captcha image, result rows) anyway.
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument("--disk-cache-size=1")
+        chrome_options.add_argument("--disable-features=Translate,OptimizationHints,MediaRouter")
+
+    chrome_paths = [
+        os.environ.get('GOOGLE_CHROME_BIN'),
+        os.environ.get('CHROME_BIN'),
+        '/app/.chrome-for-testing/chrome-linux64/chrome',
+        '/usr/bin/google-chrome-stable',
+        '/usr/bin/google-chrome',
+        '/usr/bin/chromium-browser'
+    ]
+
+    chrome_found = False
+    for path in chrome_paths:
+        if path and os.path.exists(path):
+            chrome_options.binary_location = path
+            logger.info(f"✅ Using Chrome at: {path}")
+            chrome_found = True
+            break
+
+    if not chrome_found:
+        logger.warning("⚠️ Chrome binary not found in standard locations")
+
+    driver_paths = [
+        os.environ.get('CHROMEDRIVER_PATH'),
+        '/app/.chromedriver/bin/chromedriver',
+        '/usr/local/bin/chromedriver',
+        '/usr/bin/chromedriver'
+    ]
+
+    service = None
+    for path in driver_paths:
+        if path and os.path.exists(path):
+            service = Service(path)
+            logger.info(f"✅ Using ChromeDriver: {path}")
+            break
+
+    if not service:
+        logger.info("📥 Downloading ChromeDriver via webdriver-manager...")
+        service = Service(ChromeDriverManager().install())
+
+    # Own process group for chromedriver and its Chrome children, so the
+    # supervisor can reap exactly this browser and nothing else.
+    service.popen_kw = {'start_new_session': True}
+
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    if lite and LITE_BLOCKED_URLS:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': LITE_BLOCKED_URLS})
+        except Exception as e:
+            logger.warning(f"⚠️ Resource blocking unavailable, loading full page: {e}")
+    driver.set_page_load_timeout(page_load_timeout)
+    # Explicit condition waits only: an implicit wait turns every failed
+    # lookup (e.g. probing for an alert or a missing field) into a stall.
+    driver.implicitly_wait(0)
+    return driver
+
+# Finds the captcha <img> (falling back to the first image) and returns it
+# only once it has finished decoding, so no fixed sleep is needed.
+CAPTCHA_READY_JS = """
+const imgs = Array.from(document.images);
+const img = imgs.find(i => /captcha/i.test([i.src, i.id, i.name, i.alt].join(' '))) || imgs[0];
+if (img && img.complete && img.naturalWidth > 0) {
+    img.scrollIntoView(true);
+    return img;
+}
+return null;
+"""
+
+# Copies the already-decoded captcha <img> through a canvas, so the bytes are
+# exactly what the portal served to this session without a second request
+# (which would issue a new captcha) or a screenshot.
+CAPTCHA_BYTES_JS = """
+const img = arguments[0];
+try {
+    const canvas = document.createElement('canvas');
+    canvas.width = img.naturalWidth;
+    canvas.height = img.naturalHeight;
+    canvas.getContext('2d').drawImage(img, 0, 0);
+    return canvas.toDataURL('image/png');
+} catch (e) {
+    return null;
+}
+"""
+
+def captcha_result(token, engine, image, content_type):
+    return {'status': 'success', 'token': token, 'engine': engine, 'image': image,
+            'content_type': content_type, 'captcha_id': captcha_image.captcha_id(image)}
+
+
+def portal_down(e):
+    logger.warning(f"🔴 Portal call refused: {e}")
+    return {'status': 'error', 'http_status': 503, 'retry_after': e.retry_after,
+            'message': f'VTU portal is not responding. Please try again in {e.retry_after} seconds.'}
+
+
+def busy(e):
+    logger.warning(f"⏳ {e}")
+    return {'status': 'error', 'message': 'Server busy. Please try again in a few seconds.',
+            'http_status': 503, 'retry_after': e.retry_after}
+
+
+class Scraper:
+    """
+    Portal sessions and fetch jobs for one process.
+
+    `store` is a result_store.ResultStore: fetched pages are parsed, persisted
+    and ranked through it.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # Per-phase latency budgets, e.g. LATENCY_BUDGETS="page_load=20,submit=8"
+        self.phases = PhaseTimer(load_budgets(os.getenv('LATENCY_BUDGETS')))
+
+        # --- BROWSER PROCESS SUPERVISOR ---
+        # Reaps only the chromedriver/Chrome process groups this process started.
+        self.supervisor = BrowserSupervisor(reap_timeout=float(os.getenv('BROWSER_REAP_TIMEOUT', 5)))
+
+        # --- SESSION POOL ---
+        # One browser per client session token, so concurrent students no longer
+        # share (and reset) a single global driver.
+        self.driver_pool = SessionPool(
+            factory=lambda: self.supervisor.spawn(lambda: create_driver(self.phases.budget('page_load'))),
+            closer=self.supervisor.reap,
+            max_size=int(os.getenv('DRIVER_POOL_SIZE', 4)),
+            idle_timeout=int(os.getenv('DRIVER_IDLE_TIMEOUT', 300)),
+            steal_after=int(os.getenv('DRIVER_STEAL_AFTER', 90)),
+            acquire_timeout=int(os.getenv('DRIVER_ACQUIRE_TIMEOUT', 30)),
+            name="chrome",
+        )
+
+        # --- HTTP ENGINE ---
+        # Cookie jar per student, one shared connection pool. Far lighter than a
+        # browser, so the pool can be much larger.
+        self.http_engine = HttpEngine(VTU_INDEX_URL, timeout=int(os.getenv('HTTP_TIMEOUT', 15)))
+        self.http_pool = SessionPool(
+            factory=self.http_engine.new_session,
+            closer=self.http_engine.close_session,
+            max_size=int(os.getenv('HTTP_POOL_SIZE', 200)),
+            idle_timeout=int(os.getenv('DRIVER_IDLE_TIMEOUT', 300)),
+            steal_after=int(os.getenv('DRIVER_STEAL_AFTER', 90)),
+            acquire_timeout=int(os.getenv('DRIVER_ACQUIRE_TIMEOUT', 30)),
+            name="http",
+        )
+        self.http_health = CircuitBreaker(
+            name="http-engine",
+            window=int(os.getenv('HTTP_FALLBACK_WINDOW', 120)),
+            min_calls=HTTP_FALLBACK_MIN_CALLS,
+            failure_rate=HTTP_FALLBACK_FAILURE_RATE,
+            open_base=HTTP_FALLBACK_COOLDOWN,
+            open_max=HTTP_FALLBACK_COOLDOWN * 4,
+        )
+
+        # --- PORTAL CIRCUIT BREAKER ---
+        # Shared by both engines: timeouts, network errors and 5xx answers
+        # count as failures; a wrong captcha or USN does not. While open,
+        # captcha and fetch requests fail fast with a Retry-After hint.
+        self.portal = CircuitBreaker(
+            name="vtu-portal",
+            window=int(os.getenv('PORTAL_FAILURE_WINDOW', 60)),
+            min_calls=int(os.getenv('PORTAL_MIN_CALLS', 5)),
+            failure_rate=float(os.getenv('PORTAL_FAILURE_RATE', 0.5)),
+            open_base=int(os.getenv('PORTAL_OPEN_SECONDS', 15)),
+            open_max=int(os.getenv('PORTAL_OPEN_MAX_SECONDS', 300)),
+        )
+
+        # --- CAPTCHA PRE-WARMING ---
+        # Sessions with the portal page and captcha already loaded, handed out
+        # by captcha() and replenished in the background. Only the engine
+        # currently serving captchas is kept warm.
+        self.browser_warmer = CaptchaPrewarmer(
+            self.driver_pool,
+            prepare=lambda driver: self.capture_captcha(driver, 0),
+            target=int(os.getenv('CAPTCHA_PREWARM', 2)),
+            max_age=CAPTCHA_MAX_AGE,
+            active=lambda: self.portal.available() and not self.http_engine_enabled(),
+            name="chrome",
+        )
+        self.http_warmer = CaptchaPrewarmer(
+            self.http_pool,
+            prepare=self.load_http_captcha,
+            target=int(os.getenv('HTTP_CAPTCHA_PREWARM', 4)),
+            max_age=CAPTCHA_MAX_AGE,
+            active=lambda: self.portal.available() and self.http_engine_enabled(),
+            name="http",
+        )
+
+        # Idle sessions are closed on a timer, not only when the next request
+        # happens to touch the pool, so unused Chrome processes do not linger.
+        sweep_interval = int(os.getenv('POOL_SWEEP_INTERVAL', 30))
+        self.driver_pool.start_sweeper(sweep_interval)
+        self.http_pool.start_sweeper(sweep_interval)
+
+        # --- FETCH JOBS ---
+        # A fetch only queues the scrape; a bounded thread pool runs it while
+        # clients poll the job or follow its event stream.
+        self.jobs = JobRegistry(
+            max_workers=int(os.getenv('FETCH_WORKERS', 4)),
+            max_pending=int(os.getenv('FETCH_QUEUE_SIZE', 32)),
+            ttl=int(os.getenv('FETCH_JOB_TTL', 300)),
+        )
+        atexit.register(self.shutdown)
+
+    def http_engine_enabled(self):
+        if FETCH_ENGINE == 'http':
+            return True
+        return FETCH_ENGINE == 'auto' and self.http_health.available()
+
+    def claim_http_engine(self):
+        """
+        (use_http, claim) for one captcha request. In 'auto', a tripped HTTP
+        engine gets a single half-open probe once its cooldown is over; the
+        claim goes back through `http_health.release()` when the request ends.
+        """
+        if FETCH_ENGINE != 'auto':
+            return FETCH_ENGINE == 'http', None
+        try:
+            return True, self.http_health.allow()
+        except CircuitOpen:
+            return False, None
+
+    def http_engine_failed(self, e):
+        logger.warning(f"⚠️ HTTP engine failed: {e}")
+        self.http_health.record_failure()
+        if FETCH_ENGINE == 'auto' and not self.http_health.available():
+            logger.warning("↪️ HTTP engine failing repeatedly, falling back to Selenium")
+
+    # --- CAPTCHA ---
+    def capture_captcha(self, driver, attempt):
+        """Load the portal page in `driver` and return the captcha as compact (bytes, content_type)."""
+        try:
+            result = self._capture_captcha(driver, attempt)
+        except Exception:
+            self.portal.record_failure()
+            raise
+        self.portal.record_success()
+        return result
+
+    def _capture_captcha(self, driver, attempt):
+        logger.info("📡 Loading VTU results page...")
+        with self.phases.track('page_load'):
+            driver.get(VTU_INDEX_URL)
+        logger.info("✅ Page loaded")
+
+        with self.phases.track('captcha') as budget:
+            img = WebDriverWait(driver, budget, poll_frequency=0.1).until(
+                lambda d: d.execute_script(CAPTCHA_READY_JS),
+                message="Captcha image not found or never finished loading"
+            )
+
+            image = None
+            data_url = driver.execute_script(CAPTCHA_BYTES_JS, img)
+            if data_url and data_url.startswith('data:image/png;base64,'):
+                image = base64.b64decode(data_url.split(',', 1)[1])
+            else:
+                # Canvas blocked (e.g. cross-origin image): the element alone, never the full page.
+                logger.warning("Canvas capture unavailable, taking element screenshot")
+                image = img.screenshot_as_png
+
+        if not image or len(image) <= 100:
+            raise Exception("Captcha image is empty or too small")
+
+        image, content_type = captcha_image.compact(image, 'image/png')
+        logger.info(f"✅ Captcha captured successfully (Attempt {attempt+1}, {len(image)} bytes)")
+        return image, content_type
+
+    def load_http_captcha(self, portal):
+        try:
+            image, content_type = portal.load_captcha()
+        except PortalError as e:
+            if e.transient:
+                self.portal.record_failure()
+            raise
+        self.portal.record_success()
+        self.http_health.record_success()
+        return captcha_image.compact(image, content_type)
+
+    def captcha_via_http(self, token):
+        pooled = self.http_pool.open(token)
+        try:
+            with self.http_pool.using(pooled) as portal, self.phases.track('captcha'):
+                image, content_type = self.load_http_captcha(portal)
+        except Exception:
+            self.http_pool.discard(pooled.token)
+            raise
+        logger.info(f"✅ Captcha fetched over HTTP ({len(image)} bytes)")
+        return pooled.token, image, content_type
+
+    def captcha(self, token=None):
+        """
+        Load a fresh captcha for this client session token.
+
+        Returns {'status': 'success', 'token', 'engine', 'image', 'content_type', 'captcha_id'}
+        or an error dict carrying the HTTP status to answer with.
+        """
+        self.start_prewarm()
+
+        use_http, http_claim = self.claim_http_engine()
+        try:
+            return self._captcha(token, 'http' if use_http else 'selenium')
+        finally:
+            # No-op once the HTTP engine recorded an outcome.
+            self.http_health.release(http_claim)
+
+    def _captcha(self, token, engine):
+        warm = (self.http_warmer if engine == 'http' else self.browser_warmer).take()
+        if warm:
+            self.driver_pool.discard(token)
+            self.http_pool.discard(token)
+            return captcha_result(warm.token, engine, warm.image, warm.content_type)
+
+        try:
+            claims = [self.portal.allow()]
+        except CircuitOpen as co:
+            return portal_down(co)
+        try:
+            return self.cold_captcha(token, engine, claims)
+        finally:
+            # Paths that never reached the portal (pool full, Chrome would not
+            # start) must not keep the half-open probe to themselves.
+            for claim in claims:
+                self.portal.release(claim)
+
+    def cold_captcha(self, token, engine, claims):
+        """captcha() without a warm session: HTTP first if enabled, then Selenium with retries."""
+        max_attempts = 3
+        if engine == 'http':
+            try:
+                self.driver_pool.discard(token)
+                token, image, content_type = self.captcha_via_http(token)
+                return captcha_result(token, 'http', image, content_type)
+            except PoolExhausted as pe:
+                return busy(pe)
+            except Exception as e:
+                self.http_engine_failed(e)
+                if FETCH_ENGINE == 'http':
+                    return {'status': 'error', 'http_status': 503,
+                            'message': 'Failed to load captcha. Please try again in a moment.'}
+
+        self.http_pool.discard(token)
+        for attempt in range(max_attempts):
+            try:
+                if attempt or engine == 'http':
+                    # Stop retrying (or falling back) once failures so far opened the circuit.
+                    self.portal.release(claims[-1])
+                    claims.append(self.portal.allow())
+                # Reuse this client's browser if it is still alive; a retry always
+                # starts from a fresh one.
+                pooled = self.driver_pool.lookup(token) if attempt == 0 else None
+                if pooled is None:
+                    logger.info(f"🔍 Captcha Attempt {attempt+1}/{max_attempts}: Opening browser session...")
+                    pooled = self.driver_pool.open(token)
+                token = pooled.token
+
+                with self.driver_pool.using(pooled) as driver:
+                    image, content_type = self.capture_captcha(driver, attempt)
+                return captcha_result(token, 'selenium', image, content_type)
+
+            except PoolExhausted as pe:
+                return busy(pe)
+
+            except CircuitOpen as co:
+                self.driver_pool.discard(token)
+                return portal_down(co)
+
+            except TimeoutException as te:
+                logger.error(f"❌ Timeout on attempt {attempt+1}: {str(te)}")
+                self.driver_pool.discard(token)
+
+            except WebDriverException as we:
+                logger.error(f"❌ WebDriver error on attempt {attempt+1}: {str(we)}")
+                self.driver_pool.discard(token)
+
+            except Exception as e:
+                logger.error(f"❌ Captcha Attempt {attempt+1} Failed: {str(e)}")
+                self.driver_pool.discard(token)
+
+            if attempt + 1 < max_attempts:
+                time.sleep(backoff_delay(attempt, base=1, cap=6))
+
+        logger.error("❌ All captcha attempts exhausted")
+        self.driver_pool.discard(token)
+        return {'status': 'error', 'http_status': 503,
+                'message': 'Failed to load captcha after multiple attempts. Please try again in a moment.'}
+
+    # --- RESULT FETCH ---
+    def fetch(self, token, engine, usn, captcha):
+        """Queue a result fetch on this client's portal session; returns {'status': 'queued', 'job_id'}."""
+        if engine == 'http':
+            pool, work = self.http_pool, self.fetch_via_http
+        else:
+            pool, work = self.driver_pool, self.fetch_via_selenium
+
+        pooled = pool.lookup(token)
+        if pooled is None:
+            return SESSION_EXPIRED
+
+        try:
+            claim = self.portal.allow()
+        except CircuitOpen as co:
+            return portal_down(co)
+
+        def run(report):
+            try:
+                return work(pooled, usn, captcha, report)
+            finally:
+                # No-op if the fetch recorded an outcome; frees the probe if it never reached the portal.
+                self.portal.release(claim)
+
+        try:
+            job = self.jobs.submit(usn, run)
+        except PoolExhausted as pe:
+            self.portal.release(claim)
+            return busy(pe)
+        return {'status': 'queued', 'job_id': job.id}
+
+    def job(self, job_id, seen=0, wait=0):
+        """Job state with events after the first `seen`, optionally waiting up to `wait` seconds for news."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if wait and not job.finished:
+            self.jobs.wait(job, seen, wait)
+        return job.to_dict(since=seen)
+
+    def fetch_via_selenium(self, pooled, usn, captcha, report):
+        try:
+            with self.driver_pool.using(pooled) as driver:
+                return self.submit_result_form(driver, usn, captcha, report)
+        except WebDriverException as e:
+            # Only the browser/portal side lands here; store errors are handled in submit_result_form.
+            logger.error(f"Fetch Error: {e}")
+            self.portal.record_failure()
+            self.driver_pool.discard(pooled.token)
+            return {'status': 'error', 'message': "Server Error. Try again."}
+
+    def fetch_via_http(self, pooled, usn, captcha, report):
+        try:
+            with self.http_pool.using(pooled) as portal, self.phases.track('submit'):
+                outcome, payload = portal.submit(usn, captcha)
+        except PortalError as e:
+            # The captcha belongs to this HTTP session, so the student has to reload it.
+            if e.transient:
+                self.portal.record_failure()
+            self.http_engine_failed(e)
+            self.http_pool.discard(pooled.token)
+            return SESSION_EXPIRED
+        self.portal.record_success()
+        self.http_health.record_success()
+        report('submitted')
+
+        if outcome == 'alert':
+            return {'status': 'error', 'message': f"VTU Says: {payload}"}
+
+        student_data = self.store_result_page(payload, usn, report)
+        if student_data:
+            return {'status': 'success', 'data': student_data}
+        return {'status': 'error', 'message': 'Parsing failed. Check USN/Captcha.'}
+
+    def store_result_page(self, html, usn, report=None):
+        report = report or (lambda phase: None)
+        with self.phases.track('parse'):
+            student_data = parse_result_page(html, usn)
+
+        if student_data['name'] == "Unknown":
+            return None
+        report('parsed')
+
+        with self.phases.track('archive'):
+            self.store.archive_page(usn, html)
+
+        with self.phases.track('store'):
+            self.store.persist(student_data)
+            report('stored')
+            student_data['rank'] = self.store.rank('marks', student_data['total_marks'])
+        report('ranked')
+        return student_data
+
+    def submit_result_form(self, driver, usn, captcha, report):
+        try:
+            current_url = driver.current_url
+            if "results.vtu.ac.in" not in current_url:
+                logger.warning(f"Session on wrong URL: {current_url}")
+                raise Exception("Session Timeout")
+        except:
+            logger.error("Session verification failed")
+            return SESSION_EXPIRED
+
+        usn_field = driver.find_element(By.NAME, "lns")
+        usn_field.clear()
+        usn_field.send_keys(usn)
+
+        captcha_field = driver.find_element(By.NAME, "captchacode")
+        captcha_field.clear()
+        captcha_field.send_keys(captcha)
+
+        with self.phases.track('submit') as budget:
+            try:
+                driver.find_element(By.XPATH, "//input[@type='submit']").click()
+            except UnexpectedAlertPresentException:
+                self.portal.record_success()
+                alert = driver.switch_to.alert
+                msg = alert.text
+                alert.accept()
+                driver.refresh()
+                return {'status': 'error', 'message': f"Alert: {msg}"}
+
+            # Race "VTU raised an alert" against "result page rendered" instead of
+            # sleeping and then always waiting out the alert timeout.
+            try:
+                outcome = WebDriverWait(driver, budget, poll_frequency=0.1).until(alert_or_result)
+            except TimeoutException:
+                logger.warning(f"⏱️ No alert or result table within {budget:.1f}s, parsing current page")
+                outcome = 'timeout'
+        # The portal answered (even a wrong-captcha alert is an answer).
+        if outcome == 'timeout':
+            self.portal.record_failure()
+        else:
+            self.portal.record_success()
+        report('submitted')
+
+        if outcome == 'alert':
+            alert = driver.switch_to.alert
+            msg = alert.text
+            alert.accept()
+            driver.refresh()
+            return {'status': 'error', 'message': f"VTU Says: {msg}"}
+
+        if len(driver.window_handles) > 1:
+            driver.switch_to.window(driver.window_handles[-1])
+
+        html = driver.page_source
+        try:
+            student_data = self.store_result_page(html, usn, report)
+        except Exception as e:
+            # Parse/DB trouble on our side: the portal answered and the browser is fine.
+            logger.error(f"❌ Could not store result for {usn}: {e}")
+            self.reset_result_form(driver)
+            return {'status': 'error', 'message': "Server Error. Try again."}
+
+        if student_data:
+            self.reset_result_form(driver)
+            return {'status': 'success', 'data': student_data}
+
+        return {'status': 'error', 'message': 'Parsing failed. Check USN/Captcha.'}
+
+    def reset_result_form(self, driver):
+        """Close the result window and clear the form so the session can be reused."""
+        if len(driver.window_handles) > 1:
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+        try:
+            driver.find_element(By.NAME, "lns").clear()
+            driver.find_element(By.NAME, "captchacode").clear()
+        except:
+            pass
+
+    # --- LIFECYCLE ---
+    def start_prewarm(self):
+        """Start the background warmers (idempotent; not done in __init__ so CLI commands never launch Chrome)."""
+        self.browser_warmer.start()
+        self.http_warmer.start()
+
+    def stats(self):
+        return {
+            'engine': {'mode': FETCH_ENGINE, 'http_enabled': self.http_engine_enabled(),
+                       'lite_mode': BROWSER_LITE_MODE},
+            'driver_pool': self.driver_pool.stats(),
+            'http_pool': self.http_pool.stats(),
+            'browsers': self.supervisor.stats(),
+            'phases': self.phases.stats(),
+            'fetch_jobs': self.jobs.stats(),
+            'portal_circuit': self.portal.stats(),
+            'http_engine_health': self.http_health.stats(),
+            'page_archive': self.store.pages.stats(),
+            'prewarm': {'chrome': self.browser_warmer.stats(), 'http': self.http_warmer.stats()},
+        }
+
+    def shutdown(self):
+        self.browser_warmer.stop()
+        self.http_warmer.stop()
+        self.jobs.shutdown()
+        self.driver_pool.shutdown()
+        self.http_pool.shutdown()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Scraper worker service.
+
+Runs the Scraper (Chrome sessions, HTTP portal sessions, fetch jobs) in its
+own process and serves it over multiprocessing.connection RPC, so the web
+app can run many gunicorn workers without each one starting browsers.
+
+    SCRAPER_ADDRESS=127.0.0.1:6100 SCRAPER_AUTHKEY=... python scraper_service.py
+
+The web app uses RemoteScraper when SCRAPER_ADDRESS is set and runs the
+Scraper in-process otherwise. Both sides must share SCRAPER_AUTHKEY: the
+connection protocol unpickles what clients send, so the key is what keeps
+arbitrary code off this process and there is deliberately no default.
+"""
+
+import os
+import sys
+import logging
+import threading
+from multiprocessing.connection import Listener, Client, AuthenticationError
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+SCRAPER_AUTHKEY = os.getenv('SCRAPER_AUTHKEY', '').encode()
+
+# Only these Scraper methods are reachable over RPC.
+METHODS = ('captcha', 'fetch', 'job', 'stats')
+
+# How long a web thread waits for the service to answer (on top of a
+# long-poll's own `wait`) before giving up on the call.
+SCRAPER_CALL_TIMEOUT = float(os.getenv('SCRAPER_CALL_TIMEOUT', 60))
+
+
+class ScraperUnavailable(Exception):
+    """The scraper service could not be reached or dropped the connection."""
+
+
+class ScraperError(ScraperUnavailable):
+    """The scraper service was reached but the call raised there."""
+
+
+class ScraperTimeout(ScraperUnavailable):
+    """The scraper service took the call but did not answer in time (busy or hung)."""
+
+
+def parse_address(value):
+    """'host:port' for TCP, anything else is a Unix socket path."""
+    host, sep, port = value.rpartition(':')
+    if sep and port.isdigit() and '/' not in value:
+        return (host or '127.0.0.1', int(port))
+    return value
+
+
+# --- SERVER ---
+def serve(scraper, address, authkey=SCRAPER_AUTHKEY):
+    if not authkey:
+        raise ValueError("SCRAPER_AUTHKEY must be set to serve the scraper")
+    listener = Listener(address, authkey=authkey)
+    logger.info(f"🛰️ Scraper service listening on {address}")
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, OSError, EOFError) as e:
+                logger.warning(f"⚠️ Rejected scraper client: {e}")
+                continue
+            threading.Thread(target=_handle, args=(scraper, conn), daemon=True).start()
+    finally:
+        listener.close()
+
+
+def _handle(scraper, conn):
+    with conn:
+        while True:
+            try:
+                method, args, kwargs = conn.recv()
+            except (EOFError, OSError):
+                return
+            if method not in METHODS:
+                reply = ('error', f"Unknown method {method!r}")
+            else:
+                try:
+                    reply = ('ok', getattr(scraper, method)(*args, **kwargs))
+                except Exception as e:
+                    logger.error(f"❌ Scraper call {method} failed: {e}")
+                    reply = ('error', str(e))
+            try:
+                conn.send(reply)
+            except (EOFError, OSError):
+                return
+
+
+# --- CLIENT ---
+class RemoteScraper:
+    """
+    Same interface as scraper.Scraper, forwarded to the scraper service.
+
+    Connections are reused across calls; a long-poll holds its connection
+    only for the length of the call. A call unanswered after `call_timeout`
+    seconds (plus its `wait`) raises ScraperTimeout and its connection is
+    dropped, since the late reply would otherwise answer the next call.
+    """
+
+    def __init__(self, address, authkey=SCRAPER_AUTHKEY, max_idle=16, call_timeout=SCRAPER_CALL_TIMEOUT):
+        if not authkey:
+            raise ValueError("SCRAPER_AUTHKEY must be set to use the scraper service")
+        self.address = address
+        self.authkey = authkey
+        self.max_idle = max_idle
+        self.call_timeout = call_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        try:
+            return Client(self.address, authkey=self.authkey)
+        except (OSError, EOFError, AuthenticationError) as e:
+            raise ScraperUnavailable(f"Scraper service at {self.address} unreachable: {e}")
+
+    def _call(self, method, *args, **kwargs):
+        timeout = self.call_timeout + kwargs.get('wait', 0)
+        # A pooled connection may have died with a service restart: retry once on a fresh one.
+        for attempt in range(2):
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            reused = conn is not None
+            conn = conn or self._connect()
+            try:
+                conn.send((method, args, kwargs))
+                if not conn.poll(timeout):
+                    conn.close()
+                    raise ScraperTimeout(f"Scraper service did not answer {method} within {timeout:.0f}s")
+                status, value = conn.recv()
+            except (EOFError, OSError) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue
+                raise ScraperUnavailable(f"Scraper service call {method} failed: {e}")
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+            if status == 'error':
+                raise ScraperError(f"Scraper service call {method} failed: {value}")
+            return value
+
+    def captcha(self, token=None):
+        return self._call('captcha', token)
+
+    def fetch(self, token, engine, usn, captcha):
+        return self._call('fetch', token, engine, usn, captcha)
+
+    def job(self, job_id, seen=0, wait=0):
+        return self._call('job', job_id, seen=seen, wait=wait)
+
+    def stats(self):
+        return self._call('stats')
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if not SCRAPER_AUTHKEY:
+        logger.error("❌ SCRAPER_AUTHKEY is not set; refusing to start the scraper service")
+        sys.exit(1)
+    from result_store import ResultStore, connect
+    from scraper import Scraper
+
+    store = ResultStore(connect())
+    store.ensure_ranks()
+    scraper = Scraper(store)
+    scraper.start_prewarm()
+    serve(scraper, parse_address(os.getenv('SCRAPER_ADDRESS', '127.0.0.1:6100')))
+
+
+if __name__ == '__main__':
+    main()
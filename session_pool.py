@@ -0,0 +1,238 @@
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class PoolExhausted(Exception):
+    """Raised when no session slot frees up within the acquire timeout."""
+
+    def __init__(self, message, retry_after=5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PooledSession:
+    """One browser session bound to a client token."""
+
+    def __init__(self, token, handle):
+        self.token = token
+        self.handle = handle
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.lock = threading.Lock()
+
+    @property
+    def busy(self):
+        return self.lock.locked()
+
+    def idle_for(self, now=None):
+        return (now or time.time()) - self.last_used
+
+
+class SessionPool:
+    """
+    Bounded pool of browser sessions keyed by a client session token.
+
+    `factory()` builds a new handle (e.g. a WebDriver) and `closer(handle)`
+    disposes of it. Sessions idle for longer than `idle_timeout` are evicted.
+    When the pool is full, idle sessions older than `steal_after` are
+    recycled least-recently-used first; otherwise callers wait up to
+    `acquire_timeout` for a slot before `PoolExhausted` is raised.
+    `start_sweeper()` also evicts idle sessions when no request comes in.
+    """
+
+    def __init__(self, factory, closer, max_size=4, idle_timeout=300,
+                 steal_after=90, acquire_timeout=30, name="pool"):
+        self.factory = factory
+        self.closer = closer
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.steal_after = steal_after
+        self.acquire_timeout = acquire_timeout
+        self.name = name
+
+        self._sessions = {}
+        self._pending = 0
+        self._waiting = 0
+        self._cond = threading.Condition()
+        self._sweeper = None
+        self._stopped = threading.Event()
+        self._stats = {
+            'hits': 0, 'misses': 0, 'created': 0, 'closed': 0,
+            'evicted_idle': 0, 'evicted_lru': 0, 'rejected': 0, 'waits': 0,
+        }
+
+    # --- SLOT MANAGEMENT ---
+    def _pop_evictable(self, now, wanted=0):
+        """
+        Pick expired sessions to close, plus (if full) enough stale LRU ones to
+        free `wanted` slots. Caller holds the lock.
+        """
+        victims = []
+        for token, s in list(self._sessions.items()):
+            if not s.busy and s.idle_for(now) > self.idle_timeout:
+                victims.append(self._sessions.pop(token))
+                self._stats['evicted_idle'] += 1
+
+        short = len(self._sessions) + self._pending + wanted - self.max_size
+        if short > 0:
+            candidates = sorted((s for s in self._sessions.values()
+                                 if not s.busy and s.idle_for(now) > self.steal_after),
+                                key=lambda s: s.last_used)
+            for lru in candidates[:short]:
+                victims.append(self._sessions.pop(lru.token))
+                self._stats['evicted_lru'] += 1
+        return victims
+
+    def _close_all(self, sessions):
+        for s in sessions:
+            try:
+                self.closer(s.handle)
+            except Exception as e:
+                logger.warning(f"[{self.name}] Error closing session {s.token[:8]}: {e}")
+            with self._cond:
+                self._stats['closed'] += 1
+                self._cond.notify_all()
+
+    def _reserve_slot(self):
+        deadline = time.time() + self.acquire_timeout
+        waited = False
+        try:
+            while True:
+                with self._cond:
+                    # Free a slot for this caller and for everyone already waiting,
+                    # so waiters are not served one steal per wakeup.
+                    victims = self._pop_evictable(time.time(), wanted=self._waiting + (0 if waited else 1))
+                    if len(self._sessions) + self._pending < self.max_size:
+                        self._pending += 1
+                        break
+                    if not victims:
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            self._stats['rejected'] += 1
+                            raise PoolExhausted(
+                                f"All {self.max_size} browser sessions are busy",
+                                retry_after=max(1, int(self.steal_after / 3)))
+                        if not waited:
+                            self._stats['waits'] += 1
+                            self._waiting += 1
+                            waited = True
+                        self._cond.wait(min(remaining, 1.0))
+                        continue
+                # Close outside the lock: quitting a browser can take a while.
+                self._close_all(victims)
+        finally:
+            if waited:
+                with self._cond:
+                    self._waiting -= 1
+        self._close_all(victims)
+
+    # --- PUBLIC API ---
+    def open(self, token=None):
+        """Create a fresh session for `token` (replacing any existing one)."""
+        self.discard(token)
+        self._reserve_slot()
+        try:
+            handle = self.factory()
+        except Exception:
+            with self._cond:
+                self._pending -= 1
+                self._cond.notify_all()
+            raise
+
+        session = PooledSession(token or uuid.uuid4().hex, handle)
+        with self._cond:
+            self._pending -= 1
+            self._sessions[session.token] = session
+            self._stats['created'] += 1
+        logger.info(f"🚀 [{self.name}] Session {session.token[:8]} opened ({len(self._sessions)}/{self.max_size})")
+        return session
+
+    def lookup(self, token):
+        """Return the live session for `token`, or None (counted as a miss)."""
+        with self._cond:
+            session = self._sessions.get(token) if token else None
+            if session and session.idle_for() > self.idle_timeout and not session.busy:
+                self._sessions.pop(token)
+                self._stats['evicted_idle'] += 1
+                expired = session
+                session = None
+            else:
+                expired = None
+            self._stats['hits' if session else 'misses'] += 1
+        if expired:
+            self._close_all([expired])
+        return session
+
+    def discard(self, token):
+        if not token:
+            return
+        with self._cond:
+            session = self._sessions.pop(token, None)
+        if session:
+            self._close_all([session])
+
+    @contextmanager
+    def using(self, session):
+        """Serialize use of one session and refresh its idle timer."""
+        try:
+            with session.lock:
+                session.last_used = time.time()
+                try:
+                    yield session.handle
+                finally:
+                    session.last_used = time.time()
+        finally:
+            # The session just became idle (and maybe stealable): wake waiters now.
+            with self._cond:
+                self._cond.notify_all()
+
+    def free_slots(self):
+        with self._cond:
+            return self.max_size - len(self._sessions) - self._pending
+
+    def evict_idle(self):
+        with self._cond:
+            victims = self._pop_evictable(time.time())
+        self._close_all(victims)
+        return len(victims)
+
+    def start_sweeper(self, interval=30):
+        """Run evict_idle() every `interval` seconds in the background (idempotent)."""
+        with self._cond:
+            if self._sweeper is not None or interval <= 0:
+                return
+            self._sweeper = threading.Thread(target=self._sweep, args=(interval,),
+                                             name=f"{self.name}-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep(self, interval):
+        while not self._stopped.wait(interval):
+            try:
+                evicted = self.evict_idle()
+            except Exception as e:
+                logger.warning(f"⚠️ [{self.name}] Idle sweep failed: {e}")
+                continue
+            if evicted:
+                logger.info(f"🧹 [{self.name}] Closed {evicted} idle session(s)")
+
+    def shutdown(self):
+        self._stopped.set()
+        with self._cond:
+            victims = list(self._sessions.values())
+            self._sessions.clear()
+        self._close_all(victims)
+
+    def stats(self):
+        with self._cond:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return dict(self._stats,
+                        size=len(self._sessions),
+                        pending=self._pending,
+                        busy=sum(1 for s in self._sessions.values() if s.busy),
+                        max_size=self.max_size,
+                        hit_rate=round(self._stats['hits'] / lookups, 3) if lookups else None)
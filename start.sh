@@ -0,0 +1,24 @@
+#!/usr/bin/env bash
+# Container entrypoint: the scraper service plus the gunicorn web tier.
+set -o errexit
+
+# The web workers and the scraper service authenticate each other with this
+# key. Generate a per-container one unless the deploy supplies it.
+export SCRAPER_AUTHKEY="${SCRAPER_AUTHKEY:-$(python -c 'import secrets; print(secrets.token_hex(32))')}"
+
+# Indexes and migrations run once here, not in every worker at import. A
+# database that is down must not keep the site from starting.
+flask --app run_app init-db || echo "⚠️ init-db failed; run 'flask --app run_app init-db' once Mongo is reachable" >&2
+
+# Keep the scraper service up: a crash would otherwise leave every captcha
+# answering 503 until the whole container restarts.
+(
+    set +o errexit
+    while true; do
+        python scraper_service.py
+        echo "⚠️ Scraper service exited ($?), restarting in 2s" >&2
+        sleep 2
+    done
+) &
+
+exec gunicorn --bind 0.0.0.0:$PORT --timeout 120 --workers ${WEB_WORKERS:-2} --threads ${WEB_THREADS:-8} run_app:app
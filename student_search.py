@@ -0,0 +1,72 @@
+import re
+import logging
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r'[A-Z0-9]+')
+MAX_QUERY_TOKENS = 4
+
+
+def normalize_usn(text):
+    return re.sub(r'[^A-Z0-9]', '', (text or '').upper())
+
+
+def name_tokens(name):
+    return sorted(set(TOKEN_RE.findall((name or '').upper())))
+
+
+def search_fields(doc):
+    """Derived fields stored with each student so searches hit an index."""
+    usn = normalize_usn(doc.get('usn'))
+    return {
+        'name_tokens': name_tokens(doc.get('name')),
+        'roll': usn[-3:] if usn[-3:].isdigit() else None,
+    }
+
+
+def build_search_query(search):
+    """
+    Index-friendly filter for the leaderboard search box.
+
+    - a 1-3 digit query matches the roll number (last three USN digits)
+    - otherwise the normalized text is an anchored prefix of the USN, or every
+      word is a prefix of some word in the student's name
+    User input is always escaped, so regex metacharacters match literally.
+    """
+    text = (search or '').strip().upper()
+    if not text:
+        return {}
+
+    compact = normalize_usn(text)
+    if compact.isdigit() and len(compact) <= 3:
+        return {'roll': compact.zfill(3)}
+
+    clauses = []
+    # USNs always start with a digit (1DB22CS...), names never do.
+    if compact[:1].isdigit():
+        clauses.append({'usn': {'$regex': '^' + re.escape(compact)}})
+
+    tokens = TOKEN_RE.findall(text)[:MAX_QUERY_TOKENS]
+    if tokens and not compact[:1].isdigit():
+        clauses.append({'$and': [{'name_tokens': {'$regex': '^' + re.escape(t)}} for t in tokens]})
+
+    if not clauses:
+        return {'_id': {'$exists': False}}
+    return clauses[0] if len(clauses) == 1 else {'$or': clauses}
+
+
+def ensure_search_indexes(students_col):
+    for keys, name in (([('name_tokens', ASCENDING)], 'name_tokens'), ([('roll', ASCENDING)], 'roll')):
+        try:
+            students_col.create_index(keys, name=name)
+        except PyMongoError as e:
+            logger.error(f"❌ Index {name} not created: {e}")
+
+    # Documents stored before search fields existed get them filled in once.
+    pending = students_col.find({'name_tokens': {'$exists': False}}, {'_id': 1, 'usn': 1, 'name': 1})
+    ops = [UpdateOne({'_id': d['_id']}, {'$set': search_fields(d)}) for d in pending]
+    if ops:
+        students_col.bulk_write(ops, ordered=False)
+        logger.info(f"🔎 Backfilled search fields for {len(ops)} students")
@@ -0,0 +1,93 @@
+import json
+import time
+import base64
+import logging
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+from student_search import search_fields, ensure_search_indexes
+
+logger = logging.getLogger(__name__)
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def ensure_indexes(students_col):
+    """Create the indexes the read/write paths rely on. Safe to call on every boot."""
+    # `sgpa` is stored as a display string ("8.52"); `sgpa_num` is its sortable twin.
+    try:
+        students_col.update_many(
+            {'sgpa_num': {'$exists': False}},
+            [{'$set': {'sgpa_num': {'$convert': {'input': '$sgpa', 'to': 'double', 'onError': 0.0, 'onNull': 0.0}}}}]
+        )
+    except PyMongoError as e:
+        logger.warning(f"⚠️ sgpa_num backfill skipped: {e}")
+
+    specs = [
+        ([('usn', ASCENDING)], {'unique': True, 'name': 'usn_unique'}),
+        # Leaderboard sort keys; usn breaks ties so keyset cursors are stable.
+        ([('total_marks', DESCENDING), ('usn', ASCENDING)], {'name': 'leaderboard_marks'}),
+        ([('sgpa_num', DESCENDING), ('usn', ASCENDING)], {'name': 'leaderboard_sgpa'}),
+        # Rank sync in other processes reads recent writes by this stamp.
+        ([('updated_at', ASCENDING)], {'name': 'updated_at'}),
+    ]
+    for keys, options in specs:
+        try:
+            students_col.create_index(keys, **options)
+        except PyMongoError as e:
+            logger.error(f"❌ Index {options['name']} not created: {e}")
+    ensure_search_indexes(students_col)
+    logger.info("🗂️ Student indexes ensured")
+
+
+def student_doc(student_data):
+    """The stored form of a parsed result: adds the sort, search and sync fields."""
+    return dict(student_data, sgpa_num=to_float(student_data.get('sgpa')), updated_at=time.time(),
+                **search_fields(student_data))
+
+
+def save_student(students_col, student_data):
+    """Upsert one student; returns the document as it was before (or None)."""
+    doc = student_doc(student_data)
+    return students_col.find_one_and_update(
+        {'usn': doc['usn']}, {'$set': doc},
+        projection={'_id': 0}, upsert=True, return_document=ReturnDocument.BEFORE
+    )
+
+
+# --- LEADERBOARD PAGING ---
+SORT_FIELDS = {'marks': 'total_marks', 'sgpa': 'sgpa_num'}
+
+# Internal fields kept off API responses.
+HIDDEN_FIELDS = {'_id': 0, 'sgpa_num': 0, 'name_tokens': 0, 'roll': 0, 'updated_at': 0}
+
+
+def leaderboard_sort(sort_by, order):
+    """Mongo sort spec matching the leaderboard indexes (or their reverse)."""
+    field = SORT_FIELDS.get(sort_by, 'total_marks')
+    if order == 'asc':
+        return field, [(field, ASCENDING), ('usn', DESCENDING)]
+    return field, [(field, DESCENDING), ('usn', ASCENDING)]
+
+
+def encode_cursor(doc, field):
+    raw = json.dumps([doc.get(field), doc.get('usn')]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    value, usn = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    return value, usn
+
+
+def after_cursor(field, order, cursor):
+    """Filter selecting rows strictly after the cursor position in sort order."""
+    value, usn = decode_cursor(cursor)
+    if order == 'asc':
+        return {'$or': [{field: {'$gt': value}}, {field: value, 'usn': {'$lt': usn}}]}
+    return {'$or': [{field: {'$lt': value}}, {field: value, 'usn': {'$gt': usn}}]}
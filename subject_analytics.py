@@ -0,0 +1,157 @@
+import math
+import logging
+from collections import defaultdict
+from pymongo import UpdateOne, ReplaceOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Top-scorer lists keep a few spare entries so a re-fetched student dropping
+# out does not immediately leave the visible top list short.
+TOP_KEEP = 20
+TOP_SHOW = 10
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_BUCKET = 10
+
+
+def parse_marks(value):
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def subject_entries(doc, grade_point):
+    """{code: (marks, grade_point, passed)} for every scored subject in a student document."""
+    entries = {}
+    for sub in (doc or {}).get('subjects', []):
+        code = sub.get('code')
+        marks = parse_marks(sub.get('total'))
+        if code and marks is not None and code not in entries:
+            entries[code] = (marks, grade_point(marks), sub.get('result') == 'P')
+    return entries
+
+
+def _counter_inc(inc, marks, gp, passed, sign):
+    inc['count'] = inc.get('count', 0) + sign
+    inc['passed'] = inc.get('passed', 0) + sign * int(passed)
+    inc['sum'] = inc.get('sum', 0) + sign * marks
+    inc['sum_sq'] = inc.get('sum_sq', 0) + sign * marks * marks
+    inc[f'hist.{marks}'] = inc.get(f'hist.{marks}', 0) + sign
+    inc[f'grade_points.{gp}'] = inc.get(f'grade_points.{gp}', 0) + sign
+
+
+def apply_change(analytics_col, previous, current, grade_point):
+    """Fold one upsert into the running per-subject counters."""
+    usn = (current or previous or {}).get('usn')
+    old = subject_entries(previous, grade_point)
+    new = subject_entries(current, grade_point)
+
+    ops = []
+    for code in set(old) | set(new):
+        inc = {}
+        if code in old:
+            _counter_inc(inc, *old[code], sign=-1)
+        if code in new:
+            _counter_inc(inc, *new[code], sign=1)
+        inc = {k: v for k, v in inc.items() if v}
+        if inc:
+            ops.append(UpdateOne({'_id': code}, {'$inc': inc}, upsert=True))
+        if old.get(code, (None,))[0] != new.get(code, (None,))[0]:
+            ops.append(UpdateOne({'_id': code}, {'$pull': {'top': {'usn': usn}}}))
+            if code in new:
+                entry = {'usn': usn, 'name': current.get('name'), 'marks': new[code][0]}
+                ops.append(UpdateOne({'_id': code}, {'$push': {'top': {
+                    '$each': [entry], '$sort': {'marks': -1, 'usn': 1}, '$slice': TOP_KEEP}}}))
+    if ops:
+        # Ordered: each $pull must land before the matching $push.
+        analytics_col.bulk_write(ops, ordered=True)
+
+
+def rebuild(students_col, analytics_col, grade_point):
+    docs = {}
+    count = 0
+    for student in students_col.find({}, {'_id': 0, 'usn': 1, 'name': 1, 'subjects.code': 1, 'subjects.total': 1, 'subjects.result': 1}):
+        for code, (marks, gp, passed) in subject_entries(student, grade_point).items():
+            doc = docs.setdefault(code, {'count': 0, 'passed': 0, 'sum': 0, 'sum_sq': 0,
+                                         'hist': defaultdict(int), 'grade_points': defaultdict(int), 'top': []})
+            doc['count'] += 1
+            doc['passed'] += int(passed)
+            doc['sum'] += marks
+            doc['sum_sq'] += marks * marks
+            doc['hist'][str(marks)] += 1
+            doc['grade_points'][str(gp)] += 1
+            doc['top'].append({'usn': student.get('usn'), 'name': student.get('name'), 'marks': marks})
+            if len(doc['top']) > 4 * TOP_KEEP:
+                doc['top'] = sorted(doc['top'], key=lambda e: (-e['marks'], e['usn'] or ''))[:TOP_KEEP]
+        count += 1
+
+    ops = []
+    for code, doc in docs.items():
+        doc['hist'] = dict(doc['hist'])
+        doc['grade_points'] = dict(doc['grade_points'])
+        doc['top'] = sorted(doc['top'], key=lambda e: (-e['marks'], e['usn'] or ''))[:TOP_KEEP]
+        ops.append(ReplaceOne({'_id': code}, doc, upsert=True))
+    analytics_col.delete_many({'_id': {'$nin': list(docs)}})
+    if ops:
+        analytics_col.bulk_write(ops, ordered=False)
+    logger.info(f"📈 Rebuilt analytics for {len(ops)} subjects from {count} students")
+    return count
+
+
+def ensure_analytics(students_col, analytics_col, grade_point):
+    try:
+        if analytics_col.estimated_document_count() == 0:
+            rebuild(students_col, analytics_col, grade_point)
+    except PyMongoError as e:
+        logger.error(f"❌ Subject analytics bootstrap failed: {e}")
+
+
+def summarize(doc):
+    """Turn a counters document into the distribution returned by the API."""
+    hist = sorted((int(m), n) for m, n in doc.get('hist', {}).items() if n > 0)
+    count = doc.get('count', 0)
+    summary = {
+        'code': doc['_id'],
+        'count': count,
+        'passed': doc.get('passed', 0),
+        'failed': count - doc.get('passed', 0),
+    }
+    if count <= 0 or not hist:
+        return summary
+
+    mean = doc.get('sum', 0) / count
+    variance = max(0.0, doc.get('sum_sq', 0) / count - mean * mean)
+
+    percentiles = {}
+    targets = sorted((p, max(1, math.ceil(p / 100 * count))) for p in PERCENTILES)
+    seen = 0
+    for marks, n in hist:
+        seen += n
+        while targets and seen >= targets[0][1]:
+            percentiles[f'p{targets[0][0]}'] = marks
+            targets.pop(0)
+
+    buckets = defaultdict(int)
+    for marks, n in hist:
+        low = (marks // HISTOGRAM_BUCKET) * HISTOGRAM_BUCKET
+        buckets[f'{low}-{low + HISTOGRAM_BUCKET - 1}'] += n
+
+    summary.update({
+        'mean': round(mean, 2),
+        'std_dev': round(math.sqrt(variance), 2),
+        'median': percentiles.get('p50'),
+        'min': hist[0][0],
+        'max': hist[-1][0],
+        'percentiles': percentiles,
+        'histogram': dict(buckets),
+        'grade_points': {gp: n for gp, n in sorted(doc.get('grade_points', {}).items(),
+                                                   key=lambda item: -int(item[0])) if n > 0},
+        'top_scorers': doc.get('top', [])[:TOP_SHOW],
+    })
+    return summary
+
+
+def read(analytics_col, code=None):
+    query = {'_id': code} if code else {}
+    return [summarize(doc) for doc in analytics_col.find(query).sort('_id', 1)]
@@ -0,0 +1,59 @@
+"""Materialized /get_analysis statistics stay equal to a full rebuild (run with pytest)."""
+
+import random
+import analysis_stats
+from result_parser import build_result
+
+CODES = ['BCS701', 'BCS702', 'BCS703', 'BCS714', 'BEE755B', 'BCS786']
+CATEGORIES = ['overall_fail', 'fcd', 'fc', 'sc'] + CODES
+
+
+def student(rng, i):
+    rows = [[code, code, '', '', str(rng.choice([rng.randint(5, 40), rng.randint(40, 100)])),
+             rng.choice(['P', 'P', 'P', 'F'])] for code in CODES]
+    return build_result(f'1DB22CS{i:03d}', f'STUDENT {i}', rows)
+
+
+def views(stats_col):
+    return {c: analysis_stats.read_category(stats_col, c) for c in CATEGORIES}
+
+
+def test_incremental_updates_match_rebuild(mongo_db):
+    rng = random.Random(7)
+    students, live = mongo_db['students'], mongo_db['analysis_stats']
+    stored = {}
+    # New students, then re-fetches that change their marks (pass <-> fail, class moves).
+    for step in range(120):
+        i = step if step < 60 else rng.randrange(60)
+        doc = student(rng, i)
+        analysis_stats.apply_change(live, stored.get(doc['usn']), doc)
+        stored[doc['usn']] = doc
+        students.replace_one({'usn': doc['usn']}, dict(doc), upsert=True)
+
+    rebuilt = mongo_db['analysis_stats_rebuilt']
+    assert analysis_stats.rebuild(students, rebuilt) == 60
+    assert views(live) == views(rebuilt)
+    stats, failed = analysis_stats.read_category(live, 'overall_fail')
+    assert stats['total'] == 60 and stats['failed'] == len(failed)
+
+
+def test_category_query_selects_the_same_students(mongo_db):
+    rng = random.Random(3)
+    students, stats_col = mongo_db['students'], mongo_db['analysis_stats']
+    for i in range(40):
+        doc = student(rng, i)
+        students.insert_one(dict(doc))
+    analysis_stats.rebuild(students, stats_col)
+    for category in CATEGORIES:
+        _, rows = analysis_stats.read_category(stats_col, category)
+        exported = sorted(d['usn'] for d in students.find(analysis_stats.category_query(category)))
+        assert exported == [r['usn'] for r in rows], category
+
+
+def test_missing_stats_are_built_on_demand(mongo_db):
+    students, stats_col = mongo_db['students'], mongo_db['analysis_stats']
+    students.insert_one(build_result('1DB22CS001', 'A', [['BCS701', 'X', '', '', '10', 'F']]))
+    analysis_stats.ensure_stats(students, stats_col)
+    stats, rows = analysis_stats.read_category(stats_col, 'overall_fail')
+    assert stats == {'total': 1, 'passed': 0, 'failed': 1}
+    assert rows[0]['fail_summary'] == 'BCS701'
@@ -0,0 +1,40 @@
+"""Parser benchmark and regression harness (run with pytest)."""
+
+import json
+import random
+import pytest
+import result_parser
+import bench_parser
+
+
+def run_main(monkeypatch, *args):
+    monkeypatch.setattr('sys.argv', ['bench_parser.py', '--iterations', '20', '--synthetic', '10', *args])
+    bench_parser.main()
+
+
+def test_corpus_passes_on_every_backend():
+    cases = bench_parser.saved_cases() + bench_parser.synthetic_cases(random.Random(1), 25)
+    assert bench_parser.check_corpus(cases, sorted(result_parser.BACKENDS)) == []
+
+
+def test_corpus_check_reports_disagreement_and_wrong_fields(monkeypatch):
+    def lossy(html):
+        name, rows = result_parser.extract_bs4(html)
+        return name, rows[:-1]
+    monkeypatch.setitem(result_parser.BACKENDS, 'lossy', lossy)
+    cases = bench_parser.synthetic_cases(random.Random(1), 1)
+    failures = bench_parser.check_corpus(cases, ['lossy', 'bs4'])
+    assert any('bs4 differs from lossy' in f for f in failures)
+    assert any('subjects =' in f for f in failures)
+
+
+def test_saves_a_baseline_then_fails_a_throughput_regression(monkeypatch, tmp_path, capsys):
+    baseline = tmp_path / 'baseline.json'
+    run_main(monkeypatch, '--baseline', str(baseline), '--save-baseline', '--backend', 'bs4')
+    assert json.loads(baseline.read_text())['bs4']['pages_per_sec'] > 0
+
+    baseline.write_text(json.dumps({'bs4': {'pages_per_sec': 1e12}}))
+    with pytest.raises(SystemExit) as exc:
+        run_main(monkeypatch, '--baseline', str(baseline), '--backend', 'bs4')
+    assert exc.value.code == 1
+    assert 'below' in capsys.readouterr().out
@@ -0,0 +1,79 @@
+"""Captcha re-encoding and the raw-bytes /get_captcha response."""
+
+import io
+import pytest
+from PIL import Image, ImageDraw
+
+import captcha_image
+from scraper import captcha_result
+
+
+def portal_captcha():
+    """A white 200x60 RGB captcha with dark text in the middle, as the portal draws it."""
+    img = Image.new('RGB', (200, 60), 'white')
+    draw = ImageDraw.Draw(img)
+    draw.text((70, 20), 'A7xK2', fill=(20, 40, 120))
+    draw.line((60, 35, 140, 25), fill=(200, 30, 30), width=2)
+    out = io.BytesIO()
+    img.save(out, format='PNG', compress_level=0)
+    return out.getvalue()
+
+
+def test_gray_encoding_is_smaller_and_cropped(monkeypatch):
+    monkeypatch.setattr(captcha_image, 'CAPTCHA_ENCODING', 'gray')
+    original = portal_captcha()
+    data, content_type = captcha_image.compact(original, 'image/png')
+    assert content_type == 'image/png'
+    assert len(data) < len(original)
+    with Image.open(io.BytesIO(data)) as out:
+        assert out.mode == 'P'
+        assert out.width < 200 and out.height < 60
+
+
+def test_original_encoding_passes_bytes_through(monkeypatch):
+    monkeypatch.setattr(captcha_image, 'CAPTCHA_ENCODING', 'original')
+    original = portal_captcha()
+    assert captcha_image.compact(original, 'image/jpeg') == (original, 'image/jpeg')
+
+
+def test_undecodable_bytes_are_sent_unchanged(monkeypatch):
+    monkeypatch.setattr(captcha_image, 'CAPTCHA_ENCODING', 'gray')
+    assert captcha_image.compact(b'not an image' * 20, 'image/png') == (b'not an image' * 20, 'image/png')
+
+
+def test_captcha_id_tracks_content():
+    first, second = portal_captcha(), portal_captcha() + b'\0'
+    assert captcha_image.captcha_id(first) == captcha_image.captcha_id(first)
+    assert captcha_image.captcha_id(first) != captcha_image.captcha_id(second)
+    assert len(captcha_image.captcha_id(first)) == 16
+
+
+class StubScraper:
+    def __init__(self, result):
+        self.result = result
+        self.tokens = []
+
+    def captcha(self, token=None):
+        self.tokens.append(token)
+        return self.result
+
+
+def test_get_captcha_serves_raw_bytes(client, app_module, monkeypatch):
+    image = portal_captcha()
+    stub = StubScraper(captcha_result('tok-1', 'http', image, 'image/png'))
+    monkeypatch.setattr(app_module, 'scraper', stub)
+    response = client.get('/get_captcha')
+    assert response.status_code == 200
+    assert response.data == image
+    assert response.headers['Content-Type'] == 'image/png'
+    assert response.headers['X-Captcha-Id'] == captcha_image.captcha_id(image)
+    assert response.headers['Cache-Control'] == 'no-store'
+    client.get('/get_captcha')
+    assert stub.tokens == [None, 'tok-1']
+
+
+def test_get_captcha_error_is_json(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'scraper', StubScraper({'status': 'error', 'message': 'Portal down'}))
+    response = client.get('/get_captcha')
+    assert response.status_code == 503
+    assert response.get_json() == {'error': 'Portal down'}
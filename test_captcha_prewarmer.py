@@ -0,0 +1,90 @@
+"""CaptchaPrewarmer stock handling, driven step by step without its thread."""
+
+import pytest
+from session_pool import SessionPool
+from captcha_prewarmer import CaptchaPrewarmer
+
+
+def make_warmer(max_size=3, **kw):
+    closed = []
+    pool = SessionPool(factory=object, closer=closed.append, max_size=max_size, name='test')
+    loads = []
+
+    def prepare(handle):
+        loads.append(handle)
+        return b'img%d' % len(loads), 'image/png'
+
+    warmer = CaptchaPrewarmer(pool, prepare, name='test', **kw)
+    return warmer, pool, loads, closed
+
+
+def fill(warmer):
+    while warmer._top_up():
+        pass
+
+
+def test_top_up_leaves_headroom():
+    warmer, pool, loads, _ = make_warmer(max_size=3, target=5, headroom=1)
+    fill(warmer)
+    assert len(loads) == 2
+    assert pool.free_slots() == 1
+    assert warmer.stats()['warmed'] == 2
+
+
+def test_take_serves_oldest_then_reports_empty():
+    warmer, pool, loads, _ = make_warmer(target=2, headroom=0)
+    fill(warmer)
+    first = warmer.take()
+    assert first.image == b'img1' and pool.lookup(first.token) is not None
+    assert warmer.take().image == b'img2'
+    assert warmer.take() is None
+    stats = warmer.stats()
+    assert (stats['served'], stats['empty'], stats['ready']) == (2, 1, 0)
+
+
+def test_stale_captcha_is_reloaded_on_the_same_session():
+    warmer, pool, loads, closed = make_warmer(target=1, headroom=0, max_age=60)
+    fill(warmer)
+    entry = warmer._ready[0]
+    entry.ready_at -= 120
+    assert warmer.take() is None
+    assert warmer._refresh_expired()
+    fresh = warmer.take()
+    assert fresh.token == entry.token
+    assert fresh.image == b'img2'
+    assert closed == []
+    assert warmer.stats()['refreshed'] == 1
+
+
+def test_inactive_warmer_neither_warms_nor_keeps_stale_sessions():
+    active = [True]
+    warmer, pool, loads, closed = make_warmer(target=1, headroom=0, max_age=60, active=lambda: active[0])
+    fill(warmer)
+    active[0] = False
+    warmer._ready[0].ready_at -= 120
+    assert warmer._refresh_expired()
+    assert len(closed) == 1 and pool.free_slots() == 3
+    assert not warmer._top_up()
+    assert len(loads) == 1
+
+
+def test_session_closed_elsewhere_counts_as_lost():
+    warmer, pool, loads, _ = make_warmer(target=1, headroom=0)
+    fill(warmer)
+    pool.discard(warmer._ready[0].token)
+    assert warmer.take() is None
+    assert warmer.stats()['lost'] == 1
+
+
+def test_failed_prepare_discards_the_session():
+    warmer, pool, _, closed = make_warmer(target=1, headroom=0)
+
+    def broken(handle):
+        raise RuntimeError('portal down')
+
+    warmer.prepare = broken
+    with pytest.raises(RuntimeError):
+        warmer._top_up()
+    assert len(closed) == 1
+    assert pool.free_slots() == 3
+    assert warmer.stats()['ready'] == 0
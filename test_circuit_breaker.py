@@ -0,0 +1,163 @@
+"""CircuitBreaker state transitions (run with pytest)."""
+
+import pytest
+import circuit_breaker
+from circuit_breaker import CircuitBreaker, CircuitOpen
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'time', lambda: now[0])
+    monkeypatch.setattr(circuit_breaker.random, 'uniform', lambda a, b: 1.0)
+    return now
+
+
+def breaker(**kw):
+    return CircuitBreaker(name='test', window=60, min_calls=4, failure_rate=0.5, open_base=10, open_max=40, **kw)
+
+
+def test_trips_on_failure_rate_not_single_error(clock):
+    cb = breaker()
+    cb.record_failure()
+    cb.record_success()
+    cb.record_failure()
+    assert cb.state == cb.CLOSED
+    cb.record_failure()
+    assert cb.state == cb.OPEN
+    with pytest.raises(CircuitOpen) as exc:
+        cb.allow()
+    assert exc.value.retry_after == 10
+
+
+def test_old_outcomes_leave_the_window(clock):
+    cb = breaker()
+    for _ in range(3):
+        cb.record_failure()
+    clock[0] += 61
+    cb.record_failure()
+    assert cb.state == cb.CLOSED
+
+
+def test_half_open_single_probe_then_close(clock):
+    cb = breaker()
+    for _ in range(4):
+        cb.record_failure()
+    clock[0] += 10
+    claim = cb.allow()
+    assert claim and cb.state == cb.HALF_OPEN
+    with pytest.raises(CircuitOpen):
+        cb.allow()
+    cb.record_success()
+    assert cb.state == cb.CLOSED
+    assert cb.allow() is None
+
+
+def test_failed_probe_doubles_open_period(clock):
+    cb = breaker()
+    for _ in range(4):
+        cb.record_failure()
+    clock[0] += 10
+    cb.allow()
+    cb.record_failure()
+    assert cb.state == cb.OPEN
+    assert cb.stats()['retry_after'] == 20
+
+
+def test_released_probe_can_be_claimed_again(clock):
+    cb = breaker()
+    for _ in range(4):
+        cb.record_failure()
+    clock[0] += 10
+    claim = cb.allow()
+    assert not cb.available()
+    cb.release(claim)
+    assert cb.available()
+    assert cb.allow()
+
+
+def test_stale_probe_times_out(clock):
+    cb = breaker(probe_timeout=30)
+    for _ in range(4):
+        cb.record_failure()
+    clock[0] += 10
+    cb.allow()
+    clock[0] += 31
+    assert cb.allow()
+
+
+# --- PORTAL ACCOUNTING ON SELENIUM FETCHES ---
+from types import SimpleNamespace
+from selenium.common.exceptions import NoAlertPresentException, WebDriverException
+import scraper
+from bench_parser import result_page
+
+
+class FakeDriver:
+    current_url = 'https://results.vtu.ac.in/resultpage'
+    window_handles = ['form']
+
+    def __init__(self, page_source, broken=False):
+        self.page_source = page_source
+        self.broken = broken
+        self.switch_to = NoAlert()
+
+    def find_element(self, by, value):
+        if self.broken:
+            raise WebDriverException('chrome not reachable')
+        return SimpleNamespace(clear=lambda: None, send_keys=lambda text: None, click=lambda: None)
+
+    def execute_script(self, script, *args):
+        return True
+
+
+class NoAlert:
+    @property
+    def alert(self):
+        raise NoAlertPresentException()
+
+    def window(self, handle):
+        pass
+
+
+class FailingStore:
+    def archive_page(self, usn, html):
+        pass
+
+    def persist(self, student):
+        raise RuntimeError('mongo down')
+
+
+@pytest.fixture
+def selenium_scraper(monkeypatch):
+    s = scraper.Scraper(store=FailingStore())
+    closed = []
+    monkeypatch.setattr(s.driver_pool, 'closer', closed.append)
+    s.closed = closed
+    yield s
+    s.shutdown()
+
+
+def fetch_with(s, driver):
+    s.driver_pool.factory = lambda: driver
+    pooled = s.driver_pool.open('tok')
+    return s.fetch_via_selenium(pooled, '1DB22CS007', 'ABC12', lambda phase: None)
+
+
+def test_store_error_keeps_browser_and_breaker(selenium_scraper):
+    driver = FakeDriver(result_page('1DB22CS007', 'ANANYA RAO', [['BCS701', 'IOT', 45, 48, 93, 'P']]))
+    result = fetch_with(selenium_scraper, driver)
+    assert result == {'status': 'error', 'message': 'Server Error. Try again.'}
+    stats = selenium_scraper.portal.stats()
+    assert (stats['successes'], stats['failures']) == (1, 0)
+    assert selenium_scraper.driver_pool.lookup('tok').handle is driver
+    assert selenium_scraper.closed == []
+
+
+def test_browser_error_counts_against_portal_and_drops_session(selenium_scraper):
+    driver = FakeDriver('', broken=True)
+    result = fetch_with(selenium_scraper, driver)
+    assert result['message'] == 'Server Error. Try again.'
+    assert selenium_scraper.portal.stats()['failures'] == 1
+    assert selenium_scraper.driver_pool.lookup('tok') is None
+    assert selenium_scraper.closed == [driver]
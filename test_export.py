@@ -0,0 +1,83 @@
+"""Streaming CSV / NDJSON / XLSX exports of the leaderboard and analysis views."""
+
+import io
+import csv
+import json
+import zipfile
+import pytest
+import export
+
+
+def student(i, total, subjects):
+    return {'usn': f'1DB22CS00{i}', 'name': f'STUDENT {i}', 'total_marks': total, 'sgpa': f'{total / 20:.2f}',
+            'percentage': total / 2, 'class_result': 'Pass',
+            'subjects': [{'code': code, 'name': code, 'total': str(marks), 'result': 'P' if marks >= 40 else 'F'}
+                         for code, marks in subjects]}
+
+
+@pytest.fixture
+def stored(client, app_module):
+    for doc in (student(1, 150, [('BCS701', 80), ('BCS702', 70)]),
+                student(2, 180, [('BCS701', 90), ('BCS702', 90)]),
+                student(3, 95, [('BCS701', 60), ('BCS703', 35)])):
+        app_module.store.persist(doc)
+    return client
+
+
+def read_csv(response):
+    text = response.get_data(as_text=True)
+    assert text.startswith('﻿')
+    return list(csv.reader(io.StringIO(text[1:])))
+
+
+def test_leaderboard_csv_flattens_subjects_in_rank_order(stored):
+    response = stored.get('/export/leaderboard.csv')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename="leaderboard.csv"'
+    rows = read_csv(response)
+    assert rows[0] == list(export.BASE_COLUMNS) + ['BCS701', 'BCS701 result', 'BCS702', 'BCS702 result',
+                                                   'BCS703', 'BCS703 result']
+    assert [(r[0], r[1]) for r in rows[1:]] == [('1', '1DB22CS002'), ('2', '1DB22CS001'), ('3', '1DB22CS003')]
+    assert rows[3][-6:] == ['60', 'P', '', '', '35', 'F']
+
+
+def test_leaderboard_ndjson_keeps_subject_lists(stored):
+    response = stored.get('/export/leaderboard.ndjson', query_string={'sort': 'sgpa', 'order': 'asc'})
+    assert response.mimetype == 'application/x-ndjson'
+    docs = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [d['usn'] for d in docs] == ['1DB22CS003', '1DB22CS001', '1DB22CS002']
+    assert docs[0]['rank'] == 3
+    assert docs[0]['subjects'] == [{'code': 'BCS701', 'total': '60', 'result': 'P'},
+                                   {'code': 'BCS703', 'total': '35', 'result': 'F'}]
+
+
+def test_analysis_export_filters_to_category(stored):
+    rows = read_csv(stored.get('/export/analysis.csv', query_string={'category': 'overall_fail'}))
+    assert [r[1] for r in rows[1:]] == ['1DB22CS003']
+
+
+def test_xlsx_is_a_workbook(stored):
+    if not export.available('xlsx'):
+        pytest.skip('xlsxwriter is not installed')
+    response = stored.get('/export/leaderboard.xlsx')
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as book:
+        # constant_memory writes strings inline in the sheet.
+        sheet = book.read('xl/worksheets/sheet1.xml').decode('utf-8')
+    assert 'STUDENT 2' in sheet and 'BCS703 result' in sheet
+
+
+def test_unknown_format_is_refused(stored):
+    response = stored.get('/export/leaderboard.pdf')
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'error'
+
+
+def test_csv_streams_in_chunks(monkeypatch):
+    monkeypatch.setattr(export, 'CHUNK_BYTES', 200)
+    docs = (student(i, 100 + i, [('BCS701', 50)]) for i in range(10))
+    chunks = list(export.stream_csv(docs, ['BCS701']))
+    assert len(chunks) > 2
+    rows = list(csv.reader(io.StringIO(''.join(chunks)[1:])))
+    assert len(rows) == 11 and rows[-1][1] == '1DB22CS009'
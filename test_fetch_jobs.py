@@ -0,0 +1,134 @@
+"""Queued fetch jobs, long-poll and event-stream slots (run with pytest)."""
+
+import time
+import threading
+import pytest
+from fetch_jobs import JobRegistry
+from session_pool import PoolExhausted
+
+
+@pytest.fixture
+def jobs():
+    registry = JobRegistry(max_workers=2, max_pending=2, ttl=60)
+    yield registry
+    registry.shutdown()
+
+
+def wait_done(jobs, job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        jobs.wait(job, len(job.events), 0.1)
+    return job
+
+
+def test_job_reports_phases_and_result(jobs):
+    def work(report):
+        report('submitted')
+        report('parsed')
+        return {'status': 'success'}
+    job = wait_done(jobs, jobs.submit('1DB22CS001', work))
+    assert job.state == 'done' and job.result == {'status': 'success'}
+    assert [e['phase'] for e in job.events] == ['queued', 'running', 'submitted', 'parsed', 'done']
+    assert [e['phase'] for e in job.to_dict(since=3)['events']] == ['parsed', 'done']
+
+
+def test_crash_becomes_a_failed_job(jobs):
+    def work(report):
+        raise RuntimeError("boom")
+    job = wait_done(jobs, jobs.submit('1DB22CS001', work))
+    assert job.state == 'failed' and job.result['status'] == 'error'
+    assert jobs.stats()['failed'] == 1
+
+
+def test_queue_is_bounded(jobs):
+    gate = threading.Event()
+    held = [jobs.submit('U', lambda report: gate.wait(5)) for _ in range(2)]
+    with pytest.raises(PoolExhausted):
+        jobs.submit('U', lambda report: None)
+    gate.set()
+    for job in held:
+        wait_done(jobs, job)
+    assert jobs.submit('U', lambda report: None)
+
+
+def test_wait_returns_on_news_or_timeout(jobs):
+    gate = threading.Event()
+
+    def work(report):
+        gate.wait(5)
+        report('submitted')
+    job = jobs.submit('U', work)
+    jobs.wait(job, 0, 1)
+    seen = len(job.events)
+    started = time.monotonic()
+    assert jobs.wait(job, seen, 0.2) == seen
+    assert time.monotonic() - started >= 0.15
+    threading.Timer(0.1, gate.set).start()
+    assert jobs.wait(job, seen, 5) > seen
+
+
+def test_finished_jobs_expire(jobs):
+    job = wait_done(jobs, jobs.submit('U', lambda report: {'status': 'success'}))
+    job.finished_at -= 61
+    jobs.submit('U', lambda report: None)
+    assert jobs.get(job.id) is None
+
+
+# --- ENDPOINTS ---
+class StubScraper:
+    """Answers job() like the scraper; calls with `wait` block until released."""
+
+    def __init__(self, finished=False):
+        self.release = threading.Event()
+        self.waits = []
+        self.finished = finished
+
+    def job(self, job_id, seen=0, wait=0):
+        self.waits.append(wait)
+        if wait and not self.finished:
+            self.release.wait(5)
+        events = [{'phase': 'done', 'at': 0}] if self.finished and seen == 0 else []
+        return {'job_id': job_id, 'usn': 'U', 'state': 'done' if self.finished else 'running',
+                'phase': 'done' if self.finished else 'running', 'events': events,
+                'result': {'status': 'success'} if self.finished else None}
+
+
+def test_long_polls_beyond_the_slot_cap_answer_at_once(app_module, monkeypatch):
+    stub = StubScraper()
+    monkeypatch.setattr(app_module, 'scraper', stub)
+    monkeypatch.setattr(app_module, 'job_stream_slots', threading.BoundedSemaphore(2))
+    held = [threading.Thread(target=lambda: app_module.app.test_client().get('/fetch_result/j?wait=20'))
+            for _ in range(2)]
+    for t in held:
+        t.start()
+    deadline = time.monotonic() + 5
+    while len(stub.waits) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    resp = app_module.app.test_client().get('/fetch_result/j?wait=20')
+    assert resp.status_code == 200 and time.monotonic() - started < 1
+    assert stub.waits[-1] == 0
+
+    stub.release.set()
+    for t in held:
+        t.join()
+    # Both held slots came back.
+    assert app_module.job_stream_slots.acquire(blocking=False)
+    assert app_module.job_stream_slots.acquire(blocking=False)
+
+
+def test_event_streams_are_capped_and_release_their_slot(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'scraper', StubScraper(finished=True))
+    monkeypatch.setattr(app_module, 'job_stream_slots', threading.BoundedSemaphore(1))
+    client = app_module.app.test_client()
+
+    stream = client.get('/fetch_result/j/events', buffered=False)
+    assert stream.status_code == 200
+    refused = client.get('/fetch_result/j/events')
+    assert refused.status_code == 503 and refused.headers['Retry-After'] == '2'
+
+    body = b''.join(stream.response).decode()
+    stream.close()
+    assert 'event: phase' in body and 'event: result' in body
+    assert client.get('/fetch_result/j/events').status_code == 200
@@ -0,0 +1,48 @@
+"""SchemeRegistry selection and GradingScheme lookups (run with pytest)."""
+
+import pytest
+from grading import GradingScheme, SchemeRegistry
+
+BASE = {'grade_points': [[90, 10], [40, 4]], 'classes': [[70, 'Distinction'], [40, 'Pass']]}
+
+
+def scheme(id, prefixes, credits, **extra):
+    return GradingScheme(dict(BASE, id=id, usn_prefixes=prefixes, credits=credits, **extra))
+
+
+def test_longest_usn_prefix_wins():
+    registry = SchemeRegistry([scheme('broad', ['1DB'], {'BCS701': 4}),
+                               scheme('cs22', ['1DB22CS'], {'BCS701': 3})])
+    assert registry.select('1db22cs001').id == 'cs22'
+    assert registry.select('1DB23EC001').id == 'broad'
+    assert registry.select('4XX22CS001') is None
+    assert not registry.accepts_usn('')
+
+
+def test_subject_codes_break_prefix_ties():
+    registry = SchemeRegistry([scheme('cs', ['1DB22'], {'BCS701': 4}),
+                               scheme('ec', ['1DB22'], {'BEC701': 4, 'BEC702': 3})])
+    assert registry.select('1DB22XX001').id == 'cs'
+    assert registry.select('1DB22XX001', ['BEC701', 'BEC702']).id == 'ec'
+
+
+def test_credits_use_longest_code_prefix():
+    s = scheme('x', ['1DB'], {'BEE755': 2, 'BEE755B': 3})
+    assert s.credits('bee755b') == 3
+    assert s.credits('BEE755A') == 2
+    assert s.credits('BCS999') == 0
+
+
+def test_grade_points_and_classes():
+    s = scheme('x', ['1DB'], {})
+    assert [s.grade_point(m) for m in (95, 90, 89, 40, 39)] == [10, 10, 4, 4, 0]
+    assert s.grade_point(500) == 10
+    assert s.grade_point('AB') == 0
+    assert s.classify(75, False) == 'Distinction'
+    assert s.classify(75, True) == 'Fail'
+    assert s.classify(10, False) == 'Fail'
+
+
+def test_empty_registry_rejected():
+    with pytest.raises(ValueError):
+        SchemeRegistry([])
@@ -0,0 +1,80 @@
+"""FETCH_ENGINE=auto fallback from the HTTP engine to Selenium (run with pytest)."""
+
+import pytest
+import circuit_breaker
+import scraper
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, 'time', lambda: now[0])
+    monkeypatch.setattr(circuit_breaker.random, 'uniform', lambda a, b: 1.0)
+    return now
+
+
+@pytest.fixture
+def auto_scraper(monkeypatch):
+    monkeypatch.setattr(scraper, 'FETCH_ENGINE', 'auto')
+    s = scraper.Scraper(store=None)
+    yield s
+    s.shutdown()
+
+
+def trip(s, failures=scraper.HTTP_FALLBACK_MIN_CALLS):
+    for _ in range(failures):
+        s.http_engine_failed(Exception("portal timeout"))
+
+
+def test_one_failure_keeps_http(clock, auto_scraper):
+    trip(auto_scraper, 1)
+    assert auto_scraper.claim_http_engine() == (True, None)
+
+
+def test_trips_cools_down_and_trips_again(clock, auto_scraper):
+    health = auto_scraper.http_health
+    trip(auto_scraper)
+    assert auto_scraper.claim_http_engine() == (False, None)
+
+    clock[0] += scraper.HTTP_FALLBACK_COOLDOWN
+    use_http, claim = auto_scraper.claim_http_engine()
+    assert use_http and claim
+    # Only one request probes the HTTP engine; the rest use Selenium meanwhile.
+    assert auto_scraper.claim_http_engine() == (False, None)
+
+    auto_scraper.http_engine_failed(Exception("still down"))
+    assert health.state == health.OPEN
+    assert health.stats()['opened'] == 2
+    assert health.stats()['retry_after'] == 2 * scraper.HTTP_FALLBACK_COOLDOWN
+    assert not auto_scraper.http_engine_enabled()
+
+
+def test_failure_after_cooldown_without_probe_still_trips(clock, auto_scraper):
+    # The HTTP captcha warmer records outcomes without claiming a probe.
+    health = auto_scraper.http_health
+    trip(auto_scraper)
+    clock[0] += scraper.HTTP_FALLBACK_COOLDOWN
+    assert auto_scraper.http_engine_enabled()
+    trip(auto_scraper, 50)
+    assert health.state == health.OPEN
+    assert health.stats()['opened'] == 2
+    assert not auto_scraper.http_engine_enabled()
+
+
+def test_successful_probe_restores_http(clock, auto_scraper):
+    health = auto_scraper.http_health
+    trip(auto_scraper)
+    clock[0] += scraper.HTTP_FALLBACK_COOLDOWN
+    _, claim = auto_scraper.claim_http_engine()
+    health.record_success()
+    health.release(claim)
+    assert health.state == health.CLOSED
+    assert auto_scraper.claim_http_engine() == (True, None)
+
+
+def test_unused_probe_is_released(clock, auto_scraper):
+    trip(auto_scraper)
+    clock[0] += scraper.HTTP_FALLBACK_COOLDOWN
+    _, claim = auto_scraper.claim_http_engine()
+    auto_scraper.http_health.release(claim)
+    assert auto_scraper.claim_http_engine()[0]
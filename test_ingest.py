@@ -0,0 +1,99 @@
+"""Upload validation in ingest (run with pytest)."""
+
+import json
+import pytest
+from ingest import clean_record, parse_body, InvalidRecord
+
+RECORD = {'usn': ' 1db22cs001 ', 'name': 'STUDENT ONE', 'sgpa': '10.00', 'total_marks': 9999,
+          'class_result': 'First Class with Distinction',
+          'subjects': [{'code': 'bcs701', 'name': 'X', 'total': 95, 'result': 'p'},
+                       {'code': 'BCS702', 'name': 'Y', 'total': '10', 'result': 'F'}]}
+
+
+def test_clean_record_rescores_and_ignores_client_totals():
+    data = clean_record(RECORD)
+    assert data['usn'] == '1DB22CS001'
+    assert data['total_marks'] == 105
+    assert data['class_result'] == 'Fail'
+    assert data['sgpa'] == '5.00'
+    assert [s['code'] for s in data['subjects']] == ['BCS701', 'BCS702']
+    assert data['subjects'][0]['total'] == '95'
+
+
+@pytest.mark.parametrize('change, message', [
+    ({'usn': '4XX22CS001'}, 'Invalid USN Series'),
+    ({'usn': None}, 'usn must be a string'),
+    ({'name': 'Unknown'}, 'Missing student name'),
+    ({'subjects': []}, 'subjects must be a non-empty list'),
+    ({'subjects': ['BCS701']}, 'subjects[0] must be an object'),
+    ({'subjects': [{'code': '', 'total': '50', 'result': 'P'}]}, 'subjects[0].code is empty'),
+    ({'subjects': [{'code': 'BCS701', 'total': '50', 'result': 'Q'}]}, 'subjects[0].result must be'),
+])
+def test_clean_record_rejects(change, message):
+    with pytest.raises(InvalidRecord, match=message.replace('[', r'\[').replace(']', r'\]')):
+        clean_record(dict(RECORD, **change))
+
+
+def test_clean_record_rejects_non_objects():
+    with pytest.raises(InvalidRecord):
+        clean_record(['1DB22CS001'])
+
+
+def test_parse_body_formats():
+    assert parse_body(b'[{"usn": "A"}, {"usn": "B"}]') == [({'usn': 'A'}, None), ({'usn': 'B'}, None)]
+    assert parse_body('{"usn": "A"}') == [({'usn': 'A'}, None)]
+    records = parse_body(b'{"usn": "A"}\n\nnot json\n', 'application/x-ndjson')
+    assert records[0] == ({'usn': 'A'}, None)
+    assert records[1][0] is None and records[1][1].startswith('Invalid JSON')
+
+
+# --- /submit_result ---
+
+KEY = 'test-ingest-key'
+
+
+def upload(client, records, key=KEY):
+    return client.post('/submit_result', data=json.dumps(records), content_type='application/json',
+                       headers={'X-API-Key': key} if key else {})
+
+
+@pytest.fixture
+def ingest_client(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'INGEST_API_KEY', KEY)
+    return client
+
+
+def test_uploads_refused_without_configured_key(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'INGEST_API_KEY', None)
+    assert upload(client, [RECORD]).status_code == 503
+    assert app_module.students_col.count_documents({}) == 0
+
+
+def test_wrong_key_is_rejected(ingest_client, app_module):
+    assert upload(ingest_client, [RECORD], key='guess').status_code == 401
+    assert upload(ingest_client, [RECORD], key=None).status_code == 401
+    assert app_module.students_col.count_documents({}) == 0
+
+
+def test_valid_upload_is_stored_and_rescored(ingest_client, app_module):
+    second = dict(RECORD, usn='1DB22CS002')
+    response = upload(ingest_client, [RECORD, dict(RECORD, name='Unknown', usn='1DB22CS003'), second])
+    body = response.get_json()
+    assert response.status_code == 200
+    assert (body['status'], body['accepted'], body['rejected']) == ('partial', 2, 1)
+    assert body['results'][1]['status'] == 'error'
+    stored = app_module.students_col.find_one({'usn': '1DB22CS001'})
+    assert stored['total_marks'] == 105 and stored['sgpa'] == '5.00'
+
+
+def test_all_rejected_is_422(ingest_client, app_module):
+    response = upload(ingest_client, [dict(RECORD, usn='4XX22CS001')])
+    assert response.status_code == 422
+    assert response.get_json()['status'] == 'error'
+    assert app_module.students_col.count_documents({}) == 0
+
+
+def test_repeated_usn_keeps_last_copy(ingest_client, app_module):
+    body = upload(ingest_client, [RECORD, dict(RECORD, name='RENAMED')]).get_json()
+    assert body['results'][0]['status'] == 'skipped'
+    assert app_module.students_col.find_one({'usn': '1DB22CS001'})['name'] == 'RENAMED'
@@ -0,0 +1,68 @@
+"""Keyset-paginated /leaderboard (run with pytest)."""
+
+import pytest
+from student_store import encode_cursor, decode_cursor, after_cursor, leaderboard_sort
+
+
+def students(n=23):
+    # Few distinct marks, so most pages end in the middle of a tie.
+    return [{'usn': f'1DB22CS{i:03d}', 'name': f'STUDENT {i}', 'total_marks': 500 + i % 4,
+             'sgpa': f'{7 + (i % 6) / 4:.2f}'} for i in range(n)]
+
+
+def walk(client, **params):
+    usns, cursor, pages = [], None, 0
+    while True:
+        query = dict(params, page_size=5, **({'cursor': cursor} if cursor else {}))
+        body = client.get('/leaderboard', query_string=query).get_json()
+        assert body['status'] == 'success'
+        usns += [row['usn'] for row in body['data']]
+        pages += 1
+        cursor = body['next_cursor']
+        if not body['has_more']:
+            assert cursor is None
+            return usns, pages
+
+
+@pytest.mark.parametrize('sort, order', [('marks', 'desc'), ('marks', 'asc'), ('sgpa', 'desc'), ('sgpa', 'asc')])
+def test_cursor_walk_returns_every_student_once_in_order(client, seed, sort, order):
+    rows = students()
+    seed(*rows)
+    usns, pages = walk(client, sort=sort, order=order)
+    key = (lambda s: s['total_marks']) if sort == 'marks' else (lambda s: float(s['sgpa']))
+    if order == 'desc':
+        expected = sorted(rows, key=lambda s: (-key(s), s['usn']))
+    else:
+        expected = sorted(rows, key=lambda s: (key(s), [-ord(c) for c in s['usn']]))
+    assert usns == [s['usn'] for s in expected]
+    assert pages == 5
+
+
+def test_rows_carry_competition_rank_and_hide_internal_fields(client, seed):
+    seed(*students(8))
+    body = client.get('/leaderboard', query_string={'page_size': 50}).get_json()
+    assert body['total'] == 8
+    top = body['data'][0]
+    assert top['total_marks'] == 503 and top['rank'] == 1
+    assert body['data'][2]['rank'] == 3
+    assert not {'sgpa_num', 'name_tokens', 'roll', 'updated_at', 'subjects'} & set(top)
+
+
+def test_page_number_paging(client, seed):
+    seed(*students(12))
+    body = client.get('/leaderboard', query_string={'page_size': 5, 'page': 3}).get_json()
+    assert len(body['data']) == 2 and not body['has_more']
+
+
+def test_invalid_cursor_is_rejected(client, seed):
+    seed(*students(3))
+    resp = client.get('/leaderboard', query_string={'cursor': '!!not-a-cursor'})
+    assert resp.status_code == 400
+
+
+def test_cursor_round_trip():
+    field, _ = leaderboard_sort('sgpa', 'desc')
+    cursor = encode_cursor({'sgpa_num': 8.25, 'usn': '1DB22CS007'}, field)
+    assert decode_cursor(cursor) == (8.25, '1DB22CS007')
+    assert after_cursor(field, 'desc', cursor) == {
+        '$or': [{'sgpa_num': {'$lt': 8.25}}, {'sgpa_num': 8.25, 'usn': {'$gt': '1DB22CS007'}}]}
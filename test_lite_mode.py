@@ -0,0 +1,72 @@
+"""create_driver() options with and without BROWSER_LITE_MODE, against a fake Chrome."""
+
+import os
+import pytest
+import scraper
+
+
+class FakeService:
+    def __init__(self, path):
+        self.path = path
+
+
+class FakeChrome:
+    def __init__(self, service, options):
+        self.service = service
+        self.options = options
+        self.cdp = []
+        self.page_load_timeout = None
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    def implicitly_wait(self, seconds):
+        pass
+
+
+@pytest.fixture
+def fake_chrome(monkeypatch, tmp_path):
+    chromedriver = tmp_path / 'chromedriver'
+    chromedriver.write_text('')
+    monkeypatch.setenv('CHROMEDRIVER_PATH', str(chromedriver))
+    monkeypatch.setattr(scraper, 'Service', FakeService)
+    monkeypatch.setattr(scraper.webdriver, 'Chrome', FakeChrome)
+
+
+def test_lite_mode_is_off_unless_enabled():
+    if 'BROWSER_LITE_MODE' in os.environ:
+        pytest.skip('BROWSER_LITE_MODE set in the environment')
+    assert scraper.BROWSER_LITE_MODE is False
+    assert scraper.create_driver.__defaults__ == (False,)
+
+
+def test_full_mode_loads_everything(fake_chrome):
+    driver = scraper.create_driver(30)
+    assert driver.options.page_load_strategy == 'normal'
+    assert driver.cdp == []
+    assert driver.page_load_timeout == 30
+    assert driver.service.popen_kw == {'start_new_session': True}
+
+
+def test_lite_mode_blocks_resources_and_loads_eagerly(fake_chrome):
+    driver = scraper.create_driver(20, lite=True)
+    assert driver.options.page_load_strategy == 'eager'
+    assert '--disk-cache-size=1' in driver.options.arguments
+    assert driver.cdp == [
+        ('Network.enable', {}),
+        ('Network.setBlockedURLs', {'urls': scraper.LITE_BLOCKED_URLS}),
+    ]
+    assert '*.css' in scraper.LITE_BLOCKED_URLS
+
+
+def test_lite_mode_survives_missing_devtools(fake_chrome, monkeypatch):
+    def no_cdp(self, cmd, params):
+        raise RuntimeError('CDP unavailable')
+
+    monkeypatch.setattr(FakeChrome, 'execute_cdp_cmd', no_cdp)
+    driver = scraper.create_driver(20, lite=True)
+    assert driver.options.page_load_strategy == 'eager'
+    assert driver.page_load_timeout == 20
@@ -0,0 +1,110 @@
+"""USN expansion and the spooled uploader in local_scraper (no browser needed)."""
+
+import sys
+import json
+import subprocess
+import pytest
+import requests
+import local_scraper
+from local_scraper import expand_usns, SpoolUploader
+
+
+def test_expand_usns_ranges_and_plain():
+    assert expand_usns(['1db22cs001-3']) == ['1DB22CS001', '1DB22CS002', '1DB22CS003']
+    assert expand_usns(['1DB22CS009-1DB22CS010', '1DB22CS042', '# comment', '', '1DB22CS010']) == \
+        ['1DB22CS009', '1DB22CS010', '1DB22CS042']
+    with pytest.raises(ValueError):
+        expand_usns(['1DB22CS001-1DB21CS003'])
+
+
+def test_import_does_not_pull_in_the_server():
+    code = "import sys, local_scraper; print(any(m in sys.modules for m in ('scraper', 'run_app', 'result_store')))"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self.body = body
+        self.text = json.dumps(body) if body is not None else 'Not Found'
+
+    def json(self):
+        if self.body is None:
+            raise ValueError('no JSON')
+        return self.body
+
+
+@pytest.fixture
+def spool(tmp_path):
+    uploader = SpoolUploader(str(tmp_path / 'results.ndjson'), 'http://cloud/submit_result', api_key='k', batch=2)
+    for i in range(3):
+        uploader.append({'usn': f'1DB22CS00{i}', 'name': f'STUDENT {i}'})
+    return uploader
+
+
+def reply_with(monkeypatch, response):
+    sent = []
+
+    def post(url, data, headers, timeout):
+        sent.append((data, headers))
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(local_scraper.requests, 'post', post)
+    return sent
+
+
+def upload_first_batch(uploader):
+    body, end, count = uploader._read_batch(uploader._sent_offset())
+    assert count == 2
+    return uploader._upload(body, end, count), end
+
+
+@pytest.mark.parametrize('status', [200, 422])
+def test_processed_upload_advances_offset(spool, monkeypatch, status):
+    results = [{'usn': '1DB22CS000', 'status': 'inserted'},
+               {'usn': '1DB22CS001', 'status': 'error', 'message': 'Missing student name'}]
+    sent = reply_with(monkeypatch, FakeResponse(status, {'results': results}))
+    ok, end = upload_first_batch(spool)
+    assert ok and spool._sent_offset() == end
+    assert spool.pending() > 0 and spool.uploaded == 2
+    assert spool.rejected == [('1DB22CS001', 'Missing student name')]
+    assert sent[0][1]['X-API-Key'] == 'k'
+    assert sent[0][0].count(b'\n') == 2
+
+
+def test_wrong_endpoint_is_fatal_and_keeps_spool(spool, monkeypatch):
+    reply_with(monkeypatch, FakeResponse(404))
+    ok, _ = upload_first_batch(spool)
+    assert not ok and spool.fatal.startswith('HTTP 404')
+    assert spool._sent_offset() == 0
+
+
+@pytest.mark.parametrize('response', [FakeResponse(503, {'status': 'error'}), FakeResponse(429),
+                                      requests.ConnectionError('offline')])
+def test_busy_or_offline_server_is_retried(spool, monkeypatch, response):
+    reply_with(monkeypatch, response)
+    ok, _ = upload_first_batch(spool)
+    assert not ok and spool.fatal is None
+    assert spool._sent_offset() == 0
+
+
+def test_result_count_mismatch_is_fatal(spool, monkeypatch):
+    reply_with(monkeypatch, FakeResponse(200, {'results': [{'usn': '1DB22CS000', 'status': 'inserted'}]}))
+    ok, _ = upload_first_batch(spool)
+    assert not ok and spool.fatal
+    assert spool._sent_offset() == 0
+
+
+def test_close_flushes_everything(spool, monkeypatch):
+    def post(url, data, headers, timeout):
+        lines = [json.loads(line) for line in data.splitlines()]
+        return FakeResponse(200, {'results': [{'usn': r['usn'], 'status': 'inserted'} for r in lines]})
+
+    monkeypatch.setattr(local_scraper.requests, 'post', post)
+    spool.start()
+    spool.close(timeout=10)
+    assert spool.pending() == 0 and spool.uploaded == 3
+    assert spool.harvested() == {'1DB22CS000', '1DB22CS001', '1DB22CS002'}
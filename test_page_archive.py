@@ -0,0 +1,79 @@
+"""Raw page archive on disk and the batch re-parse over it."""
+
+import os
+import pytest
+import page_archive
+from page_archive import PageArchive
+from bench_parser import result_page
+
+ROWS = [['BCS701', 'INTERNET OF THINGS', 45, 48, 93, 'P']]
+
+
+@pytest.fixture
+def archive(mongo_db, tmp_path):
+    mongo_db.drop_collection('raw_pages')
+    mongo_db.drop_collection('students')
+    pages = PageArchive(mongo_db, backend='disk', root=str(tmp_path), codec='zlib')
+    pages.ensure_indexes()
+    return pages
+
+
+def blob_files(root):
+    return [name for _, _, names in os.walk(root) for name in names]
+
+
+def test_put_get_round_trip_compressed(archive, tmp_path):
+    html = result_page('1DB22CS007', 'ANANYA RAO', ROWS)
+    digest = archive.put('1DB22CS007', '2025-odd', html)
+    assert archive.get('1DB22CS007', '2025-odd') == html.encode('utf-8')
+    assert archive.get('1DB22CS007', '2024-even') is None
+    assert blob_files(tmp_path) == [f'{digest}.zlib']
+    stats = archive.stats()
+    assert stats['archived'] == 1 and stats['ratio'] < 1
+
+
+def test_identical_pages_are_stored_once(archive, tmp_path):
+    html = result_page('1DB22CS007', 'ANANYA RAO', ROWS)
+    archive.put('1DB22CS007', '2025-odd', html)
+    archive.put('1DB22CS007', '2025-odd', html)
+    assert len(blob_files(tmp_path)) == 1
+    assert archive.stats()['deduplicated'] == 1
+    assert archive.index_col.count_documents({}) == 1
+
+
+def test_archive_failure_never_raises(archive, monkeypatch):
+    def broken(digest, codec, blob):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(archive.blobs, 'put', broken)
+    assert archive.put('1DB22CS007', '2025-odd', '<html></html>') is None
+    assert archive.stats()['failures'] == 1
+
+
+def test_disabled_archive_keeps_nothing(mongo_db):
+    pages = PageArchive(mongo_db, backend='off')
+    assert pages.put('1DB22CS007', '2025-odd', '<html></html>') is None
+    assert not pages.enabled
+
+
+def test_reparse_uses_each_usns_newest_page(archive, mongo_db, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(page_archive.time, 'time', lambda: next(clock))
+    archive.put('1DB22CS007', '2024-even', result_page('1DB22CS007', 'OLD NAME', ROWS))
+    archive.put('1DB22CS007', '2025-odd', result_page('1DB22CS007', 'NEW NAME', ROWS))
+    archive.put('1DB22CS008', '2025-odd', result_page('1DB22CS008', 'KIRAN', ROWS))
+    archive.put('1DB22CS009', '2025-odd', '<html><body>Invalid captcha</body></html>')
+
+    result = page_archive.reparse_all(archive, mongo_db['students'], workers=1)
+    assert {k: result[k] for k in ('pages', 'parsed', 'failed', 'written', 'superseded')} == \
+        {'pages': 3, 'parsed': 2, 'failed': 1, 'written': 2, 'superseded': 1}
+    student = mongo_db['students'].find_one({'usn': '1DB22CS007'})
+    assert student['name'] == 'NEW NAME' and student['exam_session'] == '2025-odd'
+
+
+def test_reparse_dry_run_writes_nothing(archive, mongo_db):
+    archive.put('1DB22CS007', '2025-odd', result_page('1DB22CS007', 'ANANYA RAO', ROWS))
+    result = page_archive.reparse_all(archive, mongo_db['students'], exam_session='2025-odd',
+                                      workers=1, dry_run=True)
+    assert (result['parsed'], result['written']) == (1, 0)
+    assert mongo_db['students'].count_documents({}) == 0
@@ -0,0 +1,92 @@
+"""RankService competition ranking and ResultStore rank loading (run with pytest)."""
+
+import pytest
+from pymongo.errors import PyMongoError
+from rank_service import RankService, FenwickCounter
+
+
+def test_competition_ranks_with_ties():
+    ranks = RankService()
+    ranks.rebuild([{'usn': 'A', 'total_marks': 600, 'sgpa': '9.10'},
+                   {'usn': 'B', 'total_marks': 550, 'sgpa': '8.50'},
+                   {'usn': 'C', 'total_marks': 550, 'sgpa': '8.50'},
+                   {'usn': 'D', 'total_marks': 400, 'sgpa': '6.00'}])
+    assert [ranks.rank('marks', m) for m in (600, 550, 400)] == [1, 2, 4]
+    assert ranks.rank('sgpa', '8.50') == 2
+    assert ranks.rank('marks', 700) == 1
+    assert ranks.rank('marks', 0) == 5
+
+
+def test_upsert_moves_and_remove_drops():
+    ranks = RankService()
+    ranks.upsert('A', 500, '8.00')
+    ranks.upsert('B', 450, '7.00')
+    ranks.upsert('B', 650, '9.50')
+    assert len(ranks) == 2
+    assert ranks.rank('marks', 500) == 2
+    ranks.remove('B')
+    assert ranks.rank('marks', 500) == 1
+    ranks.remove('missing')
+    assert len(ranks) == 1
+
+
+def test_bad_values_count_as_zero_and_tree_grows():
+    ranks = RankService(max_marks=8)
+    ranks.upsert('A', None, 'N/A')
+    ranks.upsert('B', 5000, '10.00')
+    assert ranks.rank('marks', 0) == 2
+    assert ranks.rank('marks', 5000) == 1
+    assert ranks.rank('sgpa', 'junk') == 2
+
+
+def test_fenwick_counts():
+    tree = FenwickCounter(4)
+    for key in (0, 3, 3, 9):
+        tree.add(key)
+    assert tree.count_le(3) == 3
+    assert tree.count_at(3) == 2
+    assert tree.count_gt(3) == 1
+    assert tree.count_le(-1) == 0
+
+
+# --- RESULT STORE LOADING ---
+mongomock = pytest.importorskip('mongomock')
+import result_store  # noqa: E402
+from result_store import ResultStore  # noqa: E402
+
+
+def test_store_loads_ranks_on_first_use_not_at_construction():
+    db = mongomock.MongoClient()['vtu_test']
+    db['students'].insert_many([{'usn': 'A', 'total_marks': 600, 'sgpa': '9.0'},
+                                {'usn': 'B', 'total_marks': 500, 'sgpa': '8.0'}])
+    store = ResultStore(db)
+    assert len(store.ranks) == 0
+    assert store.rank('marks', 500) == 2
+    assert len(store.ranks) == 2
+
+
+def test_store_without_database_still_answers():
+    store = ResultStore(None)
+    store.warm_up()
+    assert store.rank('marks', 500) == 1
+
+
+class DownCollection:
+    def __init__(self):
+        self.finds = 0
+
+    def find(self, *args, **kwargs):
+        self.finds += 1
+        raise PyMongoError("server selection timed out")
+
+
+def test_failed_rank_load_is_not_retried_by_every_caller(monkeypatch):
+    store = ResultStore(None)
+    store.students_col = DownCollection()
+    monkeypatch.setattr(store.write_version, 'current', lambda: 0)
+    for _ in range(3):
+        store.ensure_ranks()
+    assert store.students_col.finds == 1
+    monkeypatch.setattr(result_store, 'RANK_LOAD_RETRY', 0)
+    store.ensure_ranks()
+    assert store.students_col.finds == 2
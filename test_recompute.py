@@ -0,0 +1,47 @@
+"""recompute.score_batch must agree with result_parser.build_result (run with pytest)."""
+
+import random
+import pytest
+import grading
+from result_parser import build_result
+
+np = pytest.importorskip('numpy')
+import recompute  # noqa: E402  (needs numpy)
+
+CODES = ['BCS701', 'BCS702', 'BCS703', 'BCS714', 'BEE755B', 'BCS786', 'BXX999']
+
+
+def synthetic_students(rng, count):
+    students = []
+    for i in range(count):
+        rows = []
+        for code in rng.sample(CODES, rng.randint(0, len(CODES))):
+            marks = rng.choice([str(rng.randint(0, 100)), str(rng.randint(35, 100)), 'AB', ''])
+            result = rng.choice(['P', 'P', 'P', 'F', 'A'])
+            rows.append([code, f'SUBJECT {code}', '', '', marks, result])
+        students.append(build_result(f'1DB22CS{i % 1000:03d}', f'STUDENT {i}', rows))
+    return students
+
+
+def test_score_batch_matches_build_result():
+    students = synthetic_students(random.Random(1), 2000)
+    scheme = grading.registry.default
+    mismatches = []
+    for doc, row in zip(students, recompute.score_batch(scheme, students)):
+        expected = {'total_marks': doc['total_marks'], 'sgpa': doc['sgpa'],
+                    'percentage': doc.get('percentage'), 'class_result': doc['class_result']}
+        if row != expected:
+            mismatches.append((doc['usn'], row, expected))
+    assert not mismatches, mismatches[:5]
+
+
+def test_update_for_skips_unchanged_and_unsets_percentage():
+    doc = build_result('1DB22CS001', 'A', [['BCS701', 'X', '', '', '95', 'P']])
+    row = recompute.score_batch(grading.registry.default, [doc])[0]
+    assert recompute.update_for(doc, row) is None
+
+    doc['percentage'] = '1.00%'
+    row = dict(row, percentage=None, sgpa='0.00', class_result='N/A')
+    update = recompute.update_for(doc, row)._doc
+    assert update['$unset'] == {'percentage': ''}
+    assert update['$set']['sgpa_num'] == 0.0
@@ -0,0 +1,66 @@
+"""Write-versioned response cache and ETag/304 handling (run with pytest)."""
+
+from response_cache import ResponseCache, WriteVersion
+
+
+def test_entries_are_only_valid_for_their_version():
+    cache = ResponseCache()
+    entry = cache.put('k', 1, b'{"a": 1}', 'application/json')
+    assert cache.get('k', 1) is entry
+    assert cache.get('k', 2) is None
+    assert cache.get('k', 1) is None
+    assert cache.stats()['stale'] == 1
+
+
+def test_lru_and_byte_limits():
+    cache = ResponseCache(max_entries=2, max_bytes=10)
+    cache.put('a', 1, b'1234', 'text/plain')
+    cache.put('b', 1, b'1234', 'text/plain')
+    cache.get('a', 1)
+    cache.put('c', 1, b'1234', 'text/plain')
+    assert cache.get('b', 1) is None and cache.get('a', 1) and cache.get('c', 1)
+    cache.put('d', 1, b'123456789', 'text/plain')
+    assert cache.stats()['bytes'] <= 10
+    # Larger than the whole cache: returned for this response, never stored.
+    big = cache.put('e', 1, b'x' * 11, 'text/plain')
+    assert big.etag and cache.get('e', 1) is None
+
+
+def test_etag_depends_on_body_only():
+    cache = ResponseCache()
+    assert cache.put('a', 1, b'same', 'text/plain').etag == cache.put('b', 9, b'same', 'text/plain').etag
+    assert cache.put('c', 1, b'other', 'text/plain').etag != cache.get('a', 1).etag
+
+
+def test_write_version_is_shared_through_mongo(mongo_db):
+    mine = WriteVersion(mongo_db['meta'], check_interval=0)
+    other = WriteVersion(mongo_db['meta'], check_interval=3600)
+    assert mine.current() == 0
+    assert other.bump() == 1
+    assert mine.current() == 1
+    # Within its check interval a process answers from its local copy.
+    assert other.current() == 1
+    mine.bump()
+    assert other.current() == 1
+
+
+def test_endpoint_revalidates_and_invalidates_on_write(client, seed, app_module):
+    seed({'usn': '1DB22CS001', 'name': 'A', 'total_marks': 500, 'sgpa': '8.00'})
+    first = client.get('/leaderboard')
+    etag = first.headers['ETag']
+    assert first.status_code == 200 and first.headers['Cache-Control'] == 'no-cache'
+
+    again = client.get('/leaderboard', headers={'If-None-Match': etag})
+    assert again.status_code == 304 and again.headers['ETag'] == etag
+    assert app_module.response_cache.stats()['hits'] == 1
+
+    seed({'usn': '1DB22CS002', 'name': 'B', 'total_marks': 600, 'sgpa': '9.00'})
+    changed = client.get('/leaderboard', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
+    assert len(changed.get_json()['data']) == 2
+
+
+def test_errors_are_not_cached(client, app_module):
+    resp = client.get('/subject_analysis', query_string={'code': 'NOPE'})
+    assert resp.status_code == 404 and 'ETag' not in resp.headers
+    assert app_module.response_cache.stats()['entries'] == 0
@@ -0,0 +1,68 @@
+"""Recently fetched results served from the store instead of a re-scrape."""
+
+import time
+import pytest
+import result_store
+
+USN = '1DB22CS007'
+
+
+def result(name='ANANYA RAO', usn=USN):
+    return {'usn': usn, 'name': name, 'total_marks': 93, 'sgpa': '9.00', 'class_result': 'Pass',
+            'subjects': [{'code': 'BCS701', 'name': 'INTERNET OF THINGS', 'total': '93', 'result': 'P'}]}
+
+
+class NoScrape:
+    def fetch(self, token, engine, usn, captcha):
+        raise AssertionError('cached result should not be re-scraped')
+
+
+@pytest.fixture
+def store(client, app_module):
+    return app_module.store
+
+
+def test_fresh_result_is_served_with_rank(store):
+    store.persist(result())
+    cached = store.cached_result(USN)
+    assert cached['name'] == 'ANANYA RAO'
+    assert cached['rank'] == 1
+    assert '_id' not in cached
+    assert store.cache_stats()['hits'] >= 1
+
+
+def test_old_result_is_stale(store):
+    store.persist(result())
+    store.students_col.update_one({'usn': USN}, {'$set': {'fetched_at': time.time() - 120}})
+    assert store.cached_result(USN, ttl=60) is None
+    assert store.cached_result(USN, ttl=300) is not None
+
+
+def test_other_exam_session_is_stale(store, monkeypatch):
+    store.persist(result())
+    monkeypatch.setattr(result_store, 'EXAM_SESSION', 'some-later-session')
+    before = store.cache_stats()['stale']
+    assert store.cached_result(USN) is None
+    assert store.cache_stats()['stale'] == before + 1
+
+
+def test_unknown_or_missing_student_is_not_served(store):
+    store.students_col.insert_one(dict(result(name='Unknown'), fetched_at=time.time(),
+                                       exam_session=result_store.EXAM_SESSION))
+    assert store.cached_result(USN) is None
+    assert store.cached_result('1DB22CS999') is None
+
+
+def test_fetch_result_answers_from_store_without_captcha(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'scraper', NoScrape())
+    app_module.store.persist(result())
+    body = client.post('/fetch_result', data={'usn': USN.lower()}).get_json()
+    assert body['status'] == 'success' and body['cached'] is True
+    assert body['data']['usn'] == USN
+
+
+def test_force_refresh_skips_the_store(client, app_module, monkeypatch):
+    monkeypatch.setattr(app_module, 'scraper', NoScrape())
+    app_module.store.persist(result())
+    body = client.post('/fetch_result', data={'usn': USN, 'force_refresh': '1'}).get_json()
+    assert body == {'status': 'error', 'message': 'Please enter the captcha.'}
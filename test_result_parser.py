@@ -0,0 +1,56 @@
+"""Shared result parser: lxml fast path and bs4 fallback agree (run with pytest)."""
+
+import random
+import pytest
+import result_parser
+from result_parser import parse_result_page, BACKENDS
+from bench_parser import result_page, synthetic_cases
+
+ROWS = [['BCS701', 'INTERNET OF THINGS', 45, 48, 93, 'P'],
+        ['BCS702', 'PARALLEL COMPUTING', 40, 5, 45, 'P'],
+        ['BCS703', 'CRYPTOGRAPHY', 35, 0, 35, 'F']]
+
+
+@pytest.mark.parametrize('backend', sorted(BACKENDS))
+def test_parses_name_subjects_and_scores(backend):
+    html = result_page('1DB22CS007', 'ANANYA  RAO', ROWS)
+    data = parse_result_page(html, '1DB22CS007', backend=backend)
+    assert data['name'] == 'ANANYA  RAO'
+    # The header row of the table is skipped, not parsed as a subject.
+    assert [s['code'] for s in data['subjects']] == ['BCS701', 'BCS702', 'BCS703']
+    assert data['subjects'][0] == {'code': 'BCS701', 'name': 'INTERNET OF THINGS', 'total': '93', 'result': 'P'}
+    assert data['total_marks'] == 173
+    assert data['sgpa'] == '4.67'
+    assert data['class_result'] == 'Fail'
+
+
+def test_backends_agree_on_the_synthetic_corpus():
+    if 'lxml' not in BACKENDS:
+        pytest.skip("lxml is not installed")
+    for label, html, expected in synthetic_cases(random.Random(5), 60):
+        fast = parse_result_page(html, '1DB22CS000', backend='lxml')
+        assert fast == parse_result_page(html, '1DB22CS000', backend='bs4'), label
+        assert fast['name'] == expected['name'], label
+        assert len(fast['subjects']) == expected['subjects'], label
+        assert fast['total_marks'] == expected['total_marks'], label
+
+
+def test_name_label_inside_script_is_ignored():
+    html = result_page('1DB22CS007', 'REAL NAME', ROWS).replace(
+        '<body>', '<body><script>var x = "Student Name"; var y = "a"; var z = "FAKE";</script>')
+    for backend in BACKENDS:
+        assert parse_result_page(html, '1DB22CS007', backend=backend)['name'] == 'REAL NAME'
+
+
+def test_page_without_results_is_unknown():
+    for backend in BACKENDS:
+        data = parse_result_page('<html><body><p>Invalid captcha</p></body></html>', '1DB22CS007', backend=backend)
+        assert data['name'] == 'Unknown' and data['subjects'] == [] and data['sgpa'] == '0.00'
+
+
+def test_failing_fast_path_falls_back_to_bs4(monkeypatch):
+    def broken(html):
+        raise ValueError("lxml choked")
+    monkeypatch.setitem(result_parser.BACKENDS, 'lxml', broken)
+    data = parse_result_page(result_page('1DB22CS007', 'ANANYA RAO', ROWS), '1DB22CS007', backend='lxml')
+    assert data['name'] == 'ANANYA RAO' and len(data['subjects']) == 3
@@ -0,0 +1,103 @@
+"""RemoteScraper <-> serve() RPC, against an in-process stub scraper."""
+
+import threading
+import time
+from multiprocessing.connection import Listener
+
+import pytest
+
+import scraper_service
+from scraper_service import RemoteScraper, ScraperError, ScraperTimeout, ScraperUnavailable
+
+AUTHKEY = b'test-key'
+
+
+class StubScraper:
+    def captcha(self, token=None):
+        return {'status': 'success', 'token': token or 'new'}
+
+    def fetch(self, token, engine, usn, captcha):
+        raise RuntimeError('portal down')
+
+    def job(self, job_id, seen=0, wait=0):
+        time.sleep(wait / 2)
+        return {'status': 'pending', 'job_id': job_id, 'seen': seen}
+
+    def stats(self):
+        return {'jobs': 0}
+
+
+@pytest.fixture
+def address(tmp_path):
+    return str(tmp_path / 'scraper.sock')
+
+
+@pytest.fixture
+def service(address):
+    threading.Thread(target=scraper_service.serve, args=(StubScraper(), address, AUTHKEY), daemon=True).start()
+    for _ in range(100):
+        try:
+            remote = RemoteScraper(address, authkey=AUTHKEY, call_timeout=2)
+            remote.stats()
+            return remote
+        except ScraperUnavailable:
+            time.sleep(0.01)
+    pytest.fail('scraper service did not start')
+
+
+def test_round_trip_reuses_connection(service):
+    assert service.captcha('abc') == {'status': 'success', 'token': 'abc'}
+    assert service.stats() == {'jobs': 0}
+    assert len(service._idle) == 1
+
+
+def test_remote_exception_raises_scraper_error(service):
+    with pytest.raises(ScraperError, match='portal down'):
+        service.fetch('t', 'http', '1AB21CS001', 'XYZ')
+
+
+def test_unknown_method_is_refused(service):
+    with pytest.raises(ScraperError, match='Unknown method'):
+        service._call('shutdown')
+
+
+def test_long_poll_wait_extends_timeout(service):
+    service.call_timeout = 0.2
+    assert service.job('j1', seen=3, wait=0.8)['seen'] == 3
+
+
+def test_wrong_authkey_is_unavailable(service, address):
+    with pytest.raises(ScraperUnavailable, match='unreachable'):
+        RemoteScraper(address, authkey=b'wrong').stats()
+
+
+def test_authkey_is_required(address):
+    with pytest.raises(ValueError):
+        RemoteScraper(address, authkey=b'')
+    with pytest.raises(ValueError):
+        scraper_service.serve(StubScraper(), address, authkey=b'')
+
+
+def test_silent_service_times_out_and_drops_connection(address):
+    listener = Listener(address, authkey=AUTHKEY)
+    held = []
+
+    def accept_and_ignore():
+        conn = listener.accept()
+        held.append(conn)
+        conn.recv()
+
+    threading.Thread(target=accept_and_ignore, daemon=True).start()
+    remote = RemoteScraper(address, authkey=AUTHKEY, call_timeout=0.3)
+    started = time.monotonic()
+    with pytest.raises(ScraperTimeout, match='did not answer captcha'):
+        remote.captcha()
+    assert time.monotonic() - started < 2
+    assert remote._idle == []
+    listener.close()
+
+
+def test_parse_address():
+    assert scraper_service.parse_address('127.0.0.1:6100') == ('127.0.0.1', 6100)
+    assert scraper_service.parse_address(':6100') == ('127.0.0.1', 6100)
+    assert scraper_service.parse_address('/run/scraper.sock') == '/run/scraper.sock'
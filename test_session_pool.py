@@ -0,0 +1,93 @@
+"""SessionPool slot accounting, stealing and waiting (run with pytest)."""
+
+import time
+import random
+import threading
+import pytest
+from session_pool import SessionPool, PoolExhausted
+
+
+def make_pool(**kw):
+    closed = []
+    pool = SessionPool(factory=object, closer=closed.append, name='test', **kw)
+    return pool, closed
+
+
+def test_open_lookup_discard():
+    pool, closed = make_pool(max_size=2)
+    session = pool.open('tok')
+    assert pool.lookup('tok') is session
+    assert pool.lookup('other') is None
+    pool.discard('tok')
+    assert closed == [session.handle]
+    assert pool.free_slots() == 2
+    stats = pool.stats()
+    assert (stats['hits'], stats['misses'], stats['created']) == (1, 1, 1)
+
+
+def test_full_pool_steals_idle_lru():
+    pool, closed = make_pool(max_size=2, steal_after=0)
+    first = pool.open('a')
+    pool.open('b')
+    with pool.using(pool.lookup('b')):
+        pass
+    pool.open('c')
+    assert closed == [first.handle]
+    assert pool.lookup('a') is None
+    assert pool.stats()['evicted_lru'] == 1
+
+
+def test_busy_sessions_are_not_stolen():
+    pool, _ = make_pool(max_size=1, steal_after=0, acquire_timeout=0.2)
+    session = pool.open('a')
+    with pool.using(session):
+        with pytest.raises(PoolExhausted):
+            pool.open('b')
+    assert pool.stats()['rejected'] == 1
+
+
+def test_factory_failure_frees_the_slot():
+    def broken():
+        raise RuntimeError("no browser")
+    pool = SessionPool(factory=broken, closer=lambda h: None, max_size=1)
+    with pytest.raises(RuntimeError):
+        pool.open('a')
+    assert pool.free_slots() == 1
+
+
+def test_waiters_get_released_sessions_promptly():
+    # Many callers over a small pool: every one must get a session as soon as
+    # others finish, not wait out a poll interval per steal.
+    pool, _ = make_pool(max_size=5, steal_after=0, acquire_timeout=5)
+    errors = []
+
+    def worker(i):
+        try:
+            session = pool.open(f'tok{i}')
+            with pool.using(session):
+                time.sleep(random.uniform(0.05, 0.2))
+        except PoolExhausted as e:
+            errors.append(e)
+
+    started = time.time()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert time.time() - started < 4
+
+
+def test_sweeper_closes_idle_sessions_without_traffic():
+    pool, closed = make_pool(max_size=2, idle_timeout=0.1)
+    idle = pool.open('idle')
+    busy = pool.open('busy')
+    with pool.using(busy):
+        pool.start_sweeper(interval=0.05)
+        deadline = time.time() + 2
+        while not closed and time.time() < deadline:
+            time.sleep(0.02)
+        assert closed == [idle.handle]
+    pool.shutdown()
+    assert pool.stats()['evicted_idle'] == 1
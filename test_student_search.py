@@ -0,0 +1,52 @@
+"""Anchored, index-backed leaderboard search (run with pytest)."""
+
+from student_search import build_search_query, search_fields, ensure_search_indexes
+
+STUDENTS = [
+    {'usn': '1DB22CS001', 'name': 'ANANYA RAO'},
+    {'usn': '1DB22CS014', 'name': 'RAHUL KUMAR'},
+    {'usn': '1DB22CS114', 'name': 'KUMAR SWAMY'},
+    {'usn': '1DB21CS014', 'name': 'A.B. NAIK'},
+]
+
+
+def matches(mongo_db, search):
+    col = mongo_db['students']
+    if not col.count_documents({}):
+        col.insert_many([dict(s, **search_fields(s)) for s in STUDENTS])
+    return sorted(d['usn'] for d in col.find(build_search_query(search)))
+
+
+def test_roll_number_queries(mongo_db):
+    assert matches(mongo_db, '14') == ['1DB21CS014', '1DB22CS014']
+    assert matches(mongo_db, '114') == ['1DB22CS114']
+    assert build_search_query('7') == {'roll': '007'}
+
+
+def test_usn_prefix_is_anchored_and_normalized(mongo_db):
+    assert matches(mongo_db, '1db22cs0') == ['1DB22CS001', '1DB22CS014']
+    assert matches(mongo_db, '1DB-21') == ['1DB21CS014']
+    # Not a substring search: "CS014" is not a USN prefix.
+    assert matches(mongo_db, 'CS014') == []
+
+
+def test_every_word_must_prefix_a_name_word(mongo_db):
+    assert matches(mongo_db, 'kum') == ['1DB22CS014', '1DB22CS114']
+    assert matches(mongo_db, 'kumar ra') == ['1DB22CS014']
+    assert matches(mongo_db, 'umar') == []
+
+
+def test_regex_metacharacters_match_literally(mongo_db):
+    assert matches(mongo_db, '.*') == []
+    assert build_search_query('A.B')['$and'] == [{'name_tokens': {'$regex': '^A'}},
+                                                 {'name_tokens': {'$regex': '^B'}}]
+    assert build_search_query('') == {}
+
+
+def test_search_fields_backfilled_once(mongo_db):
+    col = mongo_db['students']
+    col.insert_many([dict(s) for s in STUDENTS])
+    ensure_search_indexes(col)
+    doc = col.find_one({'usn': '1DB22CS114'})
+    assert doc['name_tokens'] == ['KUMAR', 'SWAMY'] and doc['roll'] == '114'
+    assert {'name_tokens', 'roll'} <= set(col.index_information())
@@ -0,0 +1,66 @@
+"""Per-subject distributions maintained incrementally (run with pytest)."""
+
+import random
+import subject_analytics
+from result_parser import build_result, calculate_grade_point
+
+CODES = ['BCS701', 'BCS702', 'BCS703']
+
+
+def student(rng, i):
+    rows = [[code, code, '', '', str(rng.randint(0, 100)), rng.choice(['P', 'P', 'F'])] for code in CODES]
+    if i % 7 == 0:
+        rows.append(['BCS714', 'Elective', '', '', 'AB', 'A'])
+    return build_result(f'1DB22CS{i:03d}', f'STUDENT {i}', rows)
+
+
+def test_incremental_counters_match_rebuild(mongo_db):
+    rng = random.Random(11)
+    students, live = mongo_db['students'], mongo_db['subject_analytics']
+    stored = {}
+    for step in range(150):
+        i = step if step < 50 else rng.randrange(50)
+        doc = student(rng, i)
+        subject_analytics.apply_change(live, stored.get(doc['usn']), doc, calculate_grade_point)
+        stored[doc['usn']] = doc
+        students.replace_one({'usn': doc['usn']}, dict(doc), upsert=True)
+
+    rebuilt = mongo_db['subject_analytics_rebuilt']
+    subject_analytics.rebuild(students, rebuilt, calculate_grade_point)
+    # mongomock applies the compound $sort inside $push wrongly (and then
+    # slices), so top lists are checked on their own below; every counter and
+    # derived statistic must match exactly.
+    live_view, rebuilt_view = subject_analytics.read(live), subject_analytics.read(rebuilt)
+    for summary in live_view + rebuilt_view:
+        summary.pop('top_scorers')
+    assert live_view == rebuilt_view
+    assert [s['code'] for s in subject_analytics.read(live)] == CODES
+    assert subject_analytics.read(live, 'BCS701')[0]['count'] == 50
+
+
+def test_summary_statistics():
+    doc = {'_id': 'BCS701', 'count': 4, 'passed': 3, 'sum': 240, 'sum_sq': 16200,
+           'hist': {'30': 1, '60': 2, '90': 1, '55': 0},
+           'grade_points': {'0': 1, '7': 2, '10': 1},
+           'top': [{'usn': f'U{i}', 'marks': 100 - i} for i in range(15)]}
+    summary = subject_analytics.summarize(doc)
+    assert summary['failed'] == 1
+    assert summary['mean'] == 60 and summary['std_dev'] == 21.21
+    assert (summary['min'], summary['median'], summary['max']) == (30, 60, 90)
+    assert summary['percentiles'] == {'p10': 30, 'p25': 30, 'p50': 60, 'p75': 60, 'p90': 90}
+    assert summary['histogram'] == {'30-39': 1, '60-69': 2, '90-99': 1}
+    assert list(summary['grade_points']) == ['10', '7', '0']
+    assert len(summary['top_scorers']) == subject_analytics.TOP_SHOW
+
+
+def test_refetch_moves_student_in_top_list(mongo_db):
+    col = mongo_db['subject_analytics']
+    first = build_result('1DB22CS001', 'A', [['BCS701', 'X', '', '', '40', 'P']])
+    better = build_result('1DB22CS001', 'A', [['BCS701', 'X', '', '', '95', 'P']])
+    other = build_result('1DB22CS002', 'B', [['BCS701', 'X', '', '', '70', 'P']])
+    subject_analytics.apply_change(col, None, first, calculate_grade_point)
+    subject_analytics.apply_change(col, None, other, calculate_grade_point)
+    subject_analytics.apply_change(col, first, better, calculate_grade_point)
+    summary = subject_analytics.read(col, 'BCS701')[0]
+    assert summary['count'] == 2
+    assert sorted((t['usn'], t['marks']) for t in summary['top_scorers']) == [('1DB22CS001', 95), ('1DB22CS002', 70)]